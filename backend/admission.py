@@ -0,0 +1,185 @@
+"""
+Admission control for booking bursts
+Each showtime admits booking attempts at a steady rate (with a small burst
+allowance); attempts beyond that get a queue ticket and poll until their
+turn comes up. A global cap on in-flight booking transactions keeps most
+of the connection pool free for browsing while a hot showtime drains.
+State is per process, like the seat event broker.
+"""
+
+import math
+import os
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "10"))  # Booking attempts admitted per second per showtime
+ADMISSION_BURST = int(os.getenv("ADMISSION_BURST", "20"))
+ADMISSION_PASS_SECONDS = float(os.getenv("ADMISSION_PASS_SECONDS", "120"))  # How long an admitted ticket may book
+ADMISSION_ABANDON_SECONDS = float(os.getenv("ADMISSION_ABANDON_SECONDS", "30"))  # Waiting tickets not polled this long are dropped
+ADMISSION_MAX_RETRY_SECONDS = 10
+ADMISSION_SWEEP_SECONDS = 60  # How often queues back at rest are dropped
+BOOKING_MAX_CONCURRENCY = int(os.getenv("BOOKING_MAX_CONCURRENCY", "8"))
+
+class QueueTicket:
+    def __init__(self, token: str, showtime_id: int, number: int, now: float):
+        self.token = token
+        self.showtime_id = showtime_id
+        self.number = number
+        self.last_seen = now
+        self.admitted_at: Optional[float] = None
+
+class ShowtimeQueue:
+    """Token bucket plus FIFO of waiting tickets for one showtime"""
+
+    def __init__(self, burst: int, now: float):
+        self.credit = float(burst)
+        self.updated = now
+        self.waiting = deque()
+        self.admitted = deque()
+        self.issued = 0
+        self.served = 0  # Number of the last ticket taken off the waiting line
+
+class Admission:
+    def __init__(self, admitted: bool, ticket: Optional[QueueTicket] = None,
+                 position: int = 0, retry_after: int = 0):
+        self.admitted = admitted
+        self.ticket = ticket
+        self.position = position
+        self.retry_after = retry_after
+
+class AdmissionController:
+    def __init__(self, rate: float = ADMISSION_RATE, burst: int = ADMISSION_BURST,
+                 max_concurrency: int = BOOKING_MAX_CONCURRENCY):
+        self.rate = rate
+        self.burst = burst
+        self._queues: Dict[int, ShowtimeQueue] = {}
+        self._tickets: Dict[str, QueueTicket] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._swept = time.monotonic()
+
+    def tracks(self, showtime_id: int) -> bool:
+        """Whether the showtime has a queue, i.e. was validated recently;
+        callers check other ids exist before admitting them"""
+        return showtime_id in self._queues
+
+    def admit(self, showtime_id: int, token: Optional[str] = None) -> Admission:
+        """Decide whether a booking attempt may go ahead now. Callers holding
+        a ticket pass its token; anyone else joins the back of the line."""
+        now = time.monotonic()
+        with self._lock:
+            queue = self._queue(showtime_id, now)
+            ticket = self._tickets.get(token) if token else None
+            if ticket is None or ticket.showtime_id != showtime_id:
+                if not queue.waiting and queue.credit >= 1:
+                    queue.credit -= 1
+                    return Admission(True)
+                ticket = self._issue(queue, showtime_id, now)
+            return self._state(queue, ticket, now)
+
+    def try_admit(self, showtime_id: int) -> Admission:
+        """Admit an attempt that cannot wait in line, such as one showtime of
+        a group order, without issuing a ticket; when the showtime is
+        queueing, retry_after says how long the line needs to drain"""
+        now = time.monotonic()
+        with self._lock:
+            queue = self._queue(showtime_id, now)
+            if not queue.waiting and queue.credit >= 1:
+                queue.credit -= 1
+                return Admission(True)
+            position = len(queue.waiting) + 1
+            retry_after = min(max(math.ceil(position / self.rate), 1), ADMISSION_MAX_RETRY_SECONDS)
+            return Admission(False, position=position, retry_after=retry_after)
+
+    def status(self, token: str) -> Optional[Admission]:
+        """Current state of a ticket, for polling clients; None if unknown or expired"""
+        now = time.monotonic()
+        with self._lock:
+            ticket = self._tickets.get(token)
+            if ticket is None:
+                return None
+            queue = self._queues[ticket.showtime_id]
+            self._advance(queue, now)
+            if token not in self._tickets:
+                return None
+            return self._state(queue, ticket, now)
+
+    def release(self, token: Optional[str]):
+        """Retire a ticket once its booking went through"""
+        if token:
+            with self._lock:
+                self._tickets.pop(token, None)
+
+    @contextmanager
+    def booking_slot(self):
+        """Reserve one of the in-flight booking slots without waiting;
+        yields False when all are taken so the caller can shed the request"""
+        acquired = self._slots.acquire(blocking=False)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._slots.release()
+
+    def _queue(self, showtime_id: int, now: float) -> ShowtimeQueue:
+        """The showtime's queue, advanced to now; drops idle ones first"""
+        if now - self._swept >= ADMISSION_SWEEP_SECONDS:
+            self._drop_idle(now)
+        queue = self._queues.get(showtime_id)
+        if queue is None:
+            queue = self._queues[showtime_id] = ShowtimeQueue(self.burst, now)
+        self._advance(queue, now)
+        return queue
+
+    def _drop_idle(self, now: float):
+        """Forget queues back at rest: full credit and nobody waiting or
+        admitted. A new queue for the showtime would start out the same."""
+        self._swept = now
+        for showtime_id, queue in list(self._queues.items()):
+            self._advance(queue, now)
+            if queue.credit >= self.burst and not queue.waiting and not queue.admitted:
+                del self._queues[showtime_id]
+
+    def _issue(self, queue: ShowtimeQueue, showtime_id: int, now: float) -> QueueTicket:
+        queue.issued += 1
+        ticket = QueueTicket(secrets.token_urlsafe(24), showtime_id, queue.issued, now)
+        queue.waiting.append(ticket)
+        self._tickets[ticket.token] = ticket
+        return ticket
+
+    def _state(self, queue: ShowtimeQueue, ticket: QueueTicket, now: float) -> Admission:
+        ticket.last_seen = now
+        if ticket.admitted_at is not None:
+            return Admission(True, ticket)
+        position = max(ticket.number - queue.served, 1)
+        retry_after = max(math.ceil(position / self.rate), 1)
+        if retry_after > ADMISSION_MAX_RETRY_SECONDS:
+            # Far back in the line: spread polls out instead of waking everyone at once
+            retry_after = random.randint(ADMISSION_MAX_RETRY_SECONDS // 2, ADMISSION_MAX_RETRY_SECONDS)
+        return Admission(False, ticket, position, retry_after)
+
+    def _advance(self, queue: ShowtimeQueue, now: float):
+        """Refill credit for the time elapsed and move waiting tickets up"""
+        queue.credit = min(queue.credit + (now - queue.updated) * self.rate, float(self.burst))
+        queue.updated = now
+
+        while queue.waiting and queue.credit >= 1:
+            ticket = queue.waiting.popleft()
+            queue.served = ticket.number
+            if now - ticket.last_seen > ADMISSION_ABANDON_SECONDS:
+                # Nobody is polling for this one; do not spend a slot on it
+                self._tickets.pop(ticket.token, None)
+                continue
+            queue.credit -= 1
+            ticket.admitted_at = now
+            queue.admitted.append(ticket)
+
+        while queue.admitted and now - queue.admitted[0].admitted_at > ADMISSION_PASS_SECONDS:
+            self._tickets.pop(queue.admitted.popleft().token, None)
+
+controller = AdmissionController()
@@ -0,0 +1,117 @@
+"""
+Occupancy and revenue analytics for the admin dashboard
+The showtimes in the range come with their sales from showtime_sales_stats
+(kept current by crud with every booking) in one query, read in bulk
+through COPY as CSV straight into a DataFrame, with no Python object per
+row; every breakdown (movie, cinema, screen type, show day) is then a
+vectorized group-by over it, so a year of the whole chain never touches
+the bookings table. The fill curve gives, at each point of
+FILL_CURVE_HOURS, the share of capacity already sold that many hours
+before the show; at 0 it is the occupancy.
+"""
+
+import io
+from datetime import date
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+import crud
+import seatmap
+from models import Cinema, Movie, Screen, SALES_HOURS_AHEAD
+
+FILL_CURVE_HOURS = SALES_HOURS_AHEAD[::-1]
+# Seats sold per bucket, furthest ahead first; a curve point adds up its
+# bucket and every one before it
+_BUCKETS = [f"seats_{hours}h" for hours in FILL_CURVE_HOURS]
+_SUMS = ["bookings", "seats_sold", "revenue"] + _BUCKETS
+_IDS = ["movie_id", "cinema_id", "screen_id"]
+
+def _read_frame(db: Session, query) -> pd.DataFrame:
+    """Rows of query, copied out as CSV and parsed by pandas"""
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    cursor = db.connection().connection.cursor()
+    try:
+        sql = cursor.mogrify(str(compiled), compiled.params).decode()
+        buffer = io.StringIO()
+        cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+    finally:
+        cursor.close()
+    buffer.seek(0)
+    return pd.read_csv(buffer, dtype={"show_date": str})
+
+def _screens(db: Session, screen_ids) -> pd.DataFrame:
+    """screen_type and seat capacity per screen id"""
+    rows = db.query(Screen.id, Screen.screen_type, Screen.layout, Screen.total_seats).filter(
+        Screen.id.in_(screen_ids)
+    ).all()
+    return pd.DataFrame(
+        [(row.id, row.screen_type or "", seatmap.get_layout(row.layout, row.total_seats).capacity) for row in rows],
+        columns=["screen_id", "screen_type", "capacity"]
+    ).set_index("screen_id")
+
+def _labels(db: Session, model, label, ids) -> dict:
+    return dict(db.query(model.id, label).filter(model.id.in_(ids)).all())
+
+def _breakdown(sales: pd.DataFrame, by: str) -> pd.DataFrame:
+    """Totals, occupancy, average ticket price and fill curve per value of `by`"""
+    grouped = sales.groupby(by)
+    result = grouped[["capacity"] + _SUMS].sum()
+    result.insert(0, "showtimes", grouped.size())
+    # Shares are NaN (None in the response) where there is nothing to divide by
+    capacity = result["capacity"].replace(0, np.nan).to_numpy(dtype=float)
+    ahead = np.cumsum(result[_BUCKETS].to_numpy(dtype=float), axis=1)
+    result["occupancy"] = result["seats_sold"] / capacity
+    result["avg_ticket_price"] = result["revenue"] / result["seats_sold"].replace(0, np.nan)
+    result["fill_curve"] = list(np.round(ahead / capacity[:, None], 4))
+    return result
+
+def _groups(frame: pd.DataFrame, labels: Optional[dict] = None) -> list:
+    groups = []
+    for key, row in zip(frame.index, frame.itertuples(index=False)):
+        groups.append({
+            "key": str(key),
+            "label": labels.get(key, str(key)) if labels is not None else str(key),
+            "showtimes": int(row.showtimes),
+            "capacity": int(row.capacity),
+            "bookings": int(row.bookings),
+            "seats_sold": int(row.seats_sold),
+            "occupancy": None if pd.isna(row.occupancy) else round(float(row.occupancy), 4),
+            "revenue": round(float(row.revenue), 2),
+            "avg_ticket_price": None if pd.isna(row.avg_ticket_price) else round(float(row.avg_ticket_price), 2),
+            "fill_curve": [
+                {"hours_before": hours, "occupancy": None if np.isnan(share) else float(share)}
+                for hours, share in zip(FILL_CURVE_HOURS, row.fill_curve)
+            ]
+        })
+    return groups
+
+def booking_analytics(db: Session, date_from: date, date_to: date,
+                      cinema_id: Optional[int] = None, movie_id: Optional[int] = None) -> dict:
+    """Occupancy, revenue, average ticket price and fill curves for the
+    showtimes on [date_from, date_to], overall and per movie, cinema, screen
+    type and show day; cancelled bookings are left out"""
+    sales = _read_frame(db, crud.showtime_sales_query(
+        db, date_from, date_to, cinema_id=cinema_id, movie_id=movie_id
+    ))
+    # Ids parse as floats when any is NULL
+    sales[_IDS] = sales[_IDS].astype("Int64")
+    screens = _screens(db, sales["screen_id"].dropna().unique().tolist())
+    sales["screen_type"] = sales["screen_id"].map(screens["screen_type"]).fillna("")
+    sales["capacity"] = sales["screen_id"].map(screens["capacity"]).fillna(0)
+    sales["all"] = "all"
+
+    by_movie = _breakdown(sales, "movie_id").sort_values("revenue", ascending=False)
+    by_cinema = _breakdown(sales, "cinema_id").sort_values("revenue", ascending=False)
+    totals = _groups(_breakdown(sales, "all"))
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "totals": totals[0] if totals else None,
+        "by_movie": _groups(by_movie, _labels(db, Movie, Movie.title, by_movie.index.tolist())),
+        "by_cinema": _groups(by_cinema, _labels(db, Cinema, Cinema.name, by_cinema.index.tolist())),
+        "by_screen_type": _groups(_breakdown(sales, "screen_type").sort_values("revenue", ascending=False)),
+        "by_day": _groups(_breakdown(sales, "show_date").sort_index())
+    }
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Timing benchmark for the admin analytics endpoint
+Seeds a year of chain-wide showtimes (benchmark cinemas, screens and
+movies) with generated bookings made up to two weeks before each show and
+rebuilds showtime_sales_stats from them, then times
+analytics.booking_analytics over that year against a replay that reads
+every booking and sums it per movie in a Python loop. Both must report the
+same seats and revenue per movie. The generated rows are deleted
+afterwards.
+
+Run against a local Postgres (never production):
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/analytics.py --cinemas 10
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import SessionLocal, engine, create_tables
+import analytics
+import crud
+
+BENCH_NAME = "Analytics Bench"
+SCREEN_TYPES = ["2D", "2D", "3D", "IMAX"]
+SHOW_TIMES = ["10:00", "13:00", "16:00", "19:00", "22:00"]
+# Far from any real showtime, so the timed range only covers generated rows
+FIRST_DAY = date(2090, 1, 1)
+
+def seed(cinemas: int, screens: int, movies: int, days: int, bookings_per_show: int):
+    """Benchmark cinemas with `screens` screens each, showing SHOW_TIMES
+    every day of the range, and about bookings_per_show bookings per show
+    (1-4 seats each, a tenth of them cancelled)"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO movies (title, status, duration) "
+            "SELECT :name || ' movie ' || g, 'showing', 120 FROM generate_series(1, :n) AS g"
+        ), {"name": BENCH_NAME, "n": movies})
+        conn.execute(text(
+            "INSERT INTO cinemas (name, province) "
+            "SELECT :name || ' cinema ' || g, 'Bench' FROM generate_series(1, :n) AS g"
+        ), {"name": BENCH_NAME, "n": cinemas})
+        conn.execute(text(
+            "INSERT INTO screens (cinema_id, screen_number, screen_type, total_seats) "
+            "SELECT c.id, g, (:types)[1 + (g - 1) % cardinality(:types)], 150 "
+            "FROM cinemas c CROSS JOIN generate_series(1, :n) AS g WHERE c.province = 'Bench'"
+        ), {"types": SCREEN_TYPES, "n": screens})
+        conn.execute(text(
+            "INSERT INTO showtimes (movie_id, cinema_id, screen_id, show_date, show_time, price, available_seats) "
+            "SELECT (SELECT array_agg(id) FROM movies WHERE title LIKE :name || '%')"
+            "[1 + (s.id + d) % :movies], s.cinema_id, s.id, :first + d, t::time, 90000, 150 "
+            "FROM screens s JOIN cinemas c ON c.id = s.cinema_id AND c.province = 'Bench' "
+            "CROSS JOIN generate_series(0, :days - 1) AS d CROSS JOIN unnest(CAST(:times AS text[])) AS t"
+        ), {"name": BENCH_NAME, "movies": movies, "first": FIRST_DAY, "days": days, "times": SHOW_TIMES})
+        conn.execute(text(
+            "INSERT INTO bookings (showtime_id, customer_name, customer_phone, customer_email, "
+            "seats, total_amount, booking_code, status, payment_method, created_at) "
+            "SELECT st.id, 'Bench', '0900000000', 'bench@example.com', "
+            "(ARRAY['A1', 'A2', 'A3', 'A4'])[1:n.seats], 90000 * n.seats, 'BA' || st.id || '-' || g, "
+            "CASE WHEN random() < 0.9 THEN 'confirmed' ELSE 'cancelled' END, 'cash', "
+            "st.show_date + st.show_time - power(random(), 2) * interval '14 days' "
+            "FROM showtimes st JOIN cinemas c ON c.id = st.cinema_id AND c.province = 'Bench' "
+            "CROSS JOIN generate_series(1, :n) AS g "
+            "CROSS JOIN LATERAL (SELECT 1 + floor(random() * 4)::int + 0 * g AS seats) AS n "
+            "WHERE random() < 0.5"
+        ), {"n": bookings_per_show * 2})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in ("showtimes", "bookings"):
+            conn.execute(text(f"VACUUM ANALYZE {table}"))
+
+def rebuild() -> int:
+    """The seeded bookings bypass crud, so the rollup is regenerated from them"""
+    db = SessionLocal()
+    try:
+        rows = crud.rebuild_showtime_sales(db)
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+def teardown():
+    with engine.begin() as conn:
+        bench = "SELECT id FROM cinemas WHERE province = 'Bench'"
+        conn.execute(text(
+            f"DELETE FROM showtime_sales_stats WHERE showtime_id IN (SELECT id FROM showtimes WHERE cinema_id IN ({bench}))"
+        ))
+        conn.execute(text(
+            f"DELETE FROM bookings WHERE showtime_id IN (SELECT id FROM showtimes WHERE cinema_id IN ({bench}))"
+        ))
+        conn.execute(text(f"DELETE FROM showtimes WHERE cinema_id IN ({bench})"))
+        conn.execute(text(f"DELETE FROM screens WHERE cinema_id IN ({bench})"))
+        conn.execute(text("DELETE FROM cinemas WHERE province = 'Bench'"))
+        conn.execute(text("DELETE FROM movies WHERE title LIKE :name"), {"name": BENCH_NAME + "%"})
+
+def row_by_row(date_from: date, date_to: date) -> dict:
+    """{movie_id: (seats, revenue)} summed booking by booking in Python"""
+    totals = {}
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT st.movie_id, b.seats, b.total_amount FROM bookings b "
+            "JOIN showtimes st ON st.id = b.showtime_id "
+            "WHERE st.show_date BETWEEN :date_from AND :date_to AND b.status <> 'cancelled'"
+        ), {"date_from": date_from, "date_to": date_to})
+        for movie_id, seats, amount in rows:
+            sold, revenue = totals.get(movie_id, (0, 0))
+            totals[movie_id] = (sold + len(seats), revenue + float(amount))
+    return totals
+
+def vectorized(date_from: date, date_to: date) -> dict:
+    db = SessionLocal()
+    try:
+        return analytics.booking_analytics(db, date_from, date_to)
+    finally:
+        db.close()
+
+def timed(call, repeat: int):
+    """(result, per-run milliseconds) over repeat runs after one warm-up"""
+    result = call()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+def report(label: str, samples):
+    print(f"   {label:<42} median={statistics.median(samples):8.1f} ms  min={min(samples):8.1f} ms")
+
+def same(reference: dict, result: dict) -> bool:
+    by_movie = {int(group["key"]): (group["seats_sold"], group["revenue"]) for group in result["by_movie"]}
+    return {movie_id: sold for movie_id, (sold, _) in reference.items()} == {
+        movie_id: sold for movie_id, (sold, _) in by_movie.items() if sold
+    } and all(abs(by_movie[movie_id][1] - revenue) < 0.01 for movie_id, (_, revenue) in reference.items())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cinemas", type=int, default=10, help="Generated cinemas")
+    parser.add_argument("--screens", type=int, default=6, help="Screens per cinema")
+    parser.add_argument("--movies", type=int, default=60, help="Generated movies")
+    parser.add_argument("--days", type=int, default=365, help="Days of showtimes")
+    parser.add_argument("--bookings", type=int, default=20, help="Average bookings per showtime")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    create_tables()
+    try:
+        started = time.perf_counter()
+        seed(args.cinemas, args.screens, args.movies, args.days, args.bookings)
+        with engine.connect() as conn:
+            showtimes, bookings = conn.execute(text(
+                "SELECT count(DISTINCT st.id), count(b.id) FROM showtimes st "
+                "JOIN cinemas c ON c.id = st.cinema_id AND c.province = 'Bench' "
+                "LEFT JOIN bookings b ON b.showtime_id = st.id"
+            )).one()
+        print(f"Seeded {showtimes:,} showtimes and {bookings:,} bookings in {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        rows = rebuild()
+        print(f"Rebuilt showtime_sales_stats ({rows:,} rows) in {time.perf_counter() - started:.1f} s\n")
+
+        date_from, date_to = FIRST_DAY, FIRST_DAY + timedelta(days=args.days - 1)
+        print(f"Analytics for {date_from} - {date_to}")
+        reference, reference_samples = timed(lambda: row_by_row(date_from, date_to), args.repeat)
+        result, samples = timed(lambda: vectorized(date_from, date_to), args.repeat)
+        report("every booking summed in Python", reference_samples)
+        report("1 query on showtime_sales_stats + pandas", samples)
+        print(f"   same figures: {same(reference, result)}")
+        print(f"   under 1 s: {statistics.median(samples) < 1000}")
+    finally:
+        teardown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for seat reservation
+Fires overlapping bookings at one showtime from many threads, then checks
+that no seat was sold twice and that available_seats matches the seat set.
+
+Run against a local Postgres (never production):
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/booking_concurrency.py
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as dt_time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal, create_tables
+from models import Movie, Cinema, Screen, Showtime, ShowtimeSeat, Booking
+from schemas import BookingCreate
+import crud
+import seatmap
+
+def seat_codes(total_seats: int):
+    """Every seat of the default layout for a screen of total_seats"""
+    layout = seatmap.SeatLayout.default(total_seats)
+    return [layout.code_of(bit) for bit in range(layout.size) if layout.is_valid(layout.code_of(bit))]
+
+def setup_showtime(total_seats: int):
+    """Create an isolated movie/cinema/screen/showtime for the run"""
+    db = SessionLocal()
+    try:
+        movie = Movie(title="Benchmark Premiere", status="showing", duration=120)
+        cinema = Cinema(name="Benchmark Cinema", province="Bench")
+        db.add_all([movie, cinema])
+        db.flush()
+        screen = Screen(cinema_id=cinema.id, screen_number=1, screen_type="IMAX", total_seats=total_seats)
+        db.add(screen)
+        db.flush()
+        showtime = Showtime(
+            movie_id=movie.id,
+            cinema_id=cinema.id,
+            screen_id=screen.id,
+            show_date=date.today(),
+            show_time=dt_time(20, 0),
+            price=Decimal("100000"),
+            available_seats=total_seats
+        )
+        db.add(showtime)
+        db.commit()
+        return movie.id, cinema.id, screen.id, showtime.id
+    finally:
+        db.close()
+
+def teardown(movie_id: int, cinema_id: int, screen_id: int, showtime_id: int):
+    db = SessionLocal()
+    try:
+        db.query(ShowtimeSeat).filter(ShowtimeSeat.showtime_id == showtime_id).delete()
+        db.query(Booking).filter(Booking.showtime_id == showtime_id).delete()
+        db.query(Showtime).filter(Showtime.id == showtime_id).delete()
+        db.query(Screen).filter(Screen.id == screen_id).delete()
+        db.query(Cinema).filter(Cinema.id == cinema_id).delete()
+        db.query(Movie).filter(Movie.id == movie_id).delete()
+        # Drop the deleted bookings from the rollups
+        crud.rebuild_daily_stats(db)
+        crud.rebuild_showtime_sales(db)
+        db.commit()
+    finally:
+        db.close()
+
+def attempt(showtime_id: int, seats):
+    """Try one booking in its own session; return True when it commits"""
+    db = SessionLocal()
+    try:
+        crud.create_booking(db, BookingCreate(
+            showtime_id=showtime_id,
+            customer_name="Bench",
+            customer_phone="0900000000",
+            customer_email="bench@example.com",
+            seats=seats,
+            total_amount=Decimal("100000") * len(seats)
+        ))
+        return True
+    except ValueError:
+        return False
+    finally:
+        db.close()
+
+def verify(showtime_id: int, total_seats: int):
+    """Return a list of invariant violations (empty when consistent)"""
+    db = SessionLocal()
+    try:
+        showtime = crud.get_showtime(db, showtime_id)
+        bookings = db.query(Booking).filter(
+            Booking.showtime_id == showtime_id,
+            Booking.status == "confirmed"
+        ).all()
+        sold = Counter(seat for b in bookings for seat in b.seats)
+        problems = [f"seat {seat} sold {n} times" for seat, n in sold.items() if n > 1]
+        booked = [code for (code,) in db.query(ShowtimeSeat.seat_code).filter(
+            ShowtimeSeat.showtime_id == showtime_id,
+            ShowtimeSeat.status == "booked"
+        )]
+        if len(booked) != len(set(booked)):
+            problems.append("showtime_seats contains duplicates")
+        if set(booked) != set(sold):
+            problems.append("showtime_seats does not match confirmed bookings")
+        layout = crud.get_showtime_layout(db, showtime_id)
+        if set(layout.codes(layout.from_bits(showtime.seat_bitmap))) != set(sold):
+            problems.append("seat_bitmap does not match confirmed bookings")
+        if showtime.available_seats != total_seats - len(sold):
+            problems.append(
+                f"available_seats={showtime.available_seats}, expected {total_seats - len(sold)}"
+            )
+        return len(sold), problems
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seats", type=int, default=400, help="Seats on the screen")
+    parser.add_argument("--attempts", type=int, default=1000, help="Booking attempts")
+    parser.add_argument("--workers", type=int, default=25, help="Concurrent clients (<= pool size)")
+    parser.add_argument("--max-group", type=int, default=4, help="Max seats per booking")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    create_tables()
+    rng = random.Random(args.seed)
+    codes = seat_codes(args.seats)
+    # Concentrate demand on the front half so conflicts are frequent
+    hot = codes[: max(len(codes) // 2, 1)]
+    requests = [rng.sample(hot, rng.randint(1, min(args.max_group, len(hot)))) for _ in range(args.attempts)]
+
+    ids = setup_showtime(args.seats)
+    showtime_id = ids[3]
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(lambda seats: attempt(showtime_id, seats), requests))
+        elapsed = time.perf_counter() - started
+
+        committed = sum(results)
+        seats_sold, problems = verify(showtime_id, args.seats)
+        print(f"attempts:       {args.attempts} ({args.workers} concurrent)")
+        print(f"committed:      {committed}")
+        print(f"rejected:       {args.attempts - committed}")
+        print(f"seats sold:     {seats_sold}/{args.seats}")
+        print(f"elapsed:        {elapsed:.2f}s")
+        print(f"attempts/sec:   {args.attempts / elapsed:.1f}")
+        print(f"bookings/sec:   {committed / elapsed:.1f}")
+        if problems:
+            print("❌ Consistency check failed:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print("✅ No double booking; available_seats and seat_bitmap consistent with seat set")
+    finally:
+        teardown(*ids)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Memory and pool benchmark for the streaming booking export
+Seeds a large bookings table, then exports it through booking_export.stream
+as CSV and NDJSON while another thread keeps running small queries on the
+request pool. Reports rows and bytes sent, the peak Python memory of the
+export (tracemalloc, in a separate untimed pass) next to loading the same
+rows with .all(), the request pool connections the export held and the
+latency of the concurrent queries. The generated rows are deleted afterwards.
+
+Run against a local Postgres (never production):
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/booking_export.py --bookings 1000000
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import SessionLocal, engine, stream_engine, create_tables
+from schemas import ExportFormat
+import booking_export
+import crud
+
+from booking_concurrency import setup_showtime, teardown
+from dashboard_stats import seed
+
+def probe(stop: threading.Event, samples: list):
+    """Time SELECT 1 round trips on the request pool until stop is set"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+        finally:
+            db.close()
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.01)
+
+def drain(statement, export_format: ExportFormat, on_chunk=None):
+    """(rows, bytes) of one export, calling on_chunk after every chunk"""
+    rows = size = 0
+    for chunk in booking_export.stream(statement, export_format):
+        size += len(chunk.encode())
+        rows += chunk.count("\n")
+        if on_chunk:
+            on_chunk()
+    if export_format == ExportFormat.CSV:
+        rows -= 1  # Header
+    return rows, size
+
+def peak_memory(statement, export_format: ExportFormat) -> float:
+    """Peak MiB of one export, timed apart as tracemalloc slows it down"""
+    tracemalloc.start()
+    try:
+        drain(statement, export_format)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def export(statement, export_format: ExportFormat):
+    """(rows, bytes, seconds, most request pool connections held, probe
+    latencies) of one export while probe runs on the request pool"""
+    stop, samples, checked_out = threading.Event(), [], []
+    prober = threading.Thread(target=probe, args=(stop, samples))
+    prober.start()
+    started = time.perf_counter()
+    try:
+        rows, size = drain(statement, export_format, lambda: checked_out.append(engine.pool.checkedout()))
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        prober.join()
+    # The prober holds at most one connection at a time
+    return rows, size, elapsed, max(max(checked_out, default=0) - 1, 0), samples
+
+def load_all(statement):
+    """Peak MiB of fetching the same rows in one list"""
+    tracemalloc.start()
+    try:
+        with stream_engine.connect() as conn:
+            rows = conn.execute(statement).all()
+        return len(rows), tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=1_000_000, help="Generated bookings")
+    args = parser.parse_args()
+
+    create_tables()
+    ids = setup_showtime(100)
+    try:
+        started = time.perf_counter()
+        seed(ids[3], args.bookings, 0)
+        print(f"Seeded {args.bookings:,} bookings in {time.perf_counter() - started:.1f} s\n")
+
+        statement = crud.bookings_export_query(date.today() - timedelta(days=730), date.today())
+        for export_format in ExportFormat:
+            rows, size, elapsed, held, samples = export(statement, export_format)
+            peak = peak_memory(statement, export_format)
+            print(f"{export_format.value}: {rows:,} rows, {size / 2**20:,.1f} MiB in {elapsed:.1f} s "
+                  f"({rows / elapsed:,.0f} rows/s)")
+            print(f"   peak memory {peak:8.1f} MiB, request pool connections held {held}")
+            print(f"   concurrent SELECT 1 on the pool: median={statistics.median(samples):.1f} ms "
+                  f"max={max(samples):.1f} ms over {len(samples)} queries")
+
+        rows, peak = load_all(statement)
+        print(f"Loading the {rows:,} rows with .all(): peak memory {peak:8.1f} MiB")
+    finally:
+        teardown(*ids)
+
+if __name__ == "__main__":
+    main()
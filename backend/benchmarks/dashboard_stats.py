@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Timing benchmark for the admin dashboard aggregates
+Seeds a large bookings table (and users table) with generated rows spread
+over two years and rebuilds the daily rollup from them, then times
+crud.get_booking_stats (one query on booking_daily_stats) and
+crud.get_user_stats (one aggregate query) against a replay of the original
+nine COUNT/SUM queries that matched the current month with
+extract(month/year). Both must return the same figures. The generated rows
+are deleted afterwards.
+
+Run against a local Postgres (never production):
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/dashboard_stats.py --bookings 2000000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import SessionLocal, engine, create_tables
+import crud
+
+from booking_concurrency import setup_showtime, teardown
+
+BENCH_EMAIL = "bench-stats-%@example.com"
+
+LEGACY_USER_STATS = {
+    "total_users": "SELECT count(*) FROM users WHERE role = 'USER'",
+    "active_users": "SELECT count(*) FROM users WHERE role = 'USER' AND is_active",
+    "total_admins": "SELECT count(*) FROM users WHERE role IN ('ADMIN', 'SUPER_ADMIN')",
+    "users_this_month": "SELECT count(*) FROM users WHERE role = 'USER' "
+                        "AND extract(month FROM created_at) = extract(month FROM now()) "
+                        "AND extract(year FROM created_at) = extract(year FROM now())",
+}
+
+LEGACY_BOOKING_STATS = {
+    "total_bookings": "SELECT count(*) FROM bookings",
+    "confirmed_bookings": "SELECT count(*) FROM bookings WHERE status = 'confirmed'",
+    "cancelled_bookings": "SELECT count(*) FROM bookings WHERE status = 'cancelled'",
+    "bookings_this_month": "SELECT count(*) FROM bookings "
+                           "WHERE extract(month FROM created_at) = extract(month FROM now()) "
+                           "AND extract(year FROM created_at) = extract(year FROM now())",
+    "revenue_this_month": "SELECT coalesce(sum(total_amount), 0) FROM bookings WHERE status = 'confirmed' "
+                          "AND extract(month FROM created_at) = extract(month FROM now()) "
+                          "AND extract(year FROM created_at) = extract(year FROM now())",
+}
+
+def seed(showtime_id: int, bookings: int, users: int):
+    """Generated bookings and users, created at random times over the last two years"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO bookings (showtime_id, customer_name, customer_phone, customer_email, "
+            "seats, total_amount, booking_code, status, payment_method, created_at) "
+            "SELECT :showtime_id, 'Bench', '0900000000', 'bench' || g || '@example.com', "
+            "ARRAY['A1'], 100000, 'BS' || g, "
+            "CASE WHEN random() < 0.8 THEN 'confirmed' ELSE 'cancelled' END, 'cash', "
+            "now() - random() * interval '730 days' "
+            "FROM generate_series(1, :n) AS g"
+        ), {"showtime_id": showtime_id, "n": bookings})
+        conn.execute(text(
+            "INSERT INTO users (email, hashed_password, full_name, role, is_active, created_at) "
+            "SELECT 'bench-stats-' || g || '@example.com', 'x', 'Bench', "
+            "CAST(CASE WHEN g % 100 = 0 THEN 'ADMIN' ELSE 'USER' END AS userrole), random() < 0.9, "
+            "now() - random() * interval '730 days' "
+            "FROM generate_series(1, :n) AS g"
+        ), {"n": users})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE bookings"))
+        conn.execute(text("VACUUM ANALYZE users"))
+
+def remove_users():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": BENCH_EMAIL})
+
+def rebuild(db) -> int:
+    """The seeded bookings bypass crud, so the rollup is regenerated from them"""
+    rows = crud.rebuild_daily_stats(db)
+    db.commit()
+    return rows
+
+def legacy(queries: dict) -> dict:
+    with engine.connect() as conn:
+        return {name: conn.execute(text(sql)).scalar() for name, sql in queries.items()}
+
+def in_session(call):
+    db = SessionLocal()
+    try:
+        return call(db)
+    finally:
+        db.close()
+
+def timed(call, repeat: int):
+    """(result, per-run milliseconds) over repeat runs after one warm-up"""
+    result = call()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return result, samples
+
+def report(label: str, samples):
+    print(f"   {label:<42} median={statistics.median(samples):8.1f} ms  min={min(samples):8.1f} ms")
+
+def same(legacy_result: dict, result: dict) -> bool:
+    return all(float(legacy_result[name]) == float(result[name]) for name in legacy_result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=2_000_000, help="Generated bookings")
+    parser.add_argument("--users", type=int, default=200_000, help="Generated users")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant")
+    args = parser.parse_args()
+
+    create_tables()
+    ids = setup_showtime(100)
+    try:
+        started = time.perf_counter()
+        seed(ids[3], args.bookings, args.users)
+        print(f"Seeded {args.bookings:,} bookings and {args.users:,} users in {time.perf_counter() - started:.1f} s")
+        started = time.perf_counter()
+        rows = in_session(rebuild)
+        print(f"Rebuilt booking_daily_stats ({rows:,} rows) in {time.perf_counter() - started:.1f} s\n")
+
+        print("Booking stats")
+        legacy_bookings, legacy_samples = timed(lambda: legacy(LEGACY_BOOKING_STATS), args.repeat)
+        bookings, samples = timed(lambda: in_session(crud.get_booking_stats), args.repeat)
+        report(f"{len(LEGACY_BOOKING_STATS)} queries with extract() (original)", legacy_samples)
+        report("1 query on booking_daily_stats", samples)
+        print(f"   same figures: {same(legacy_bookings, bookings)}")
+
+        print("User stats")
+        legacy_users, legacy_samples = timed(lambda: legacy(LEGACY_USER_STATS), args.repeat)
+        users, samples = timed(lambda: in_session(crud.get_user_stats), args.repeat)
+        report(f"{len(LEGACY_USER_STATS)} queries with extract() (original)", legacy_samples)
+        report("1 query, COUNT(*) FILTER + range", samples)
+        print(f"   same figures: {same(legacy_users, users)}")
+    finally:
+        remove_users()
+        teardown(*ids)
+
+if __name__ == "__main__":
+    main()
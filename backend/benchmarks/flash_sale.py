@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Flash-sale load test for booking admission control
+Hundreds of buyers rush one showtime through POST /api/bookings (following
+the waiting-room protocol) while a browsing client keeps requesting
+GET /api/movies; reports browsing latency percentiles and sale outcomes.
+
+Run against a local server backed by a scratch database (never production):
+    uvicorn server:app --port 8001
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/flash_sale.py --url http://localhost:8001
+
+For a baseline without admission control, start the server with
+ADMISSION_RATE=100000 ADMISSION_BURST=100000 BOOKING_MAX_CONCURRENCY=1000.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from booking_concurrency import seat_codes, setup_showtime, teardown, verify
+
+async def buyer(client: httpx.AsyncClient, url: str, showtime_id: int, seats, outcomes: Counter, waits: list):
+    started = time.perf_counter()
+    body = {
+        "showtime_id": showtime_id,
+        "customer_name": "Bench",
+        "customer_phone": "0900000000",
+        "customer_email": "bench@example.com",
+        "seats": seats,
+        "total_amount": 100000 * len(seats)
+    }
+    headers = {}
+    try:
+        while True:
+            response = await client.post(f"{url}/api/bookings/", json=body, headers=headers)
+            if response.status_code == 202:
+                ticket = response.json()
+                outcomes["queued"] += 1
+                while ticket["status"] != "admitted":
+                    await asyncio.sleep(ticket["retry_after"])
+                    ticket = (await client.get(f"{url}/api/bookings/queue/{ticket['token']}")).json()
+                headers = {"X-Queue-Token": ticket["token"]}
+                continue
+            if response.status_code == 503:
+                outcomes["shed"] += 1
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+                continue
+            outcomes["booked" if response.status_code == 200 else f"http {response.status_code}"] += 1
+            waits.append(time.perf_counter() - started)
+            return
+    except httpx.HTTPError as e:
+        outcomes[type(e).__name__] += 1
+
+def browser(url: str, stop, results, rate: float):
+    """Browse from a separate process so buyer traffic in this one cannot skew the timings"""
+    latencies, errors = [], Counter()
+    with httpx.Client(timeout=30.0) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                response = client.get(f"{url}/api/movies/")
+                if response.status_code != 200:
+                    errors[f"http {response.status_code}"] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(1 / rate)
+    results.put((latencies, dict(errors)))
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+async def rush(args, showtime_id: int):
+    rng = random.Random(args.seed)
+    codes = seat_codes(args.seats)
+    orders = [rng.sample(codes, rng.randint(1, args.max_group)) for _ in range(args.buyers)]
+    outcomes, waits = Counter(), []
+    limits = httpx.Limits(max_connections=args.buyers + 10)
+    async with httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(args.timeout)) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(buyer(client, args.url, showtime_id, seats, outcomes, waits) for seats in orders))
+        elapsed = time.perf_counter() - started
+    return outcomes, waits, elapsed
+
+def run(args, showtime_id: int):
+    stop, results = multiprocessing.Event(), multiprocessing.Queue()
+    browsers = [
+        multiprocessing.Process(target=browser, args=(args.url, stop, results, args.browse_rate))
+        for _ in range(args.browsers)
+    ]
+    for process in browsers:
+        process.start()
+    time.sleep(1)
+    outcomes, waits, elapsed = asyncio.run(rush(args, showtime_id))
+    stop.set()
+    latencies, errors = [], Counter()
+    for _ in browsers:
+        browsed, failed = results.get()
+        latencies.extend(browsed)
+        errors.update(failed)
+    for process in browsers:
+        process.join()
+    return outcomes, waits, latencies, errors, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8001", help="Base URL of a running server")
+    parser.add_argument("--seats", type=int, default=400, help="Seats on the screen")
+    parser.add_argument("--buyers", type=int, default=500, help="Concurrent buyers in the rush")
+    parser.add_argument("--max-group", type=int, default=4, help="Max seats per booking")
+    parser.add_argument("--browsers", type=int, default=4, help="Concurrent browsing clients (one process each)")
+    parser.add_argument("--browse-rate", type=float, default=10.0, help="Requests/sec per browsing client")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    ids = setup_showtime(args.seats)
+    try:
+        outcomes, waits, latencies, errors, elapsed = run(args, ids[3])
+        seats_sold, problems = verify(ids[3], args.seats)
+        print(f"buyers:              {args.buyers} over {elapsed:.1f}s")
+        print(f"outcomes:            {dict(outcomes)}")
+        print(f"seats sold:          {seats_sold}/{args.seats}")
+        if waits:
+            print(f"buyer wait p50/p99:  {statistics.median(waits):.1f}s / {percentile(waits, 0.99):.1f}s")
+        print(f"browse requests:     {len(latencies)} ({dict(errors) or 'no errors'})")
+        if latencies:
+            print(f"browse p50/p99/max:  {statistics.median(latencies):.0f} / "
+                  f"{percentile(latencies, 0.99):.0f} / {max(latencies):.0f} ms")
+        if problems:
+            print("❌ Consistency check failed:")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        if errors:
+            print("❌ Browsing requests failed during the sale")
+            sys.exit(1)
+        print("✅ Browsing stayed available and no seat was sold twice")
+    finally:
+        teardown(*ids)
+
+if __name__ == "__main__":
+    main()
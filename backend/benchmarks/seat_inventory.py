@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Write amplification and latency benchmark for the showtime_seats inventory
+Fills one large screen two seats at a time through crud.create_booking and
+compares it with the legacy booked_seats array rewrite (replayed on a
+scratch table), reporting WAL bytes and latency per booking as the screen
+fills, then cancels every booking.
+
+Run against a local Postgres (never production):
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/seat_inventory.py --seats 400
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+from database import SessionLocal, engine, create_tables
+from schemas import BookingCreate
+import crud
+
+from booking_concurrency import seat_codes, setup_showtime, teardown
+
+def wal_position(conn):
+    return conn.execute(text("SELECT pg_current_wal_insert_lsn()")).scalar()
+
+def wal_bytes(conn, start):
+    return int(conn.execute(
+        text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), :start)"), {"start": start}
+    ).scalar())
+
+def summarize(label, samples):
+    """samples: list of (latency_seconds, wal_bytes)"""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    wal = [s[1] for s in samples]
+    quarter = max(len(samples) // 4, 1)
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    print(f"{label}")
+    print(f"   latency ms     p50={statistics.median(latencies):.2f}  p99={p99:.2f}")
+    print(f"   WAL bytes/op   mean={statistics.mean(wal):.0f}  "
+          f"first quarter={statistics.mean(wal[:quarter]):.0f}  last quarter={statistics.mean(wal[-quarter:]):.0f}")
+
+def run_inventory(showtime_id, groups):
+    """Book then cancel every group through crud; return (book, cancel) samples"""
+    booked, cancelled, booking_ids = [], [], []
+    db = SessionLocal()
+    try:
+        with engine.connect() as probe:
+            for seats in groups:
+                start_lsn = wal_position(probe)
+                started = time.perf_counter()
+                b = crud.create_booking(db, BookingCreate(
+                    showtime_id=showtime_id,
+                    customer_name="Bench",
+                    customer_phone="0900000000",
+                    customer_email="bench@example.com",
+                    seats=seats,
+                    total_amount=Decimal("100000") * len(seats)
+                ))
+                booked.append((time.perf_counter() - started, wal_bytes(probe, start_lsn)))
+                booking_ids.append(b.id)
+            for booking_id in booking_ids:
+                start_lsn = wal_position(probe)
+                started = time.perf_counter()
+                crud.cancel_booking(db, booking_id)
+                cancelled.append((time.perf_counter() - started, wal_bytes(probe, start_lsn)))
+    finally:
+        db.close()
+    return booked, cancelled
+
+def run_legacy(showtime_id, total_seats, groups):
+    """Replay the same bookings as whole-array rewrites on a scratch table.
+    Each replayed booking also inserts its bookings row, as the old
+    create_booking did, so WAL figures compare like with like."""
+    booked, cancelled = [], []
+    with engine.connect() as conn, engine.connect() as probe:
+        # A regular table, not TEMP: temporary tables skip the WAL entirely
+        conn.execute(text(
+            "CREATE TABLE bench_legacy_showtimes "
+            "(id INTEGER PRIMARY KEY, available_seats INTEGER, booked_seats TEXT[])"
+        ))
+        conn.execute(text("INSERT INTO bench_legacy_showtimes VALUES (1, :n, '{}')"), {"n": total_seats})
+        conn.commit()
+        for seats in groups:
+            start_lsn = wal_position(probe)
+            started = time.perf_counter()
+            conn.execute(text(
+                "UPDATE bench_legacy_showtimes "
+                "SET booked_seats = booked_seats || CAST(:seats AS TEXT[]), available_seats = available_seats - :n "
+                "WHERE id = 1 AND available_seats >= :n AND NOT booked_seats && CAST(:seats AS TEXT[])"
+            ), {"seats": seats, "n": len(seats)})
+            conn.execute(text(
+                "INSERT INTO bookings (showtime_id, customer_name, customer_phone, customer_email, "
+                "seats, total_amount, booking_code, status, payment_method) "
+                "VALUES (:showtime_id, 'Bench', '0900000000', 'bench@example.com', "
+                "CAST(:seats AS TEXT[]), 100000, :code, 'confirmed', 'cash')"
+            ), {"showtime_id": showtime_id, "seats": seats, "code": f"BENCH{uuid.uuid4().hex[:10].upper()}"})
+            conn.commit()
+            booked.append((time.perf_counter() - started, wal_bytes(probe, start_lsn)))
+        for seats in groups:
+            start_lsn = wal_position(probe)
+            started = time.perf_counter()
+            conn.execute(text(
+                "UPDATE bench_legacy_showtimes "
+                "SET booked_seats = ARRAY(SELECT unnest(booked_seats) EXCEPT SELECT unnest(CAST(:seats AS TEXT[]))), "
+                "available_seats = available_seats + :n WHERE id = 1"
+            ), {"seats": seats, "n": len(seats)})
+            conn.commit()
+            cancelled.append((time.perf_counter() - started, wal_bytes(probe, start_lsn)))
+        conn.execute(text("DROP TABLE bench_legacy_showtimes"))
+        conn.commit()
+    return booked, cancelled
+
+def explain_status_lookup(showtime_id):
+    with engine.connect() as conn:
+        plan = conn.execute(text(
+            "EXPLAIN SELECT seat_code FROM showtime_seats WHERE showtime_id = :id AND status = 'booked'"
+        ), {"id": showtime_id}).scalars().all()
+    return plan
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seats", type=int, default=400, help="Seats on the screen (300+)")
+    parser.add_argument("--group", type=int, default=2, help="Seats per booking")
+    args = parser.parse_args()
+
+    create_tables()
+    codes = seat_codes(args.seats)
+    groups = [codes[i:i + args.group] for i in range(0, len(codes), args.group)]
+
+    ids = setup_showtime(args.seats)
+    try:
+        inventory_booked, inventory_cancelled = run_inventory(ids[3], groups)
+        legacy_booked, legacy_cancelled = run_legacy(ids[3], args.seats, groups)
+    finally:
+        teardown(*ids)
+
+    print(f"{len(groups)} bookings of {args.group} seats filling a {args.seats}-seat screen, then cancelled")
+    print("(inventory latency is end-to-end through crud and the ORM; the legacy replay is raw SQL)\n")
+    summarize("showtime_seats inventory: book", inventory_booked)
+    summarize("booked_seats array (legacy): book", legacy_booked)
+    summarize("showtime_seats inventory: cancel", inventory_cancelled)
+    summarize("booked_seats array (legacy): cancel", legacy_cancelled)
+    print("\nSeat status lookup plan:")
+    for line in explain_status_lookup(ids[3]):
+        print(f"   {line}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Fan-out benchmark for the seat event stream
+Opens many watchers on one showtime's /seats/stream, books seats through
+the API, and measures how long each booking takes to reach every watcher.
+
+Run against a local server backed by a scratch database (never production):
+    uvicorn server:app --port 8001
+    DATABASE_URL=postgresql://localhost/galaxy_bench python benchmarks/seat_stream_fanout.py --url http://localhost:8001
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from booking_concurrency import seat_codes, setup_showtime, teardown
+
+async def watch(client: httpx.AsyncClient, url: str, ready: asyncio.Event, arrivals: dict, expected: int):
+    """Read one stream until `expected` seat events arrived; record arrival times per version"""
+    received = 0
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                if event == "snapshot":
+                    ready.set()
+                elif event == "seats":
+                    version = json.loads(line[len("data: "):])["version"]
+                    arrivals.setdefault(version, []).append(time.perf_counter())
+                    received += 1
+                    if received == expected:
+                        return received
+    return received
+
+async def run(args, showtime_id: int):
+    codes = seat_codes(args.seats)
+    stream_url = f"{args.url}/api/showtimes/{showtime_id}/seats/stream"
+    limits = httpx.Limits(max_connections=args.watchers + 10)
+    timeout = httpx.Timeout(args.timeout)
+    arrivals = {}
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        ready = [asyncio.Event() for _ in range(args.watchers)]
+        watchers = [
+            asyncio.create_task(watch(client, stream_url, ready[i], arrivals, args.bookings))
+            for i in range(args.watchers)
+        ]
+        await asyncio.wait_for(asyncio.gather(*(event.wait() for event in ready)), args.timeout)
+
+        starts = []
+        for i in range(args.bookings):
+            seats = codes[i * args.group:(i + 1) * args.group]
+            started = time.perf_counter()
+            response = await client.post(f"{args.url}/api/bookings/", json={
+                "showtime_id": showtime_id,
+                "customer_name": "Bench",
+                "customer_phone": "0900000000",
+                "customer_email": "bench@example.com",
+                "seats": seats,
+                "total_amount": 100000 * len(seats)
+            })
+            response.raise_for_status()
+            starts.append(started)
+            await asyncio.sleep(args.interval)
+
+        received = await asyncio.wait_for(asyncio.gather(*watchers, return_exceptions=True), args.timeout)
+
+    latencies = []
+    for version, started in enumerate(starts, start=1):
+        latencies.extend((arrived - started) * 1000 for arrived in arrivals.get(version, []))
+    return received, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8001", help="Base URL of a running server")
+    parser.add_argument("--seats", type=int, default=400, help="Seats on the screen")
+    parser.add_argument("--watchers", type=int, default=1000, help="Concurrent stream subscribers")
+    parser.add_argument("--bookings", type=int, default=20, help="Bookings to publish")
+    parser.add_argument("--group", type=int, default=2, help="Seats per booking")
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between bookings (s)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    ids = setup_showtime(args.seats)
+    try:
+        received, latencies = asyncio.run(run(args, ids[3]))
+        failed = [r for r in received if not isinstance(r, int)]
+        delivered = sum(r for r in received if isinstance(r, int))
+        expected = args.watchers * args.bookings
+        print(f"watchers:         {args.watchers}")
+        print(f"bookings:         {args.bookings}")
+        print(f"events delivered: {delivered}/{expected}")
+        if latencies:
+            latencies.sort()
+            print(f"fan-out p50:      {statistics.median(latencies):.1f} ms")
+            print(f"fan-out p99:      {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+            print(f"fan-out max:      {latencies[-1]:.1f} ms")
+        if failed or delivered != expected:
+            print(f"❌ {len(failed)} watchers failed, {expected - delivered} events missing")
+            sys.exit(1)
+        print("✅ Every watcher received every booking")
+    finally:
+        teardown(*ids)
+
+if __name__ == "__main__":
+    main()
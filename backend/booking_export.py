@@ -0,0 +1,105 @@
+"""
+Streaming booking exports for finance reconciliation
+Rows come off a server-side cursor EXPORT_BATCH_ROWS at a time and each
+batch is encoded and sent before the next is fetched, so memory stays flat
+however many rows the range holds. Exports read on stream_engine, which
+opens a connection per export outside the request pool, and at most
+EXPORT_MAX_CONCURRENCY run at once per process, so a long download never
+holds a connection or a worker thread other requests are waiting for.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+from datetime import date, datetime, time
+from typing import Iterator
+
+from sqlalchemy import ARRAY, DateTime, Time
+
+from database import stream_engine
+from schemas import ExportFormat
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "1000"))
+EXPORT_MAX_CONCURRENCY = int(os.getenv("EXPORT_MAX_CONCURRENCY", "2"))
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENCY)
+
+def acquire_slot() -> bool:
+    """Reserve an export slot without waiting; False when all are taken.
+    Hand a reserved slot to open_stream, which releases it."""
+    return _slots.acquire(blocking=False)
+
+def _holding_slot(chunks: Iterator[str]) -> Iterator[str]:
+    try:
+        yield ""
+        yield from chunks
+    finally:
+        _slots.release()
+
+def _json_default(value):
+    """Values json can't encode: ISO dates and times; Decimals as strings so
+    amounts keep their exact cents"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return str(value)
+
+def _csv_converters(statement) -> dict:
+    """{column index: converter} for the columns csv would write differently
+    from the JSON export (ISO datetimes, seats space-separated in one cell),
+    picked once from the column types; everything else is written as is"""
+    converters = {}
+    for index, column in enumerate(statement.selected_columns):
+        if isinstance(column.type, ARRAY):
+            converters[index] = " ".join
+        elif isinstance(column.type, (DateTime, Time)):
+            converters[index] = _json_default
+    return converters
+
+def _csv_chunk(rows, converters: dict) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if converters:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for index, convert in converters.items():
+                if row[index] is not None:
+                    row[index] = convert(row[index])
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def _ndjson_chunk(rows, keys) -> str:
+    dumps = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    return "".join(dumps(dict(zip(keys, row))) + "\n" for row in rows)
+
+def stream(statement, export_format: ExportFormat) -> Iterator[str]:
+    """Encoded chunks of statement's rows, one per fetched batch, CSV with
+    a header row or one JSON object per line"""
+    with stream_engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_BATCH_ROWS).execute(statement)
+        keys = list(result.keys())
+        if export_format == ExportFormat.NDJSON:
+            for rows in result.partitions():
+                yield _ndjson_chunk(rows, keys)
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(keys)
+        yield buffer.getvalue()
+        converters = _csv_converters(statement)
+        for rows in result.partitions():
+            yield _csv_chunk(rows, converters)
+
+def open_stream(statement, export_format: ExportFormat) -> Iterator[str]:
+    """stream() for a request holding an export slot from acquire_slot. The
+    slot is released however the stream ends: finished, failed midway (the
+    response's background task is skipped then) or dropped unread."""
+    chunks = _holding_slot(stream(statement, export_format))
+    # A generator that never started would skip its finally when closed
+    next(chunks)
+    return chunks
@@ -0,0 +1,114 @@
+"""
+In-process cache for catalog responses (movies, cinemas, screens, news)
+Entries are rendered JSON bodies with their ETag, kept in LRU order up to
+CATALOG_CACHE_MAX_ENTRIES and dropped after CATALOG_CACHE_TTL_SECONDS.
+Catalog writes bump a version row in cache_versions inside their own
+transaction; every worker compares it with the version its entries were
+built from at most once per CATALOG_VERSION_CHECK_SECONDS and starts over
+when it moved, so a change made through one worker reaches the others
+within that interval. The version row's timestamp doubles as the
+Last-Modified of every catalog response.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Hashable, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from http_cache import CachedBody, content_etag
+from models import CacheVersion
+
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "512"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+CATALOG_VERSION_CHECK_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_SECONDS", "2"))
+CATALOG_VERSION_NAME = "catalog"
+
+def render(data) -> CachedBody:
+    """JSON body and ETag for a response_model-shaped value"""
+    body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+    return CachedBody(body, content_etag(body))
+
+def bump_version(db):
+    """Record a catalog change in the caller's transaction (call before commit)"""
+    now = func.timezone("UTC", func.now())
+    statement = pg_insert(CacheVersion).values(name=CATALOG_VERSION_NAME, version=1, updated_at=now)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1, "updated_at": now}
+    ))
+
+def _http_time(updated_at: Optional[datetime]) -> Optional[datetime]:
+    """UTC, rounded up to the whole second HTTP dates carry, so a change
+    later within the same second still moves Last-Modified forward"""
+    if updated_at is None:
+        return None
+    if updated_at.microsecond:
+        updated_at += timedelta(seconds=1)
+    return updated_at.replace(microsecond=0, tzinfo=timezone.utc)
+
+class CatalogCache:
+    def __init__(self, max_entries: int = CATALOG_CACHE_MAX_ENTRIES, ttl: float = CATALOG_CACHE_TTL_SECONDS,
+                 check_interval: float = CATALOG_VERSION_CHECK_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, CachedBody)
+        self._version: Optional[int] = None  # Database version the entries were built from
+        self._modified: Optional[datetime] = None  # When that version was written
+        self._checked_at = 0.0
+        self._generation = 0  # Bumped on every local reset; loads that straddle one are not stored
+
+    def get(self, db, key: Hashable, load: Callable[[], CachedBody]) -> CachedBody:
+        """Cached body for key, or load() it (outside the lock) and keep it"""
+        self._check_version(db)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            generation = self._generation
+            modified = self._modified
+        cached = load()._replace(last_modified=modified)
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, cached)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self):
+        """Drop everything in this process (call after the write commits);
+        the next read re-checks the database version"""
+        with self._lock:
+            self._reset()
+            self._version = None
+            self._checked_at = 0.0
+
+    def _check_version(self, db):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        row = db.execute(
+            select(CacheVersion.version, CacheVersion.updated_at).where(CacheVersion.name == CATALOG_VERSION_NAME)
+        ).first()
+        version, modified = (row.version, _http_time(row.updated_at)) if row else (0, None)
+        with self._lock:
+            if version != self._version:
+                self._reset()
+                self._version = version
+                self._modified = modified
+            self._checked_at = time.monotonic()
+
+    def _reset(self):
+        self._entries.clear()
+        self._generation += 1
+
+catalog = CatalogCache()
@@ -1,11 +1,32 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, extract
-from models import Movie, Cinema, Screen, Showtime, Booking, News, User, UserBooking
-from schemas import MovieCreate, CinemaCreate, ShowtimeCreate, BookingCreate, NewsCreate, UserCreate, UserUpdate
-from typing import Optional, List
-from datetime import date, datetime
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import Date, Float, and_, or_, func, cast, delete, insert, literal, select, text, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert, ARRAY, BIT, array
+from models import Movie, Cinema, Screen, Showtime, ShowtimeSeat, ShowtimeSeatChange, SeatHold, Booking, BookingDailyStat, ShowtimeSalesStat, SALES_HOURS_AHEAD, IdempotencyKey, News, User, UserBooking
+from schemas import MovieCreate, CinemaCreate, SeatLayoutBase, ShowtimeCreate, ScheduleCreate, BookingCreate, NewsCreate, UserCreate, UserUpdate
+from typing import Iterable, Optional, List
+from datetime import date, datetime, timedelta
+import hashlib
+import json
+import os
+import secrets
 import uuid
 from passlib.context import CryptContext
+import events
+import search
+import seatmap
+from catalog_cache import bump_version as bump_catalog_version, catalog
+from scheduling import ShowtimeConflictError, find_conflicts, make_slot
+from schedule_cache import schedule
+
+# How long a seat hold lasts before the sweeper reclaims it
+SEAT_HOLD_MINUTES = int(os.getenv("SEAT_HOLD_MINUTES", "10"))
+
+# Most showtimes one schedule request may expand into, and rows per INSERT
+SCHEDULE_MAX_SHOWTIMES = int(os.getenv("SCHEDULE_MAX_SHOWTIMES", "20000"))
+SCHEDULE_INSERT_BATCH = 1000
+
+# How long a booking Idempotency-Key is remembered
+IDEMPOTENCY_KEY_HOURS = int(os.getenv("IDEMPOTENCY_KEY_HOURS", "24"))
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -15,8 +36,19 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 # Movie CRUD
-def get_movies(db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100):
+def _only(model, fields: Optional[Iterable[str]]):
+    """load_only() for the named columns of model; the others are deferred and
+    left out of the SELECT. Names that are not columns (relationships,
+    computed fields) are ignored."""
+    columns = model.__table__.columns
+    return load_only(*(getattr(model, name) for name in fields if name in columns))
+
+def get_movies(db: Session, status: Optional[str] = None, skip: int = 0, limit: int = 100,
+               fields: Optional[Iterable[str]] = None):
+    """Movies, optionally loading only `fields` (e.g. a response schema's fields)"""
     query = db.query(Movie)
+    if fields:
+        query = query.options(_only(Movie, fields))
     if status:
         query = query.filter(Movie.status == status)
     return query.offset(skip).limit(limit).all()
@@ -24,10 +56,29 @@ def get_movies(db: Session, status: Optional[str] = None, skip: int = 0, limit:
 def get_movie(db: Session, movie_id: int):
     return db.query(Movie).filter(Movie.id == movie_id).first()
 
+def search_movies(db: Session, q: str, limit: int = 20):
+    """Movies matching every word of q (accent-insensitive, the last one as
+    a prefix), best matches first; title matches outrank cast, director and genre"""
+    terms = search.prefix_query(q)
+    if not terms:
+        return []
+    query = func.to_tsquery(search.SEARCH_CONFIG, terms)
+    title_query = func.to_tsquery(search.SEARCH_CONFIG, search.prefix_query(q, weights=search.TITLE_WEIGHT))
+    # A short prefix can match much of the catalog; ranking is per row, so
+    # only a bounded set of matches is ranked, title matches taken first
+    candidates = select(Movie.id).where(Movie.search_vector.op("@@")(query)).order_by(
+        Movie.search_vector.op("@@")(title_query).desc(), Movie.id
+    ).limit(search.SEARCH_RANK_CANDIDATES).scalar_subquery()
+    return db.query(Movie).filter(Movie.id.in_(candidates)).order_by(
+        func.ts_rank(Movie.search_vector, query).desc(), Movie.id
+    ).limit(limit).all()
+
 def create_movie(db: Session, movie: MovieCreate):
     db_movie = Movie(**movie.dict())
     db.add(db_movie)
+    bump_catalog_version(db)
     db.commit()
+    catalog.invalidate()
     db.refresh(db_movie)
     return db_movie
 
@@ -36,7 +87,9 @@ def update_movie(db: Session, movie_id: int, movie: MovieCreate):
     if db_movie:
         for field, value in movie.dict().items():
             setattr(db_movie, field, value)
+        bump_catalog_version(db)
         db.commit()
+        catalog.invalidate()
         db.refresh(db_movie)
     return db_movie
 
@@ -53,7 +106,9 @@ def get_cinema(db: Session, cinema_id: int):
 def create_cinema(db: Session, cinema: CinemaCreate):
     db_cinema = Cinema(**cinema.dict())
     db.add(db_cinema)
+    bump_catalog_version(db)
     db.commit()
+    catalog.invalidate()
     db.refresh(db_cinema)
     return db_cinema
 
@@ -61,6 +116,77 @@ def create_cinema(db: Session, cinema: CinemaCreate):
 def get_screens_by_cinema(db: Session, cinema_id: int):
     return db.query(Screen).filter(Screen.cinema_id == cinema_id).all()
 
+def get_screen(db: Session, screen_id: int):
+    return db.query(Screen).filter(Screen.id == screen_id).first()
+
+def update_screen_layout(db: Session, screen_id: int, layout: SeatLayoutBase):
+    screen = get_screen(db, screen_id)
+    if not screen:
+        return None
+    new_layout = seatmap.SeatLayout.from_dict(layout.dict())
+    
+    # Lock the screen's showtimes so no booking encodes against the old grid
+    db.query(Showtime.id).filter(Showtime.screen_id == screen_id).with_for_update().all()
+    booked = db.query(ShowtimeSeat.showtime_id, ShowtimeSeat.seat_code).join(Showtime).filter(
+        Showtime.screen_id == screen_id,
+        ShowtimeSeat.status == "booked"
+    ).all()
+    
+    codes_by_showtime = {}
+    for showtime_id, seat_code in booked:
+        if not new_layout.is_valid(seat_code):
+            db.rollback()
+            raise ValueError(f"Seat {seat_code} is booked for showtime {showtime_id} but missing from the new layout")
+        codes_by_showtime.setdefault(showtime_id, []).append(seat_code)
+    
+    # Re-encode bitmaps under the new grid, never leaving them NULL so their
+    # length tells a claim encoded against the old grid apart (see
+    # _claim_seats), and recount the seats left. Deltas cannot describe a
+    # layout change, so the version floor moves up and clients reload in full.
+    booked_count = select(func.count(ShowtimeSeat.id)).where(
+        ShowtimeSeat.showtime_id == Showtime.id,
+        ShowtimeSeat.status == "booked"
+    ).scalar_subquery()
+    recounted = db.execute(
+        update(Showtime)
+        .where(Showtime.screen_id == screen_id)
+        .values(
+            seat_bitmap=_bitmap_literal(new_layout, 0),
+            available_seats=new_layout.capacity - booked_count,
+            seat_version=Showtime.seat_version + 1,
+            seat_version_floor=Showtime.seat_version + 1
+        )
+        .returning(Showtime.id, Showtime.seat_version, Showtime.available_seats)
+        .execution_options(synchronize_session=False)
+    ).all()
+    for showtime_id, codes in codes_by_showtime.items():
+        db.query(Showtime).filter(Showtime.id == showtime_id).update(
+            {Showtime.seat_bitmap: _bitmap_literal(new_layout, new_layout.mask(codes))},
+            synchronize_session=False
+        )
+    
+    screen.layout = new_layout.to_dict()
+    screen.total_seats = new_layout.capacity
+    bump_catalog_version(db)
+    db.commit()
+    catalog.invalidate()
+    for showtime_id, seat_version, available_seats in recounted:
+        schedule.set_available_seats(showtime_id, seat_version, available_seats)
+    db.refresh(screen)
+    return screen
+
+def get_showtime_layout(db: Session, showtime_id: int) -> Optional[seatmap.SeatLayout]:
+    """Seat layout of the screen a showtime plays on"""
+    row = db.query(Screen.layout, Screen.total_seats).join(
+        Showtime, Showtime.screen_id == Screen.id
+    ).filter(Showtime.id == showtime_id).first()
+    if not row:
+        return None
+    return seatmap.get_layout(row.layout, row.total_seats)
+
+def _bitmap_literal(layout: seatmap.SeatLayout, value: int):
+    return cast(layout.to_bits(value), BIT(varying=True))
+
 # Showtime CRUD
 def get_showtimes(
     db: Session, 
@@ -70,7 +196,7 @@ def get_showtimes(
     skip: int = 0,
     limit: int = 100
 ):
-    query = db.query(Showtime).join(Movie).join(Cinema).join(Screen)
+    query = db.query(Showtime).join(Movie).join(Cinema).join(Screen, Screen.id == Showtime.screen_id)
     
     if movie_id:
         query = query.filter(Showtime.movie_id == movie_id)
@@ -84,20 +210,239 @@ def get_showtimes(
 def get_showtime(db: Session, showtime_id: int):
     return db.query(Showtime).filter(Showtime.id == showtime_id).first()
 
+def showtime_exists(db: Session, showtime_id: int) -> bool:
+    return db.query(Showtime.id).filter(Showtime.id == showtime_id).first() is not None
+
+def _active_held_seats(db: Session, showtime_id: int):
+    return db.query(ShowtimeSeat).join(
+        SeatHold, SeatHold.id == ShowtimeSeat.hold_id
+    ).filter(
+        ShowtimeSeat.showtime_id == showtime_id,
+        ShowtimeSeat.status == "held",
+        SeatHold.expires_at > func.now()
+    )
+
+def get_held_mask(db: Session, showtime_id: int, layout: seatmap.SeatLayout) -> int:
+    held_codes = _active_held_seats(db, showtime_id).with_entities(ShowtimeSeat.seat_code).all()
+    return layout.mask(code for (code,) in held_codes if layout.is_valid(code))
+
+def get_seat_map_state(db: Session, showtime_id: int):
+    """Seat version plus a fingerprint of active holds, in one query; None if
+    the showtime does not exist. Cheap enough to answer conditional requests."""
+    held = _active_held_seats(db, showtime_id)
+    return db.query(
+        Showtime.seat_version,
+        Showtime.seat_version_floor,
+        Showtime.available_seats,
+        held.with_entities(func.count(ShowtimeSeat.id)).scalar_subquery().label("held_count"),
+        held.with_entities(func.coalesce(func.max(ShowtimeSeat.hold_id), 0)).scalar_subquery().label("last_hold_id")
+    ).filter(Showtime.id == showtime_id).first()
+
+def get_seat_changes(db: Session, showtime_id: int, since: int):
+    """Net seats booked and released after version `since`"""
+    changes = db.query(ShowtimeSeatChange.seat_code, ShowtimeSeatChange.status).filter(
+        ShowtimeSeatChange.showtime_id == showtime_id,
+        ShowtimeSeatChange.version > since
+    ).order_by(ShowtimeSeatChange.version, ShowtimeSeatChange.id).all()
+    latest = {}
+    for seat_code, status in changes:
+        latest[seat_code] = status
+    booked = [seat for seat, status in latest.items() if status == "booked"]
+    released = [seat for seat, status in latest.items() if status == "released"]
+    return booked, released
+
+def _record_seat_changes(db: Session, showtime_id: int, version: int, seats: List[str], status: str):
+    db.execute(insert(ShowtimeSeatChange), [
+        {"showtime_id": showtime_id, "version": version, "seat_code": seat, "status": status}
+        for seat in seats
+    ])
+
+def prune_seat_changes(db: Session, max_age: timedelta, batch_size: int = 500) -> int:
+    """Delete one batch of seat changes older than max_age or for showtimes
+    already played. Each showtime's seat_version_floor moves past the
+    versions deleted, so clients that would need them reload the full map."""
+    cutoff = func.now() - max_age
+    stale = union_all(
+        select(ShowtimeSeatChange.id).where(ShowtimeSeatChange.created_at < cutoff).limit(batch_size),
+        # Changes young enough to survive the first branch belong to
+        # showtimes that played since the cutoff day
+        select(ShowtimeSeatChange.id).join(Showtime, Showtime.id == ShowtimeSeatChange.showtime_id).where(
+            Showtime.show_date >= cast(cutoff, Date), Showtime.show_date < func.current_date()
+        ).limit(batch_size)
+    ).subquery()
+    deleted = (
+        delete(ShowtimeSeatChange)
+        .where(ShowtimeSeatChange.id.in_(select(stale.c.id).limit(batch_size)))
+        .returning(ShowtimeSeatChange.showtime_id, ShowtimeSeatChange.version)
+        .cte("deleted")
+    )
+    floors = select(
+        deleted.c.showtime_id, func.max(deleted.c.version).label("version")
+    ).group_by(deleted.c.showtime_id).subquery()
+    raised = (
+        update(Showtime)
+        .where(Showtime.id == floors.c.showtime_id)
+        .values(seat_version_floor=func.greatest(Showtime.seat_version_floor, floors.c.version))
+        .returning(Showtime.id)
+        .cte("raised")
+    )
+    # Both statements run in full whatever the outer query reads
+    pruned = db.execute(
+        select(func.count()).select_from(deleted).add_cte(raised)
+    ).scalar()
+    db.commit()
+    return pruned
+
+def get_showtime_seat_map(db: Session, showtime: Showtime) -> dict:
+    """Layout plus packed booked-seat bitmap for the seat picker"""
+    layout = seatmap.get_layout(showtime.screen.layout, showtime.screen.total_seats)
+    booked = layout.from_bits(showtime.seat_bitmap)
+    held = get_held_mask(db, showtime.id, layout)
+    return {
+        "layout": layout.to_dict(),
+        "capacity": layout.capacity,
+        "booked_count": booked.bit_count(),
+        "booked": layout.pack(booked),
+        "held_count": held.bit_count(),
+        "held": layout.pack(held)
+    }
+
+def _lock_screens(db: Session, screen_ids):
+    """Row-lock screens (in id order) so showtimes added to them concurrently
+    are validated one after another"""
+    return db.query(Screen).filter(Screen.id.in_(screen_ids)).order_by(Screen.id).with_for_update().all()
+
+def _existing_slots(db: Session, screen_ids, first_day: date, last_day: date):
+    """Slots of showtimes already on these screens that could overlap shows
+    between first_day and last_day (a day either side for shows crossing midnight)"""
+    rows = db.query(
+        Showtime.id, Showtime.screen_id, Showtime.movie_id, Showtime.show_date, Showtime.show_time, Movie.duration
+    ).outerjoin(Movie, Movie.id == Showtime.movie_id).filter(
+        Showtime.screen_id.in_(screen_ids),
+        Showtime.show_date.between(first_day - timedelta(days=1), last_day + timedelta(days=1))
+    ).all()
+    return [
+        make_slot(screen_id, movie_id, show_date, show_time, duration, showtime_id)
+        for showtime_id, screen_id, movie_id, show_date, show_time, duration in rows
+    ]
+
 def create_showtime(db: Session, showtime: ShowtimeCreate):
-    db_showtime = Showtime(**showtime.dict())
+    """Raises ShowtimeConflictError when the screen is busy at that time"""
+    screens = _lock_screens(db, [showtime.screen_id])
+    if not screens:
+        db.rollback()
+        raise ValueError("Screen not found")
+    duration = db.query(Movie.duration).filter(Movie.id == showtime.movie_id).scalar()
+    proposed = make_slot(showtime.screen_id, showtime.movie_id, showtime.show_date, showtime.show_time, duration)
+    conflicts = find_conflicts(_existing_slots(db, [showtime.screen_id], showtime.show_date, showtime.show_date), [proposed])
+    if conflicts:
+        db.rollback()
+        raise ShowtimeConflictError(conflicts)
+
+    # Seats come from the screen layout, like scheduled showtimes
+    db_showtime = Showtime(
+        **showtime.dict(exclude={"available_seats"}),
+        available_seats=seatmap.get_layout(screens[0].layout, screens[0].total_seats).capacity
+    )
     db.add(db_showtime)
     db.commit()
     db.refresh(db_showtime)
+    schedule.add_showtime(db_showtime)
     return db_showtime
 
+def _schedule_price(screen_template, show_date: date, show_time):
+    price = screen_template.price
+    for tier in screen_template.price_tiers:
+        if show_date.weekday() in tier.weekdays and show_time >= tier.from_time:
+            price = tier.price
+    return price
+
+def create_showtime_schedule(db: Session, template: ScheduleCreate, dry_run: bool = False):
+    """Expand weekly per-screen templates over start_date..end_date into
+    showtimes and insert them in one transaction, SCHEDULE_INSERT_BATCH rows
+    per statement. Slots that already have a showtime on the same screen,
+    date and time are skipped, so a template can be re-applied to extend it.
+    The whole schedule is checked for overlaps (with existing showtimes and
+    within itself) first; any raise ShowtimeConflictError, or with dry_run
+    are returned and nothing is written. Returns (created, skipped, conflicts)."""
+    if template.end_date < template.start_date:
+        raise ValueError("end_date is before start_date")
+    days = [template.start_date + timedelta(days=n)
+            for n in range((template.end_date - template.start_date).days + 1)]
+
+    screen_ids = {screen.screen_id for screen in template.screens}
+    screens = {screen.id: screen for screen in _lock_screens(db, screen_ids)}
+    if screen_ids - screens.keys():
+        db.rollback()
+        raise ValueError(f"Screen {min(screen_ids - screens.keys())} not found")
+    movie_ids = {slot.movie_id for screen in template.screens for slot in screen.slots}
+    durations = dict(db.query(Movie.id, Movie.duration).filter(Movie.id.in_(movie_ids)).all())
+    if movie_ids - durations.keys():
+        db.rollback()
+        raise ValueError(f"Movie {min(movie_ids - durations.keys())} not found")
+
+    taken = set(db.query(Showtime.screen_id, Showtime.show_date, Showtime.show_time).filter(
+        Showtime.screen_id.in_(screen_ids),
+        Showtime.show_date.between(template.start_date, template.end_date)
+    ).all())
+
+    rows = []
+    skipped = 0
+    for screen_template in template.screens:
+        screen = screens[screen_template.screen_id]
+        capacity = seatmap.get_layout(screen.layout, screen.total_seats).capacity
+        for day in days:
+            for slot in screen_template.slots:
+                if day.weekday() not in slot.weekdays:
+                    continue
+                for show_time in slot.start_times:
+                    if (screen.id, day, show_time) in taken:
+                        skipped += 1
+                        continue
+                    taken.add((screen.id, day, show_time))
+                    rows.append({
+                        "movie_id": slot.movie_id,
+                        "cinema_id": screen.cinema_id,
+                        "screen_id": screen.id,
+                        "show_date": day,
+                        "show_time": show_time,
+                        "price": _schedule_price(screen_template, day, show_time),
+                        "available_seats": capacity
+                    })
+    if len(rows) > SCHEDULE_MAX_SHOWTIMES:
+        db.rollback()
+        raise ValueError(f"Schedule expands to {len(rows)} showtimes; the limit is {SCHEDULE_MAX_SHOWTIMES}")
+
+    proposed = [
+        make_slot(row["screen_id"], row["movie_id"], row["show_date"], row["show_time"], durations[row["movie_id"]])
+        for row in rows
+    ]
+    conflicts = find_conflicts(_existing_slots(db, screen_ids, template.start_date, template.end_date), proposed)
+    if conflicts or dry_run:
+        db.rollback()
+        if conflicts and not dry_run:
+            raise ShowtimeConflictError(conflicts)
+        return len(rows), skipped, conflicts
+
+    for start in range(0, len(rows), SCHEDULE_INSERT_BATCH):
+        db.execute(insert(Showtime).values(rows[start:start + SCHEDULE_INSERT_BATCH]))
+    db.commit()
+    if rows:
+        schedule.invalidate()
+    return len(rows), skipped, []
+
 def get_showtimes_with_details(
     db: Session,
     movie_id: Optional[int] = None,
     cinema_id: Optional[int] = None,
-    show_date: Optional[date] = None
+    show_date: Optional[date] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None
 ):
-    """Get showtimes with movie and cinema details"""
+    """Get showtimes with movie and cinema details, ordered by
+    (show_date, show_time, id). `after` is the sort key of the last row of
+    the previous page; paging by it avoids scanning skipped rows."""
     query = db.query(
         Showtime.id,
         Showtime.show_date,
@@ -107,7 +452,7 @@ def get_showtimes_with_details(
         Movie.title.label('movie_title'),
         Cinema.name.label('cinema_name'),
         Screen.screen_type
-    ).join(Movie).join(Cinema).join(Screen)
+    ).join(Movie).join(Cinema).join(Screen, Screen.id == Showtime.screen_id)
     
     if movie_id:
         query = query.filter(Showtime.movie_id == movie_id)
@@ -115,73 +460,613 @@ def get_showtimes_with_details(
         query = query.filter(Showtime.cinema_id == cinema_id)
     if show_date:
         query = query.filter(Showtime.show_date == show_date)
-        
+    if after:
+        query = query.filter(tuple_(Showtime.show_date, Showtime.show_time, Showtime.id) > after)
+    
+    query = query.order_by(Showtime.show_date, Showtime.show_time, Showtime.id)
+    if skip:
+        query = query.offset(skip)
+    if limit is not None:
+        query = query.limit(limit)
     return query.all()
 
-# Booking CRUD
-def create_booking(db: Session, booking: BookingCreate):
-    # Check seat availability
-    showtime = get_showtime(db, booking.showtime_id)
-    if not showtime:
+# Seat claims shared by holds and bookings
+def _check_requested_seats(db: Session, showtime_id: int, seats: List[str]):
+    """Validate seats against the layout and the committed bitmap; return (layout, mask)"""
+    if not seats:
+        raise ValueError("At least one seat is required")
+    if len(set(seats)) != len(seats):
+        raise ValueError("Duplicate seats in booking")
+    
+    row = db.query(Screen.layout, Screen.total_seats, Showtime.seat_bitmap).join(
+        Showtime, Showtime.screen_id == Screen.id
+    ).filter(Showtime.id == showtime_id).first()
+    if not row:
         raise ValueError("Showtime not found")
+    layout = seatmap.get_layout(row.layout, row.total_seats)
+    mask = layout.mask(seats)
     
-    # Check if requested seats are available
-    booked_seats = showtime.booked_seats or []
-    for seat in booking.seats:
-        if seat in booked_seats:
-            raise ValueError(f"Seat {seat} is already booked")
+    # Seats already set in the last committed bitmap can be rejected before
+    # writing anything; the unique key on showtime_seats settles races
+    taken = layout.from_bits(row.seat_bitmap) & mask
+    if taken:
+        seat = next(seat for seat in seats if not layout.is_free(taken, seat))
+        raise ValueError(f"Seat {seat} is already booked")
+    return layout, mask
+
+def _insert_seat_rows(db: Session, showtime_id: int, seats: List[str], **values) -> List[str]:
+    """Insert inventory rows, skipping taken seats; return the seats that were taken.
+    Rows of expired holds the sweeper has not removed yet are taken over, as
+    get_held_mask already shows those seats free. Rows go in sorted order so
+    overlapping requests cannot deadlock."""
+    statement = pg_insert(ShowtimeSeat).values(
+        [{"showtime_id": showtime_id, "seat_code": seat, "booking_id": None, "hold_id": None, **values}
+         for seat in sorted(seats)]
+    )
+    expired_holds = select(SeatHold.id).where(SeatHold.expires_at <= func.now())
+    inserted = set(db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["showtime_id", "seat_code"],
+            set_={
+                "status": statement.excluded.status,
+                "booking_id": statement.excluded.booking_id,
+                "hold_id": statement.excluded.hold_id,
+                "created_at": func.now()
+            },
+            where=and_(ShowtimeSeat.status == "held", ShowtimeSeat.hold_id.in_(expired_holds))
+        )
+        .returning(ShowtimeSeat.seat_code)
+    ).scalars())
+    return [seat for seat in seats if seat not in inserted]
+
+# Seat hold CRUD
+def create_seat_hold(db: Session, showtime_id: int, seats: List[str], ttl_minutes: int = SEAT_HOLD_MINUTES):
+    """Hold seats for ttl_minutes without touching the showtime row"""
+    seats = list(seats)
+    _check_requested_seats(db, showtime_id, seats)
     
-    # Check if enough seats available
-    if len(booking.seats) > showtime.available_seats:
-        raise ValueError("Not enough seats available")
+    db_hold = SeatHold(
+        token=secrets.token_urlsafe(24),
+        showtime_id=showtime_id,
+        seats=seats,
+        expires_at=func.now() + timedelta(minutes=ttl_minutes)
+    )
+    db.add(db_hold)
+    db.flush()
+    
+    taken = _insert_seat_rows(db, showtime_id, seats, status="held", hold_id=db_hold.id)
+    if taken:
+        db.rollback()
+        raise ValueError(f"Seat {taken[0]} is already booked or held")
     
+    db.commit()
+    db.refresh(db_hold)
+    return db_hold
+
+def get_active_seat_hold(db: Session, showtime_id: int, token: str, for_update: bool = False):
+    query = db.query(SeatHold).filter(
+        SeatHold.token == token,
+        SeatHold.showtime_id == showtime_id,
+        SeatHold.expires_at > func.now()
+    )
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+def release_seat_hold(db: Session, showtime_id: int, token: str):
+    """Drop a hold early; its held seats go with it"""
+    released = db.query(SeatHold).filter(
+        SeatHold.token == token,
+        SeatHold.showtime_id == showtime_id
+    ).delete(synchronize_session=False)
+    db.commit()
+    return released
+
+def sweep_expired_holds(db: Session, batch_size: int = 500) -> int:
+    """Delete one batch of expired holds, skipping rows another worker has locked"""
+    expired = select(SeatHold.id).where(
+        SeatHold.expires_at <= func.now()
+    ).order_by(SeatHold.expires_at).limit(batch_size).with_for_update(skip_locked=True)
+    swept = db.execute(delete(SeatHold).where(SeatHold.id.in_(expired.scalar_subquery()))).rowcount
+    db.commit()
+    return swept
+
+# Idempotency keys
+class IdempotencyKeyMismatch(ValueError):
+    """The Idempotency-Key was already used for a different request"""
+
+    def __init__(self):
+        super().__init__("Idempotency-Key was already used for a different request")
+
+def booking_request_hash(booking: BookingCreate) -> str:
+    payload = json.dumps(booking.dict(exclude={"hold_token"}), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def get_idempotency_key(db: Session, key: str):
+    """Live idempotency record with its booking loaded in the same query"""
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > func.now()
+    ).first()
+
+def _claim_idempotency_key(db: Session, key: str, request_hash: str, booking_id: int) -> bool:
+    """Record key -> booking inside the booking transaction. A concurrent
+    request with the same key blocks on the unique index until this one
+    commits, then finds the key taken. Expired keys are overwritten."""
+    claimed = db.execute(
+        pg_insert(IdempotencyKey)
+        .values(
+            key=key,
+            request_hash=request_hash,
+            booking_id=booking_id,
+            expires_at=func.now() + timedelta(hours=IDEMPOTENCY_KEY_HOURS)
+        )
+        .on_conflict_do_update(
+            index_elements=["key"],
+            set_={
+                "request_hash": request_hash,
+                "booking_id": booking_id,
+                "expires_at": func.now() + timedelta(hours=IDEMPOTENCY_KEY_HOURS),
+                "created_at": func.now()
+            },
+            where=IdempotencyKey.expires_at <= func.now()
+        )
+        .returning(IdempotencyKey.id)
+    ).first()
+    return claimed is not None
+
+def replay_idempotent_booking(db: Session, key: str, request_hash: str):
+    """The booking a live key recorded, or None if the key is unused;
+    raises IdempotencyKeyMismatch when it was used for another request"""
+    record = get_idempotency_key(db, key)
+    if not record:
+        return None
+    if record.request_hash != request_hash:
+        raise IdempotencyKeyMismatch()
+    return record.booking
+
+def purge_expired_idempotency_keys(db: Session, batch_size: int = 500) -> int:
+    expired = select(IdempotencyKey.id).where(
+        IdempotencyKey.expires_at <= func.now()
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    purged = db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired.scalar_subquery()))).rowcount
+    db.commit()
+    return purged
+
+# Booking CRUD
+def _check_booking_seats(db: Session, booking: BookingCreate):
+    """(seats, hold, layout, mask) for a booking request; raises ValueError
+    when the seats are not bookable"""
+    seats = list(booking.seats)
+    hold = None
+    if booking.hold_token:
+        # Confirming a hold: its seats are already ours, skip the bitmap pre-check
+        hold = get_active_seat_hold(db, booking.showtime_id, booking.hold_token, for_update=True)
+        if not hold:
+            raise ValueError("Seat hold not found or expired")
+        if not seats or not set(seats) <= set(hold.seats) or len(set(seats)) != len(seats):
+            raise ValueError("Seats do not match the hold")
+        layout = get_showtime_layout(db, booking.showtime_id)
+        mask = layout.mask(seats)
+    else:
+        layout, mask = _check_requested_seats(db, booking.showtime_id, seats)
+    return seats, hold, layout, mask
+
+def _new_booking(db: Session, booking: BookingCreate) -> Booking:
     # Generate booking code
     booking_code = f"GC{str(uuid.uuid4())[:8].upper()}"
     
     # Create booking
     db_booking = Booking(
-        **booking.dict(),
+        **booking.dict(exclude={"hold_token"}),
         booking_code=booking_code
     )
+    db.add(db_booking)
+    db.flush()
+    return db_booking
+
+def _claim_seats(db: Session, db_booking: Booking, seats: List[str], hold, layout, mask):
+    """Take the booking's seats in the current transaction; rolls back and
+    raises ValueError when any is gone. Returns the showtime's new
+    (seat_version, available_seats)."""
+    showtime_id = db_booking.showtime_id
+    if hold:
+        converted = db.query(ShowtimeSeat).filter(
+            ShowtimeSeat.hold_id == hold.id,
+            ShowtimeSeat.seat_code.in_(seats)
+        ).update({
+            ShowtimeSeat.status: "booked",
+            ShowtimeSeat.booking_id: db_booking.id,
+            ShowtimeSeat.hold_id: None
+        }, synchronize_session=False)
+        if converted != len(seats):
+            db.rollback()
+            raise ValueError("Seat hold not found or expired")
+        # Seats held but not booked are released with the hold
+        db.delete(hold)
+    else:
+        # One inventory row per seat; the (showtime_id, seat_code) unique key
+        # rejects taken seats without a separate lookup
+        taken = _insert_seat_rows(db, showtime_id, seats, status="booked", booking_id=db_booking.id)
+        if taken:
+            db.rollback()
+            raise ValueError(f"Seat {taken[0]} is already booked or held")
     
-    # Update showtime
-    showtime.booked_seats = booked_seats + booking.seats
-    showtime.available_seats -= len(booking.seats)
+    # Take the seats off the counter, set their bits and bump the seat
+    # version last, so the showtime row lock is only held for this
+    # statement and the commit. The layout was read without a lock: a
+    # bitmap of another length means update_screen_layout re-encoded it
+    # meanwhile and the mask no longer lines up.
+    current_bitmap = func.coalesce(Showtime.seat_bitmap, _bitmap_literal(layout, 0))
+    claimed = db.execute(
+        update(Showtime)
+        .where(
+            Showtime.id == showtime_id,
+            Showtime.available_seats >= len(seats),
+            func.bit_length(current_bitmap) == layout.size
+        )
+        .values(
+            available_seats=Showtime.available_seats - len(seats),
+            seat_bitmap=current_bitmap.op("|")(_bitmap_literal(layout, mask)),
+            seat_version=Showtime.seat_version + 1
+        )
+        .returning(Showtime.seat_version, Showtime.available_seats)
+    ).first()
     
-    db.add(db_booking)
+    if claimed is None:
+        bitmap_size = db.query(func.bit_length(Showtime.seat_bitmap)).filter(Showtime.id == showtime_id).scalar()
+        db.rollback()
+        if bitmap_size not in (None, layout.size):
+            raise ValueError("The seat layout changed, please choose your seats again")
+        raise ValueError("Not enough seats available")
+    
+    _record_seat_changes(db, showtime_id, claimed.seat_version, seats, "booked")
+    return claimed
+
+def _announce_booked(showtime_id: int, claimed, seats: List[str]):
+    """After commit: tell seat watchers and the schedule cache"""
+    events.publish_seat_change(showtime_id, claimed.seat_version, claimed.available_seats, booked=seats)
+    schedule.set_available_seats(showtime_id, claimed.seat_version, claimed.available_seats)
+
+def create_idempotent_booking(db: Session, booking: BookingCreate, idempotency_key: Optional[str] = None):
+    """(booking, replayed): replayed is True when idempotency_key already
+    recorded this request and its booking is returned instead of a new one.
+    Raises IdempotencyKeyMismatch when the key belongs to another request."""
+    if idempotency_key:
+        # Look the key up before the seats: a retry of a booking that just
+        # committed would find its own seats taken
+        request_hash = booking_request_hash(booking)
+        replayed = replay_idempotent_booking(db, idempotency_key, request_hash)
+        if replayed:
+            return replayed, True
+    
+    seats, hold, layout, mask = _check_booking_seats(db, booking)
+    db_booking = _new_booking(db, booking)
+    
+    if idempotency_key:
+        if not _claim_idempotency_key(db, idempotency_key, request_hash, db_booking.id):
+            # Lost the race to a request with the same key: replay its booking
+            db.rollback()
+            replayed = replay_idempotent_booking(db, idempotency_key, request_hash)
+            if not replayed:
+                raise IdempotencyKeyMismatch()
+            return replayed, True
+    
+    claimed = _claim_seats(db, db_booking, seats, hold, layout, mask)
+    _roll_up_bookings(db, [db_booking.id])
     db.commit()
+    _announce_booked(booking.showtime_id, claimed, seats)
     db.refresh(db_booking)
-    return db_booking
+    return db_booking, False
+
+def create_booking(db: Session, booking: BookingCreate, idempotency_key: Optional[str] = None):
+    """Raises IdempotencyKeyMismatch when idempotency_key belongs to another request"""
+    return create_idempotent_booking(db, booking, idempotency_key)[0]
+
+def create_group_booking(db: Session, bookings: List[BookingCreate]):
+    """Book seats across several showtimes in one transaction: every booking
+    is created or none is (ValueError names the one that failed). Showtimes
+    are locked in id order, so two group orders sharing showtimes wait for
+    each other instead of deadlocking. Returns the bookings in request order."""
+    order = sorted(range(len(bookings)), key=lambda i: bookings[i].showtime_id)
+    created = [None] * len(bookings)
+    claims = []
+    for i in order:
+        booking = bookings[i]
+        try:
+            seats, hold, layout, mask = _check_booking_seats(db, booking)
+            db_booking = _new_booking(db, booking)
+            claims.append((booking.showtime_id, _claim_seats(db, db_booking, seats, hold, layout, mask), seats))
+        except ValueError as e:
+            db.rollback()
+            raise ValueError(f"Booking {i + 1} (showtime {booking.showtime_id}): {e}")
+        created[i] = db_booking
+    ids = [db_booking.id for db_booking in created]
+    _roll_up_bookings(db, ids)
+    db.commit()
+    for showtime_id, claimed, seats in claims:
+        _announce_booked(showtime_id, claimed, seats)
+    # Reload them all (for created_at) in one query instead of one refresh each
+    loaded = {db_booking.id: db_booking for db_booking in db.query(Booking).filter(Booking.id.in_(ids))}
+    return [loaded[booking_id] for booking_id in ids]
 
 def get_booking(db: Session, booking_id: int):
     return db.query(Booking).filter(Booking.id == booking_id).first()
 
+def _with_showtime_details(query):
+    """Load each booking's showtime with its movie, cinema and screen in the
+    same SELECT instead of one lazy load per relationship"""
+    return query.options(
+        joinedload(Booking.showtime).options(
+            joinedload(Showtime.movie),
+            joinedload(Showtime.cinema),
+            joinedload(Showtime.screen)
+        )
+    )
+
+def get_booking_details(db: Session, booking_id: int):
+    """Booking with showtime, movie, cinema and screen, in one query"""
+    return _with_showtime_details(db.query(Booking)).filter(Booking.id == booking_id).first()
+
 def get_booking_by_code(db: Session, booking_code: str):
     return db.query(Booking).filter(Booking.booking_code == booking_code).first()
 
+def bookings_query(
+    db: Session,
+    status: Optional[str] = None,
+    cinema_id: Optional[int] = None,
+    customer_email: Optional[str] = None,
+    created_from: Optional[date] = None,
+    created_to: Optional[date] = None
+):
+    """Bookings matching the admin list filters, unordered. Emails match
+    case-insensitively; the date range is inclusive."""
+    query = db.query(Booking)
+    if status:
+        query = query.filter(Booking.status == status)
+    if cinema_id:
+        query = query.filter(Booking.showtime_id.in_(select(Showtime.id).where(Showtime.cinema_id == cinema_id)))
+    if customer_email:
+        query = query.filter(func.lower(Booking.customer_email) == customer_email.lower())
+    if created_from:
+        query = query.filter(Booking.created_at >= created_from)
+    if created_to:
+        query = query.filter(Booking.created_at < created_to + timedelta(days=1))
+    return query
+
+def get_bookings(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None, **filters):
+    """Bookings newest first, ordered by (created_at, id) descending and
+    filtered like bookings_query. `after` is the sort key of the last row of
+    the previous page."""
+    query = bookings_query(db, **filters)
+    if after:
+        query = query.filter(tuple_(Booking.created_at, Booking.id) < after)
+    query = query.order_by(Booking.created_at.desc(), Booking.id.desc())
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def bookings_export_query(created_from: date, created_to: date):
+    """SELECT of the bookings made on [created_from, created_to], oldest
+    first, with their showtime, cinema and movie; for streaming exports,
+    so it is not bound to a session"""
+    return select(
+        Booking.id,
+        Booking.booking_code,
+        Booking.created_at,
+        Booking.status,
+        Booking.payment_method,
+        Booking.total_amount,
+        Booking.seats,
+        Booking.customer_name,
+        Booking.customer_email,
+        Booking.customer_phone,
+        Booking.user_id,
+        Booking.showtime_id,
+        Showtime.show_date,
+        Showtime.show_time,
+        Showtime.cinema_id,
+        Cinema.name.label("cinema_name"),
+        Showtime.movie_id,
+        Movie.title.label("movie_title")
+    ).outerjoin(Showtime, Showtime.id == Booking.showtime_id).outerjoin(
+        Cinema, Cinema.id == Showtime.cinema_id
+    ).outerjoin(Movie, Movie.id == Showtime.movie_id).where(
+        Booking.created_at >= created_from,
+        Booking.created_at < created_to + timedelta(days=1)
+    ).order_by(Booking.created_at, Booking.id)
+
+def _release_seats(showtime_id: int, layout: seatmap.SeatLayout, released: List[str], guarded: bool = False):
+    """UPDATE crediting back released seats and clearing their bits; guarded,
+    it only applies while the bitmap still has the layout's length"""
+    freed = layout.mask(code for code in released if layout.is_valid(code))
+    statement = update(Showtime).where(Showtime.id == showtime_id)
+    if guarded:
+        statement = statement.where(func.bit_length(Showtime.seat_bitmap) == layout.size)
+    return statement.values(
+        available_seats=Showtime.available_seats + len(released),
+        seat_bitmap=Showtime.seat_bitmap.op("&")(_bitmap_literal(layout, ((1 << layout.size) - 1) ^ freed)),
+        seat_version=Showtime.seat_version + 1
+    ).returning(Showtime.seat_version, Showtime.available_seats)
+
 def cancel_booking(db: Session, booking_id: int):
+    # Flip the status conditionally so a repeated cancel never frees seats twice
+    cancelled = db.query(Booking).filter(
+        Booking.id == booking_id,
+        Booking.status != "cancelled"
+    ).update({Booking.status: "cancelled"}, synchronize_session=False)
+    
     booking = get_booking(db, booking_id)
     if not booking:
         return None
     
-    # Update showtime to free seats
-    showtime = get_showtime(db, booking.showtime_id)
-    if showtime:
-        booked_seats = showtime.booked_seats or []
-        for seat in booking.seats:
-            if seat in booked_seats:
-                booked_seats.remove(seat)
-        showtime.booked_seats = booked_seats
-        showtime.available_seats += len(booking.seats)
+    restored = None
+    if cancelled:
+        # Release only this booking's inventory rows and credit back what was freed
+        released = db.execute(
+            delete(ShowtimeSeat)
+            .where(ShowtimeSeat.booking_id == booking.id)
+            .returning(ShowtimeSeat.seat_code)
+        ).scalars().all()
+        if released:
+            layout = get_showtime_layout(db, booking.showtime_id)
+            restored = db.execute(_release_seats(booking.showtime_id, layout, released, guarded=True)).first()
+            if restored is None:
+                # update_screen_layout re-encoded the bitmap since the layout
+                # was read: lock the row so it cannot change again and redo
+                # the mask under the current layout
+                db.query(Showtime.id).filter(Showtime.id == booking.showtime_id).with_for_update().first()
+                layout = get_showtime_layout(db, booking.showtime_id)
+                restored = db.execute(_release_seats(booking.showtime_id, layout, released)).first()
+            _record_seat_changes(db, booking.showtime_id, restored.seat_version, released, "released")
+        _roll_up_bookings(db, [booking.id], cancelled=True)
     
-    # Update booking status
-    booking.status = "cancelled"
     db.commit()
+    if restored:
+        events.publish_seat_change(
+            booking.showtime_id, restored.seat_version, restored.available_seats, released=released
+        )
+        schedule.set_available_seats(booking.showtime_id, restored.seat_version, restored.available_seats)
+    db.refresh(booking)
     return booking
 
-# News CRUD  
-def get_news(db: Session, category: Optional[str] = None, skip: int = 0, limit: int = 100):
+# Booking rollups
+_DAILY_STAT_KEY = ["day", "cinema_id", "movie_id"]
+_DAILY_STAT_COUNTS = ["bookings", "confirmed", "seats_sold", "cancellations", "revenue"]
+_SALES_STAT_SEATS = [f"seats_{hours}h" for hours in SALES_HOURS_AHEAD]
+_SALES_STAT_COUNTS = ["bookings", "seats_sold", "revenue"] + _SALES_STAT_SEATS
+
+def _daily_stat_rows(*counts):
+    """SELECT of (day, cinema_id, movie_id, *counts) over bookings, one row
+    per key, in key order. Bookings without a showtime count under cinema
+    and movie 0, so the totals still cover every booking."""
+    day = cast(Booking.created_at, Date)
+    cinema_id = func.coalesce(Showtime.cinema_id, 0)
+    movie_id = func.coalesce(Showtime.movie_id, 0)
+    return select(day, cinema_id, movie_id, *counts).outerjoin(
+        Showtime, Showtime.id == Booking.showtime_id
+    ).group_by(day, cinema_id, movie_id).order_by(day, cinema_id, movie_id)
+
+def _sales_stat_rows(cancelled: bool = False):
+    """SELECT of (showtime_id, *_SALES_STAT_COUNTS) over bookings, one row
+    per showtime, in showtime order; negated to take cancelled ones away"""
+    seats = func.cardinality(Booking.seats)
+    hours_before = func.date_part("epoch", Showtime.show_date + Showtime.show_time - Booking.created_at) / 3600
+    bucket = func.width_bucket(hours_before, cast(array(SALES_HOURS_AHEAD[1:]), ARRAY(Float)))
+    counts = [
+        func.count(),
+        func.coalesce(func.sum(seats), 0),
+        func.coalesce(func.sum(Booking.total_amount), 0)
+    ] + [func.coalesce(func.sum(seats).filter(bucket == k), 0) for k in range(len(SALES_HOURS_AHEAD))]
+    return select(Booking.showtime_id, *(-count if cancelled else count for count in counts)).join(
+        Showtime, Showtime.id == Booking.showtime_id
+    ).group_by(Booking.showtime_id).order_by(Booking.showtime_id)
+
+def _upsert_added(model, key: List[str], counts: List[str], rows):
+    statement = pg_insert(model).from_select(key + counts, rows)
+    return statement.on_conflict_do_update(
+        index_elements=key,
+        set_={name: getattr(model, name) + getattr(statement.excluded, name) for name in counts}
+    )
+
+def _roll_up_bookings(db: Session, booking_ids: List[int], cancelled: bool = False):
+    """Add new bookings (or, with cancelled, their cancellation) to
+    booking_daily_stats and showtime_sales_stats in the caller's
+    transaction. Rows are upserted table by table in key order, so
+    transactions that touch several rows never deadlock."""
+    seats = func.coalesce(func.sum(func.cardinality(Booking.seats)), 0)
+    revenue = func.coalesce(func.sum(Booking.total_amount), 0)
+    if cancelled:
+        # Only confirmed bookings can be cancelled
+        counts = (literal(0), -func.count(), -seats, func.count(), -revenue)
+    else:
+        counts = (func.count(), func.count().filter(Booking.status == "confirmed"), seats, literal(0), revenue)
+    selected = Booking.id.in_(booking_ids)
+    db.execute(_upsert_added(
+        BookingDailyStat, _DAILY_STAT_KEY, _DAILY_STAT_COUNTS, _daily_stat_rows(*counts).where(selected)
+    ))
+    db.execute(_upsert_added(
+        ShowtimeSalesStat, ["showtime_id"], _SALES_STAT_COUNTS, _sales_stat_rows(cancelled).where(selected)
+    ))
+
+def rebuild_daily_stats(db) -> int:
+    """Regenerate booking_daily_stats from every booking; returns the rows
+    written. Runs in the caller's transaction (a Session or Connection), so
+    commit to publish; bookings made meanwhile wait for the table lock and
+    are added on top of the rebuilt rows."""
+    db.execute(text("LOCK TABLE booking_daily_stats IN EXCLUSIVE MODE"))
+    db.execute(delete(BookingDailyStat))
+    kept = Booking.status != "cancelled"
+    result = db.execute(insert(BookingDailyStat).from_select(
+        _DAILY_STAT_KEY + _DAILY_STAT_COUNTS,
+        _daily_stat_rows(
+            func.count(),
+            func.count().filter(Booking.status == "confirmed"),
+            func.coalesce(func.sum(func.cardinality(Booking.seats)).filter(kept), 0),
+            func.count().filter(Booking.status == "cancelled"),
+            func.coalesce(func.sum(Booking.total_amount).filter(kept), 0)
+        )
+    ))
+    return result.rowcount
+
+def rebuild_showtime_sales(db) -> int:
+    """Regenerate showtime_sales_stats from the bookings not cancelled, like
+    rebuild_daily_stats; returns the rows written"""
+    db.execute(text("LOCK TABLE showtime_sales_stats IN EXCLUSIVE MODE"))
+    db.execute(delete(ShowtimeSalesStat))
+    result = db.execute(insert(ShowtimeSalesStat).from_select(
+        ["showtime_id"] + _SALES_STAT_COUNTS,
+        _sales_stat_rows().where(Booking.status != "cancelled")
+    ))
+    return result.rowcount
+
+def get_daily_stats(db: Session, date_from: date, date_to: date,
+                    cinema_id: Optional[int] = None, movie_id: Optional[int] = None):
+    """Per-day booking totals over [date_from, date_to] from the rollup,
+    optionally for one cinema and/or movie; days without bookings are omitted"""
+    query = db.query(
+        BookingDailyStat.day,
+        func.sum(BookingDailyStat.bookings).label("bookings"),
+        func.sum(BookingDailyStat.seats_sold).label("seats_sold"),
+        func.sum(BookingDailyStat.cancellations).label("cancellations"),
+        func.sum(BookingDailyStat.revenue).label("revenue")
+    ).filter(BookingDailyStat.day >= date_from, BookingDailyStat.day <= date_to)
+    if cinema_id:
+        query = query.filter(BookingDailyStat.cinema_id == cinema_id)
+    if movie_id:
+        query = query.filter(BookingDailyStat.movie_id == movie_id)
+    return query.group_by(BookingDailyStat.day).order_by(BookingDailyStat.day).all()
+
+# Analytics
+def showtime_sales_query(db: Session, date_from: date, date_to: date,
+                         cinema_id: Optional[int] = None, movie_id: Optional[int] = None):
+    """Query of one row per showtime on [date_from, date_to]: showtime_id,
+    movie_id, cinema_id, screen_id, show_date, then its bookings,
+    seats_sold, revenue and seats_<n>h from showtime_sales_stats (zero when
+    nothing was sold)"""
+    query = db.query(
+        Showtime.id.label("showtime_id"),
+        Showtime.movie_id,
+        Showtime.cinema_id,
+        Showtime.screen_id,
+        Showtime.show_date,
+        *(func.coalesce(getattr(ShowtimeSalesStat, name), 0).label(name) for name in _SALES_STAT_COUNTS)
+    ).outerjoin(
+        ShowtimeSalesStat, ShowtimeSalesStat.showtime_id == Showtime.id
+    ).filter(Showtime.show_date >= date_from, Showtime.show_date <= date_to)
+    if cinema_id:
+        query = query.filter(Showtime.cinema_id == cinema_id)
+    if movie_id:
+        query = query.filter(Showtime.movie_id == movie_id)
+    return query
+
+# News CRUD
+def get_news(db: Session, category: Optional[str] = None, skip: int = 0, limit: int = 100,
+             fields: Optional[Iterable[str]] = None):
+    """Active news, newest first, optionally loading only `fields`"""
     query = db.query(News).filter(News.is_active == True)
+    if fields:
+        query = query.options(_only(News, fields))
     if category:
         query = query.filter(News.category == category)
     return query.order_by(News.publish_date.desc()).offset(skip).limit(limit).all()
@@ -192,7 +1077,9 @@ def get_news_item(db: Session, news_id: int):
 def create_news(db: Session, news: NewsCreate):
     db_news = News(**news.dict())
     db.add(db_news)
+    bump_catalog_version(db)
     db.commit()
+    catalog.invalidate()
     db.refresh(db_news)
     return db_news
 
@@ -227,11 +1114,24 @@ def get_user(db: Session, user_id: int):
 def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100, role: Optional[str] = None):
+def users_query(db: Session, role: Optional[str] = None):
+    """Users matching the admin list filters, unordered"""
     query = db.query(User)
     if role:
         query = query.filter(User.role == role)
-    return query.offset(skip).limit(limit).all()
+    return query
+
+def get_users(db: Session, skip: int = 0, limit: int = 100, role: Optional[str] = None,
+              after: Optional[tuple] = None):
+    """Users newest first, ordered by (created_at, id) descending. `after`
+    is the sort key of the last row of the previous page."""
+    query = users_query(db, role=role)
+    if after:
+        query = query.filter(tuple_(User.created_at, User.id) < after)
+    query = query.order_by(User.created_at.desc(), User.id.desc())
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_user(db: Session, user: UserCreate):
     hashed_password = get_password_hash(user.password)
@@ -270,58 +1170,54 @@ def delete_user(db: Session, user_id: int):
     return db_user
 
 def get_user_bookings(db: Session, user_id: int):
-    """Get all bookings for a user"""
-    return db.query(Booking).filter(Booking.user_id == user_id).order_by(Booking.created_at.desc()).all()
+    """Get all bookings for a user, with their showtime details"""
+    return _with_showtime_details(db.query(Booking)).filter(Booking.user_id == user_id).order_by(Booking.created_at.desc()).all()
 
 # Admin stats
+def _current_month_range():
+    """[start of this month, start of next month) - a range predicate can use
+    the created_at indexes where extract(month/year) cannot"""
+    start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
 def get_user_stats(db: Session):
-    """Get user statistics for admin dashboard"""
-    current_date = datetime.now()
-    current_month = current_date.month
-    current_year = current_date.year
+    """Get user statistics for admin dashboard, in one pass over users"""
+    month_start, month_end = _current_month_range()
+    is_user = User.role == "user"
     
-    total_users = db.query(User).filter(User.role == "user").count()
-    active_users = db.query(User).filter(User.role == "user", User.is_active == True).count()
-    total_admins = db.query(User).filter(User.role.in_(["admin", "super_admin"])).count()
-    users_this_month = db.query(User).filter(
-        User.role == "user",
-        extract('month', User.created_at) == current_month,
-        extract('year', User.created_at) == current_year
-    ).count()
+    stats = db.query(
+        func.count().filter(is_user).label("total_users"),
+        func.count().filter(is_user, User.is_active == True).label("active_users"),
+        func.count().filter(User.role.in_(["admin", "super_admin"])).label("total_admins"),
+        func.count().filter(
+            is_user,
+            User.created_at >= month_start,
+            User.created_at < month_end
+        ).label("users_this_month")
+    ).select_from(User).one()
     
-    return {
-        "total_users": total_users,
-        "active_users": active_users, 
-        "total_admins": total_admins,
-        "users_this_month": users_this_month
-    }
+    return dict(stats._mapping)
 
 def get_booking_stats(db: Session):
-    """Get booking statistics for admin dashboard"""
-    current_date = datetime.now()
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    total_bookings = db.query(Booking).count()
-    confirmed_bookings = db.query(Booking).filter(Booking.status == "confirmed").count()
-    cancelled_bookings = db.query(Booking).filter(Booking.status == "cancelled").count()
-    bookings_this_month = db.query(Booking).filter(
-        extract('month', Booking.created_at) == current_month,
-        extract('year', Booking.created_at) == current_year
-    ).count()
+    """Get booking statistics for admin dashboard from the daily rollup, so
+    the cost grows with days of history rather than with bookings"""
+    month_start, month_end = _current_month_range()
+    this_month = and_(BookingDailyStat.day >= month_start.date(), BookingDailyStat.day < month_end.date())
     
-    # Calculate revenue this month
-    revenue_result = db.query(func.sum(Booking.total_amount)).filter(
-        Booking.status == "confirmed",
-        extract('month', Booking.created_at) == current_month,
-        extract('year', Booking.created_at) == current_year
-    ).scalar()
-    revenue_this_month = float(revenue_result) if revenue_result else 0.0
+    stats = db.query(
+        func.coalesce(func.sum(BookingDailyStat.bookings), 0).label("total_bookings"),
+        func.coalesce(func.sum(BookingDailyStat.confirmed), 0).label("confirmed_bookings"),
+        func.coalesce(func.sum(BookingDailyStat.cancellations), 0).label("cancelled_bookings"),
+        func.coalesce(func.sum(BookingDailyStat.bookings).filter(this_month), 0).label("bookings_this_month"),
+        # Revenue this month
+        func.sum(BookingDailyStat.revenue).filter(this_month).label("revenue")
+    ).one()
     
     return {
-        "total_bookings": total_bookings,
-        "confirmed_bookings": confirmed_bookings,
-        "cancelled_bookings": cancelled_bookings, 
-        "bookings_this_month": bookings_this_month,
-        "revenue_this_month": revenue_this_month
-    }
\ No newline at end of file
+        "total_bookings": stats.total_bookings,
+        "confirmed_bookings": stats.confirmed_bookings,
+        "cancelled_bookings": stats.cancelled_bookings, 
+        "bookings_this_month": stats.bookings_this_month,
+        "revenue_this_month": float(stats.revenue) if stats.revenue else 0.0
+    }
@@ -0,0 +1,104 @@
+"""
+In-process seat event fan-out for Galaxy Cinema
+Bookings and cancellations publish one event per committed seat change;
+every stream watching that showtime gets it from its own bounded queue,
+so a premiere with thousands of watchers still costs a single write per
+booking. Watchers that fall too far behind are evicted and reconnect.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SEAT_EVENT_QUEUE_SIZE = int(os.getenv("SEAT_EVENT_QUEUE_SIZE", "64"))
+SEAT_STREAM_KEEPALIVE_SECONDS = float(os.getenv("SEAT_STREAM_KEEPALIVE_SECONDS", "15"))
+
+# Put on a subscriber's queue when it is evicted; the stream then closes
+EVICTED = None
+
+class SeatEventBroker:
+    def __init__(self, queue_size: int = SEAT_EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, showtime_id: int) -> asyncio.Queue:
+        """Register a watcher; must be called from the event loop"""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers[showtime_id].add(queue)
+        return queue
+
+    def unsubscribe(self, showtime_id: int, queue: asyncio.Queue):
+        with self._lock:
+            watchers = self._subscribers.get(showtime_id)
+            if watchers is not None:
+                watchers.discard(queue)
+                if not watchers:
+                    del self._subscribers[showtime_id]
+
+    def subscriber_count(self, showtime_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(showtime_id, ()))
+
+    def publish(self, showtime_id: int, event: str, data: dict):
+        """Queue an event for every watcher of the showtime; safe to call
+        from the worker threads that run the sync endpoints"""
+        with self._lock:
+            if not self._subscribers.get(showtime_id):
+                return
+            loop = self._loop
+        # Serialize once, not once per watcher
+        version = data.get("version")
+        message = format_event(event, data, event_id=version)
+        try:
+            loop.call_soon_threadsafe(self._fan_out, showtime_id, (version, message))
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _fan_out(self, showtime_id: int, message: tuple):
+        with self._lock:
+            watchers = list(self._subscribers.get(showtime_id, ()))
+        for queue in watchers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._evict(showtime_id, queue)
+
+    def _evict(self, showtime_id: int, queue: asyncio.Queue):
+        self.unsubscribe(showtime_id, queue)
+        # Drop the backlog so the stream sees the eviction next
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(EVICTED)
+        logger.info(f"Evicted slow seat event watcher on showtime {showtime_id}")
+
+def format_event(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Server-Sent Events wire format"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+broker = SeatEventBroker()
+
+def publish_seat_change(showtime_id: int, version: int, available_seats: int,
+                        booked: List[str] = (), released: List[str] = ()):
+    broker.publish(showtime_id, "seats", {
+        "showtime_id": showtime_id,
+        "version": version,
+        "available_seats": available_seats,
+        "booked": list(booked),
+        "released": list(released)
+    })
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Check that every crud query is served by an index
+Runs each crud function against the local database inside a transaction
+that is rolled back, captures the SQL it issues, and EXPLAINs each
+statement. Fails when a plan filters a table holding more than --min-rows
+rows with a sequential scan (or a full index scan, which is the same
+thing in disguise).
+
+Run against a seeded local database (never production):
+    python seed_data.py && python migrate.py && python explain_check.py
+
+A small seed leaves every table tiny, where a sequential scan is the right
+plan; --no-seqscan makes the planner avoid them (and hash/merge joins)
+whenever any index applies, so the remaining ones point at predicates with
+no usable index.
+"""
+
+import argparse
+import json
+import sys
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from database import engine
+from models import Movie, Cinema, Screen, Showtime, News, User
+from schemas import BookingCreate, ScheduleCreate, SeatLayoutBase
+import crud
+import seatmap
+
+EXPLAINED = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+def crud_calls(db: Session):
+    """(name, call) pairs covering the queries in crud.py, with arguments
+    taken from whatever the seeded database contains"""
+    showtime = db.query(Showtime).join(Screen, Screen.id == Showtime.screen_id).order_by(Showtime.id).first()
+    movie = db.query(Movie).first()
+    cinema = db.query(Cinema).first()
+    news = db.query(News).first()
+    user = db.query(User).first()
+    if not (showtime and movie and cinema):
+        sys.exit("❌ Seed the database first (python seed_data.py)")
+
+    layout = seatmap.get_layout(showtime.screen.layout, showtime.screen.total_seats)
+    taken = layout.from_bits(showtime.seat_bitmap)
+    free = [code for code in layout.codes((1 << layout.size) - 1)
+            if layout.is_valid(code) and layout.is_free(taken, code)][:4]
+
+    def book(seats, key=None):
+        return crud.create_booking(db, BookingCreate(
+            showtime_id=showtime.id,
+            customer_name="Explain",
+            customer_phone="0900000000",
+            customer_email="explain@example.com",
+            seats=seats,
+            total_amount=Decimal("1")
+        ), idempotency_key=key)
+
+    def booking_lifecycle():
+        booking = book(free[:2], key="explain-check")
+        crud.get_idempotency_key(db, "explain-check")
+        crud.get_booking(db, booking.id)
+        crud.get_booking_details(db, booking.id)
+        crud.get_booking_by_code(db, booking.booking_code)
+        crud.cancel_booking(db, booking.id)
+
+    def hold_lifecycle():
+        hold = crud.create_seat_hold(db, showtime.id, free[2:4])
+        crud.get_active_seat_hold(db, showtime.id, hold.token, for_update=True)
+        crud.release_seat_hold(db, showtime.id, hold.token)
+
+    return [
+        ("get_movies", lambda: crud.get_movies(db)),
+        ("get_movies(status)", lambda: crud.get_movies(db, status="showing")),
+        ("get_movie", lambda: crud.get_movie(db, movie.id)),
+        ("search_movies", lambda: crud.search_movies(db, movie.title)),
+        ("get_cinemas(province)", lambda: crud.get_cinemas(db, province=cinema.province)),
+        ("get_cinema", lambda: crud.get_cinema(db, cinema.id)),
+        ("get_screens_by_cinema", lambda: crud.get_screens_by_cinema(db, cinema.id)),
+        ("get_showtime", lambda: crud.get_showtime(db, showtime.id)),
+        ("showtime_exists", lambda: crud.showtime_exists(db, showtime.id)),
+        ("get_showtime_layout", lambda: crud.get_showtime_layout(db, showtime.id)),
+        ("get_showtime_seat_map", lambda: crud.get_showtime_seat_map(db, showtime)),
+        ("get_seat_map_state", lambda: crud.get_seat_map_state(db, showtime.id)),
+        ("get_seat_changes", lambda: crud.get_seat_changes(db, showtime.id, 0)),
+        ("get_showtimes", lambda: crud.get_showtimes(db, movie_id=movie.id)),
+        ("get_showtimes_with_details", lambda: crud.get_showtimes_with_details(db, limit=101)),
+        ("get_showtimes_with_details(movie)", lambda: crud.get_showtimes_with_details(db, movie_id=movie.id, limit=101)),
+        ("get_showtimes_with_details(cinema)", lambda: crud.get_showtimes_with_details(db, cinema_id=cinema.id, limit=101)),
+        ("get_showtimes_with_details(date)", lambda: crud.get_showtimes_with_details(db, show_date=showtime.show_date, limit=101)),
+        ("get_showtimes_with_details(after)", lambda: crud.get_showtimes_with_details(
+            db, limit=101, after=(showtime.show_date, showtime.show_time, showtime.id))),
+        ("get_available_dates(movie)", lambda: crud.get_available_dates(db, movie_id=movie.id)),
+        ("get_available_dates(cinema)", lambda: crud.get_available_dates(db, cinema_id=cinema.id)),
+        ("get_available_times", lambda: crud.get_available_times(db, movie.id, cinema.id, showtime.show_date)),
+        ("create_showtime_schedule", lambda: crud.create_showtime_schedule(db, ScheduleCreate(
+            start_date=showtime.show_date, end_date=showtime.show_date, screens=[{
+                "screen_id": showtime.screen_id, "price": Decimal("1"),
+                "slots": [{"movie_id": movie.id, "start_times": [showtime.show_time]}]
+            }]))),
+        ("create_booking/cancel_booking", booking_lifecycle),
+        ("seat holds", hold_lifecycle),
+        ("sweep_expired_holds", lambda: crud.sweep_expired_holds(db)),
+        ("purge_expired_idempotency_keys", lambda: crud.purge_expired_idempotency_keys(db)),
+        ("prune_seat_changes", lambda: crud.prune_seat_changes(db, timedelta(hours=24))),
+        ("update_screen_layout", lambda: crud.update_screen_layout(
+            db, showtime.screen_id, SeatLayoutBase(**layout.to_dict()))),
+        ("get_news", lambda: crud.get_news(db)),
+        ("get_news(category)", lambda: crud.get_news(db, category="promotion")),
+        ("get_news_item", lambda: crud.get_news_item(db, news.id if news else 0)),
+        ("get_user", lambda: crud.get_user(db, user.id if user else 0)),
+        ("get_user_by_email", lambda: crud.get_user_by_email(db, "explain@example.com")),
+        ("get_users", lambda: crud.get_users(db, limit=101)),
+        ("get_users(role)", lambda: crud.get_users(db, role="admin")),
+        ("get_users(after)", lambda: crud.get_users(db, limit=101, after=(showtime.created_at, 0))),
+        ("get_bookings", lambda: crud.get_bookings(db, limit=101)),
+        ("get_bookings(status)", lambda: crud.get_bookings(db, limit=101, status="confirmed")),
+        ("get_bookings(cinema)", lambda: crud.get_bookings(db, limit=101, cinema_id=cinema.id)),
+        ("get_bookings(email)", lambda: crud.get_bookings(db, limit=101, customer_email="Explain@example.com")),
+        ("get_bookings(dates)", lambda: crud.get_bookings(
+            db, limit=101, created_from=showtime.show_date, created_to=showtime.show_date)),
+        ("get_bookings(after)", lambda: crud.get_bookings(db, limit=101, after=(showtime.created_at, 0))),
+        ("bookings_export_query", lambda: db.execute(
+            crud.bookings_export_query(showtime.show_date, showtime.show_date)).all()),
+        ("get_user_bookings", lambda: crud.get_user_bookings(db, user.id if user else 0)),
+        ("get_user_stats", lambda: crud.get_user_stats(db)),
+        ("get_booking_stats", lambda: crud.get_booking_stats(db)),
+        ("get_daily_stats", lambda: crud.get_daily_stats(db, showtime.show_date, showtime.show_date)),
+        ("get_daily_stats(cinema)", lambda: crud.get_daily_stats(
+            db, showtime.show_date, showtime.show_date, cinema_id=cinema.id)),
+        ("rebuild_daily_stats", lambda: crud.rebuild_daily_stats(db)),
+        ("rebuild_showtime_sales", lambda: crud.rebuild_showtime_sales(db)),
+        ("showtime_sales_query", lambda: crud.showtime_sales_query(db, showtime.show_date, showtime.show_date).all()),
+        ("showtime_sales_query(cinema)", lambda: crud.showtime_sales_query(
+            db, showtime.show_date, showtime.show_date, cinema_id=cinema.id).all()),
+    ]
+
+def unindexed_scans(plan):
+    """(relation, node type) for every scan in a plan (EXPLAIN FORMAT JSON
+    node) that filters rows without an index condition: a Seq Scan, or an
+    index walked end to end only for its order. Unfiltered scans read the
+    whole table on purpose and are not reported."""
+    found = []
+    node = plan.get("Node Type")
+    if "Filter" in plan and (
+        node == "Seq Scan"
+        or (node in ("Index Scan", "Index Only Scan") and "Index Cond" not in plan)
+    ):
+        found.append((plan["Relation Name"], node))
+    for child in plan.get("Plans", ()):
+        found.extend(unindexed_scans(child))
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-rows", type=int, default=1000,
+                        help="Ignore sequential scans of tables at most this large")
+    parser.add_argument("--no-seqscan", action="store_true",
+                        help="Plan as if tables were large (no seq scans or hash/merge joins); implies --min-rows 0")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its scans")
+    args = parser.parse_args()
+    min_rows = 0 if args.no_seqscan else args.min_rows
+
+    connection = engine.connect()
+    outer = connection.begin()
+    # crud functions commit; make those savepoints so everything is rolled back at the end
+    db = Session(bind=connection, join_transaction_mode="create_savepoint")
+    captured = []
+    current = [None]
+
+    @event.listens_for(connection, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if current[0] and not executemany and statement.lstrip().upper().startswith(EXPLAINED):
+            captured.append((current[0], statement, parameters))
+
+    failures = 0
+    try:
+        connection.execute(text("ANALYZE"))
+        sizes = dict(connection.execute(text(
+            "SELECT relname, GREATEST(reltuples, 0)::bigint FROM pg_class WHERE relkind = 'r'"
+        )).all())
+
+        calls = crud_calls(db)
+        for name, call in calls:
+            current[0] = name
+            call()
+        current[0] = None
+        event.remove(connection, "before_cursor_execute", capture)
+
+        if args.no_seqscan:
+            # Selective lookups on large tables plan as index-driven nested loops
+            for setting in ("enable_seqscan", "enable_hashjoin", "enable_mergejoin"):
+                connection.execute(text(f"SET LOCAL {setting} = off"))
+
+        raw = connection.connection.dbapi_connection.cursor()
+        seen = set()
+        for name, statement, parameters in captured:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            raw.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = raw.fetchone()[0]
+            plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+            bad = {f"{node} on {table}" for table, node in unindexed_scans(plan) if sizes.get(table, 0) > min_rows}
+            if bad:
+                failures += 1
+                print(f"❌ {name}: {', '.join(sorted(bad))}")
+                print(f"   {' '.join(statement.split())[:300]}")
+            elif args.verbose:
+                print(f"✅ {name}: {' '.join(statement.split())[:120]}")
+
+        print(f"{len(seen)} statements from {len(calls)} crud calls explained, {failures} with unindexed scans")
+    finally:
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    if failures:
+        sys.exit(1)
+    print("✅ Every crud query is served by an index")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+HTTP validators and Cache-Control for read endpoints
+ETags are weak (W/"..."), compared the weak way If-None-Match asks for;
+If-Modified-Since is only consulted when If-None-Match is absent.
+Cache-Control comes from CACHE_CONTROL_<ROUTE> (e.g. CACHE_CONTROL_MOVIES)
+so each route's policy can be tuned without a deploy.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+
+from fastapi import Request, Response
+
+DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+class CachedBody(NamedTuple):
+    """A rendered JSON body with its validators"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime] = None  # Aware UTC, whole seconds
+
+def content_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+def cache_control(route: str, default: str = DEFAULT_CACHE_CONTROL) -> str:
+    return os.getenv(f"CACHE_CONTROL_{route.upper()}", default)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+def validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+def not_modified(etag: str, cache_control: str = "no-cache", last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, cache_control, last_modified))
+
+def is_fresh(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """True when the client's copy (per its conditional headers) is current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    return not_modified_since(request.headers.get("if-modified-since"), last_modified)
+
+def conditional_response(request: Request, cached: CachedBody, route: str) -> Response:
+    """304 when the client's copy is current, else the body, with validators either way"""
+    policy = cache_control(route)
+    if is_fresh(request, cached.etag, cached.last_modified):
+        return not_modified(cached.etag, policy, cached.last_modified)
+    return Response(
+        cached.body,
+        media_type="application/json",
+        headers=validator_headers(cached.etag, policy, cached.last_modified)
+    )
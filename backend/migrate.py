@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Apply pending schema migrations
+Run after deploying a release that adds a file under migrations/;
+--status lists applied and pending migrations without changing anything.
+"""
+
+import argparse
+from database import engine, create_tables
+from migrations import run_migrations, available_migrations, migration_status
+import models  # Register tables with Base.metadata
+
+def migrate():
+    """Create missing tables, then apply pending migrations"""
+    create_tables()
+    applied = run_migrations(engine)
+    if applied:
+        for name in applied:
+            print(f"✅ Applied {name}")
+    else:
+        print(f"✅ Schema up to date ({len(available_migrations())} migrations)")
+
+def status():
+    for version, name, applied_at in migration_status(engine):
+        print(f"{'✅' if applied_at else '⏳'} {name}" + (f"  ({applied_at:%Y-%m-%d %H:%M})" if applied_at else "  pending"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they are applied")
+    args = parser.parse_args()
+    status() if args.status else migrate()
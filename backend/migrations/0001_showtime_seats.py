@@ -0,0 +1,28 @@
+"""
+Move booked seats from the showtimes.booked_seats array into showtime_seats
+Each booked seat becomes one inventory row, linked to the confirmed booking
+that holds it when one exists. The array column is dropped afterwards.
+"""
+
+from sqlalchemy import inspect, text
+
+def upgrade(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("showtimes")}
+    if "booked_seats" not in columns:
+        return
+    
+    conn.execute(text("""
+        INSERT INTO showtime_seats (showtime_id, seat_code, status, booking_id)
+        SELECT s.id, seat.code, 'booked', (
+            SELECT b.id FROM bookings b
+            WHERE b.showtime_id = s.id
+              AND b.status = 'confirmed'
+              AND seat.code = ANY(b.seats)
+            ORDER BY b.id
+            LIMIT 1
+        )
+        FROM showtimes s
+        CROSS JOIN LATERAL unnest(s.booked_seats) AS seat(code)
+        ON CONFLICT (showtime_id, seat_code) DO NOTHING
+    """))
+    conn.execute(text("ALTER TABLE showtimes DROP COLUMN booked_seats"))
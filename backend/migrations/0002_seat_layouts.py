@@ -0,0 +1,34 @@
+"""
+Add screen layouts and per-showtime seat bitmaps
+Screens without a layout keep using the default grid derived from
+total_seats; bitmaps are backfilled from showtime_seats for showtimes that
+already have bookings.
+"""
+
+from sqlalchemy import text
+import seatmap
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE screens ADD COLUMN IF NOT EXISTS layout JSON"))
+    conn.execute(text("ALTER TABLE showtimes ADD COLUMN IF NOT EXISTS seat_bitmap BIT VARYING"))
+    
+    rows = conn.execute(text("""
+        SELECT st.id, sc.layout, sc.total_seats, array_agg(ss.seat_code)
+        FROM showtimes st
+        JOIN screens sc ON sc.id = st.screen_id
+        JOIN showtime_seats ss ON ss.showtime_id = st.id AND ss.status = 'booked'
+        WHERE st.seat_bitmap IS NULL
+        GROUP BY st.id, sc.id
+    """)).all()
+    
+    updates = []
+    for showtime_id, layout_def, total_seats, codes in rows:
+        layout = seatmap.get_layout(layout_def, total_seats)
+        # Legacy free-form codes outside the grid stay in showtime_seats only
+        valid = [code for code in codes if layout.is_valid(code)]
+        updates.append({"id": showtime_id, "bits": layout.to_bits(layout.mask(valid))})
+    if updates:
+        conn.execute(
+            text("UPDATE showtimes SET seat_bitmap = CAST(:bits AS BIT VARYING) WHERE id = :id"),
+            updates
+        )
@@ -0,0 +1,14 @@
+"""
+Link held inventory rows to seat_holds
+The seat_holds table itself comes from create_tables(); deleting a hold
+cascades to the showtime_seats rows it holds.
+"""
+
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text(
+        "ALTER TABLE showtime_seats ADD COLUMN IF NOT EXISTS hold_id INTEGER "
+        "REFERENCES seat_holds(id) ON DELETE CASCADE"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_showtime_seats_hold_id ON showtime_seats (hold_id)"))
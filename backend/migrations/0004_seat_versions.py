@@ -0,0 +1,17 @@
+"""
+Add per-showtime seat versions
+Showtimes that already have booked seats start at version 1 with the delta
+floor at 1, so clients asking for changes from before the log existed get
+a full seat map instead.
+"""
+
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE showtimes ADD COLUMN IF NOT EXISTS seat_version INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("ALTER TABLE showtimes ADD COLUMN IF NOT EXISTS seat_version_floor INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("""
+        UPDATE showtimes SET seat_version = 1, seat_version_floor = 1
+        WHERE seat_version = 0
+          AND EXISTS (SELECT 1 FROM showtime_seats ss WHERE ss.showtime_id = showtimes.id)
+    """))
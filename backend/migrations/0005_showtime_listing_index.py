@@ -0,0 +1,12 @@
+"""
+Index showtimes in listing order
+GET /api/showtimes sorts by (show_date, show_time, id) and pages with a
+keyset cursor on the same columns.
+"""
+
+from sqlalchemy import text
+
+def upgrade(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_showtimes_date_time_id ON showtimes (show_date, show_time, id)"
+    ))
@@ -0,0 +1,32 @@
+"""
+Index the filter and sort columns used by crud.py
+Built concurrently so bookings keep flowing while large tables are indexed.
+"""
+
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    # Showtime listings, available dates/times and the booking wizard
+    ("ix_showtimes_movie_date_time_id", "ON showtimes (movie_id, show_date, show_time, id)"),
+    ("ix_showtimes_cinema_date_time_id", "ON showtimes (cinema_id, show_date, show_time, id)"),
+    ("ix_showtimes_movie_cinema_date_time", "ON showtimes (movie_id, cinema_id, show_date, show_time)"),
+    ("ix_showtimes_screen_id", "ON showtimes (screen_id)"),
+    ("ix_screens_cinema_id", "ON screens (cinema_id)"),
+    # Bookings by showtime, by user (newest first), by status and by month
+    ("ix_bookings_showtime_id", "ON bookings (showtime_id)"),
+    ("ix_bookings_user_created_at", "ON bookings (user_id, created_at)"),
+    ("ix_bookings_status_created_at", "ON bookings (status, created_at)"),
+    ("ix_bookings_created_at", "ON bookings (created_at)"),
+    # Active news, newest first, optionally by category
+    ("ix_news_active_publish_date", "ON news (publish_date) WHERE is_active"),
+    ("ix_news_active_category_publish_date", "ON news (category, publish_date) WHERE is_active"),
+    ("ix_movies_status", "ON movies (status)"),
+    ("ix_cinemas_province", "ON cinemas (province)"),
+    ("ix_users_role_created_at", "ON users (role, created_at)"),
+]
+
+def upgrade(conn):
+    for name, definition in INDEXES:
+        create_index_concurrently(conn, name, definition)
@@ -0,0 +1,26 @@
+"""
+Add the movie search vector
+Folding happens in Python (search.fold), so existing movies are folded here
+and written back in one executemany; new and edited movies get theirs from
+the ORM hook in models.py.
+"""
+
+from sqlalchemy import bindparam, select, text, update
+from models import Movie
+import search
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE movies ADD COLUMN IF NOT EXISTS search_vector TSVECTOR"))
+    rows = conn.execute(select(Movie.id, Movie.title, Movie.director, Movie.cast, Movie.genre)).all()
+    if rows:
+        movies = Movie.__table__
+        conn.execute(
+            update(movies)
+            .where(movies.c.id == bindparam("b_id"))
+            .values(search_vector=search.weighted_vector(bindparam("b_title"), bindparam("b_people"), bindparam("b_genre"))),
+            [
+                dict(zip(("b_title", "b_people", "b_genre"), search.search_fields(row.title, row.director, row.cast, row.genre)), b_id=row.id)
+                for row in rows
+            ]
+        )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_movies_search_vector ON movies USING gin (search_vector)"))
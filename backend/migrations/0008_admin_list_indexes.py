@@ -0,0 +1,28 @@
+"""
+Index the admin users and bookings lists in keyset order
+Both lists sort by (created_at, id) descending and page with a cursor on
+those columns, so every filter's index ends in them. The (created_at),
+(status, created_at) and (role, created_at) indexes they extend are
+dropped once the replacements are built.
+"""
+
+from sqlalchemy import text
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_bookings_created_at_id", "ON bookings (created_at, id)"),
+    ("ix_bookings_status_created_at_id", "ON bookings (status, created_at, id)"),
+    ("ix_bookings_email_created_at_id", "ON bookings (lower(customer_email), created_at, id)"),
+    ("ix_users_created_at_id", "ON users (created_at, id)"),
+    ("ix_users_role_created_at_id", "ON users (role, created_at, id)"),
+]
+
+SUPERSEDED = ["ix_bookings_created_at", "ix_bookings_status_created_at", "ix_users_role_created_at"]
+
+def upgrade(conn):
+    for name, definition in INDEXES:
+        create_index_concurrently(conn, name, definition)
+    for name in SUPERSEDED:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
@@ -0,0 +1,10 @@
+"""
+Fill the booking_daily_stats rollup from existing bookings
+create_tables() adds the (empty) table; from here on crud keeps it current
+in every booking's transaction.
+"""
+
+import crud
+
+def upgrade(conn):
+    crud.rebuild_daily_stats(conn)
@@ -0,0 +1,10 @@
+"""
+Index showtime_seat_changes by age for the retention pass in tasks.py
+"""
+
+from migrations import create_index_concurrently
+
+TRANSACTIONAL = False
+
+def upgrade(conn):
+    create_index_concurrently(conn, "ix_showtime_seat_changes_created_at", "ON showtime_seat_changes (created_at)")
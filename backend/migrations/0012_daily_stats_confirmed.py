@@ -0,0 +1,12 @@
+"""
+Count confirmed bookings in booking_daily_stats
+Adds the confirmed column and regenerates the rollup, which now also counts
+bookings whose showtime is gone (under cinema and movie 0).
+"""
+
+from sqlalchemy import text
+import crud
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE booking_daily_stats ADD COLUMN IF NOT EXISTS confirmed INTEGER NOT NULL DEFAULT 0"))
+    crud.rebuild_daily_stats(conn)
@@ -0,0 +1,107 @@
+"""
+Schema migrations for Galaxy Cinema
+Each module in this package named NNNN_description.py defines upgrade(conn)
+and runs once; applied versions are recorded in the schema_migrations table.
+New tables still come from create_tables(); migrations cover changes that
+create_all cannot make (backfills, column changes on existing tables).
+
+A migration that sets TRANSACTIONAL = False runs on an autocommit
+connection instead, for statements such as CREATE INDEX CONCURRENTLY that
+cannot run inside a transaction; it must be safe to re-run if interrupted.
+"""
+
+import importlib
+import logging
+import re
+from pathlib import Path
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent
+_VERSION_RE = re.compile(r"^(\d{4})_\w+\.py$")
+
+def available_migrations():
+    """Return (version, module_name) pairs sorted by version"""
+    found = []
+    for path in MIGRATIONS_DIR.iterdir():
+        match = _VERSION_RE.match(path.name)
+        if match:
+            found.append((match.group(1), path.stem))
+    return sorted(found)
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(4) PRIMARY KEY, "
+        "name VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+# pg_advisory_lock key shared by every process applying migrations
+MIGRATION_LOCK_ID = 4_201_770
+
+def _record(conn, version: str, name: str):
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+        {"v": version, "n": name}
+    )
+
+def _is_applied(conn, version: str) -> bool:
+    return conn.execute(text("SELECT 1 FROM schema_migrations WHERE version = :v"), {"v": version}).first() is not None
+
+def _apply(engine, version: str, name: str, module) -> bool:
+    if getattr(module, "TRANSACTIONAL", True):
+        with engine.begin() as conn:
+            # Serialize concurrent workers starting up at the same time
+            conn.execute(text("LOCK TABLE schema_migrations IN EXCLUSIVE MODE"))
+            if _is_applied(conn, version):
+                return False
+            module.upgrade(conn)
+            _record(conn, version, name)
+        return True
+    
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        try:
+            if _is_applied(conn, version):
+                return False
+            module.upgrade(conn)
+            _record(conn, version, name)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    return True
+
+def run_migrations(engine):
+    """Apply pending migrations in order, each in its own transaction"""
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    
+    applied = []
+    for version, name in available_migrations():
+        if version in done:
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        if _apply(engine, version, name, module):
+            logger.info(f"Applied migration {name}")
+            applied.append(name)
+    return applied
+
+def migration_status(engine):
+    """Return (version, name, applied_at or None) for every known migration"""
+    with engine.begin() as conn:
+        applied_versions(conn)
+        applied = dict(conn.execute(text("SELECT version, applied_at FROM schema_migrations")).all())
+    return [(version, name, applied.get(version)) for version, name in available_migrations()]
+
+def create_index_concurrently(conn, name: str, definition: str):
+    """CREATE INDEX CONCURRENTLY without blocking writes. An interrupted build
+    leaves an invalid index behind, so drop that first and build it again."""
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
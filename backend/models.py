@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, Date, Time, TIMESTAMP, ForeignKey, ARRAY, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, Column, Integer, String, Text, DECIMAL, Boolean, Date, Time, TIMESTAMP, ForeignKey, ARRAY, Enum, JSON, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import BIT, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from database import Base
+import search
 import uuid
 import enum
 
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        Index("ix_movies_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -14,25 +19,32 @@ class Movie(Base):
     rating = Column(String(10))  # T13, T16, T18, K
     genre = Column(Text)
     duration = Column(Integer)  # minutes
-    status = Column(String(20), default="coming")  # showing, coming, stopped
+    status = Column(String(20), default="coming", index=True)  # showing, coming, stopped
     trailer = Column(Text)  # YouTube URL
     description = Column(Text)
     director = Column(String(255))
     cast = Column(ARRAY(String))  # Array of cast members
     release_date = Column(Date)
+    search_vector = deferred(Column(TSVECTOR))  # Accent-folded title, people and genre - see search.py; only read in SQL
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     showtimes = relationship("Showtime", back_populates="movie")
 
+@event.listens_for(Movie, "before_insert")
+@event.listens_for(Movie, "before_update")
+def _index_movie(mapper, connection, movie):
+    """Keep search_vector in step with every ORM write to a movie"""
+    movie.search_vector = search.search_vector(movie.title, movie.director, movie.cast, movie.genre)
+
 class Cinema(Base):
     __tablename__ = "cinemas"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     address = Column(Text)
-    province = Column(String(100))
+    province = Column(String(100), index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
@@ -43,10 +55,11 @@ class Screen(Base):
     __tablename__ = "screens"
     
     id = Column(Integer, primary_key=True, index=True)
-    cinema_id = Column(Integer, ForeignKey("cinemas.id"))
+    cinema_id = Column(Integer, ForeignKey("cinemas.id"), index=True)
     screen_number = Column(Integer)
     screen_type = Column(String(20))  # 2D, 3D, IMAX
     total_seats = Column(Integer)
+    layout = Column(JSON)  # rows, columns, aisles, gaps, seat_classes - see seatmap.py
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
@@ -55,16 +68,24 @@ class Screen(Base):
 
 class Showtime(Base):
     __tablename__ = "showtimes"
+    __table_args__ = (
+        Index("ix_showtimes_date_time_id", "show_date", "show_time", "id"),  # Listing order and keyset cursor
+        Index("ix_showtimes_movie_date_time_id", "movie_id", "show_date", "show_time", "id"),  # Listing/dates by movie
+        Index("ix_showtimes_cinema_date_time_id", "cinema_id", "show_date", "show_time", "id"),  # Listing/dates by cinema
+        Index("ix_showtimes_movie_cinema_date_time", "movie_id", "cinema_id", "show_date", "show_time"),  # Booking wizard
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     movie_id = Column(Integer, ForeignKey("movies.id"))
     cinema_id = Column(Integer, ForeignKey("cinemas.id"))
-    screen_id = Column(Integer, ForeignKey("screens.id"))
+    screen_id = Column(Integer, ForeignKey("screens.id"), index=True)
     show_date = Column(Date)
     show_time = Column(Time)
     price = Column(DECIMAL(10, 2))
     available_seats = Column(Integer)
-    booked_seats = Column(ARRAY(String))  # Array of seat codes
+    seat_bitmap = Column(BIT(varying=True))  # Booked seats over the screen layout grid, NULL = none
+    seat_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every booking/cancel
+    seat_version_floor = Column(Integer, nullable=False, default=0, server_default="0")  # Oldest version a delta can start from
     created_at = Column(TIMESTAMP, server_default=func.now())
     
     # Relationships
@@ -72,12 +93,62 @@ class Showtime(Base):
     cinema = relationship("Cinema", back_populates="showtimes")
     screen = relationship("Screen", back_populates="showtimes")
     bookings = relationship("Booking", back_populates="showtime")
+    seats = relationship("ShowtimeSeat", back_populates="showtime")
+
+class ShowtimeSeat(Base):
+    __tablename__ = "showtime_seats"
+    __table_args__ = (
+        UniqueConstraint("showtime_id", "seat_code", name="uq_showtime_seats_showtime_seat"),
+        Index("ix_showtime_seats_showtime_status", "showtime_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    showtime_id = Column(Integer, ForeignKey("showtimes.id", ondelete="CASCADE"), nullable=False)
+    seat_code = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False, default="booked")  # booked, held
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), index=True)
+    hold_id = Column(Integer, ForeignKey("seat_holds.id", ondelete="CASCADE"), index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    # Relationships
+    showtime = relationship("Showtime", back_populates="seats")
+
+class ShowtimeSeatChange(Base):
+    __tablename__ = "showtime_seat_changes"
+    __table_args__ = (
+        Index("ix_showtime_seat_changes_showtime_version", "showtime_id", "version"),
+        Index("ix_showtime_seat_changes_created_at", "created_at"),  # Retention pass
+    )
+    
+    id = Column(Integer, primary_key=True)
+    showtime_id = Column(Integer, ForeignKey("showtimes.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)  # Showtime.seat_version this change produced
+    seat_code = Column(String(10), nullable=False)
+    status = Column(String(20), nullable=False)  # booked, released
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+class SeatHold(Base):
+    __tablename__ = "seat_holds"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    token = Column(String(64), unique=True, index=True, nullable=False)
+    showtime_id = Column(Integer, ForeignKey("showtimes.id", ondelete="CASCADE"), nullable=False)
+    seats = Column(ARRAY(String))  # Array of seat codes
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_user_created_at", "user_id", "created_at"),  # A user's bookings, newest first
+        # Admin list filters, each in (created_at, id) keyset order; also serve stats
+        Index("ix_bookings_created_at_id", "created_at", "id"),
+        Index("ix_bookings_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_bookings_email_created_at_id", text("lower(customer_email)"), "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    showtime_id = Column(Integer, ForeignKey("showtimes.id"))
+    showtime_id = Column(Integer, ForeignKey("showtimes.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Optional - for registered users
     customer_name = Column(String(255))
     customer_phone = Column(String(20))
@@ -98,8 +169,72 @@ class Booking(Base):
         if not self.booking_code:
             self.booking_code = f"GC{str(uuid.uuid4())[:8].upper()}"
 
+# Bookings per day made, cinema and movie, for dashboards and reports. crud
+# updates the row in each booking's and cancellation's own transaction;
+# rebuild_daily_stats.py regenerates the table from the bookings.
+class BookingDailyStat(Base):
+    __tablename__ = "booking_daily_stats"
+    
+    day = Column(Date, primary_key=True)  # When the bookings were made
+    cinema_id = Column(Integer, primary_key=True)  # 0 (as movie_id) for bookings without a showtime
+    movie_id = Column(Integer, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)  # Made that day, including later cancelled ones
+    confirmed = Column(Integer, nullable=False, default=0)  # Of those, still confirmed
+    seats_sold = Column(Integer, nullable=False, default=0)  # Seats of those not cancelled
+    cancellations = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)  # total_amount of those not cancelled
+
+# Bucket floors, in hours before the show, of ShowtimeSalesStat.seats_<n>h
+SALES_HOURS_AHEAD = (0, 1, 3, 6, 12, 24, 48, 72, 168)
+
+# Bookings per showtime, not cancelled, for occupancy and fill-curve
+# analytics. crud keeps it current next to booking_daily_stats;
+# rebuild_daily_stats.py regenerates both from the bookings.
+class ShowtimeSalesStat(Base):
+    __tablename__ = "showtime_sales_stats"
+    
+    showtime_id = Column(Integer, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0)
+    seats_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    # Seats sold at least n hours, and under the next bucket's, before the show
+    seats_0h = Column(Integer, nullable=False, default=0)  # Also seats sold after it started
+    seats_1h = Column(Integer, nullable=False, default=0)
+    seats_3h = Column(Integer, nullable=False, default=0)
+    seats_6h = Column(Integer, nullable=False, default=0)
+    seats_12h = Column(Integer, nullable=False, default=0)
+    seats_24h = Column(Integer, nullable=False, default=0)
+    seats_48h = Column(Integer, nullable=False, default=0)
+    seats_72h = Column(Integer, nullable=False, default=0)
+    seats_168h = Column(Integer, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), unique=True, index=True, nullable=False)
+    request_hash = Column(String(64), nullable=False)  # SHA-256 of the request body
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"))
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    # Relationships
+    booking = relationship("Booking", lazy="joined")
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    
+    name = Column(String(50), primary_key=True)  # Cached data set, e.g. "catalog"
+    version = Column(Integer, nullable=False, default=0)  # Bumped by every write to that data set
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
 class News(Base):
     __tablename__ = "news"
+    __table_args__ = (
+        # Only active news is ever listed
+        Index("ix_news_active_publish_date", "publish_date", postgresql_where=text("is_active")),
+        Index("ix_news_active_category_publish_date", "category", "publish_date", postgresql_where=text("is_active")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False)
@@ -118,6 +253,11 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Admin user lists in (created_at, id) keyset order, and stats
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
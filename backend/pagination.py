@@ -0,0 +1,58 @@
+"""
+Keyset pagination cursors
+A cursor is the sort key of the last row on a page, encoded as opaque
+URL-safe text; the next page starts strictly after it, so deep pages cost
+the same as the first one. Totals, when asked for, are the planner's
+estimate rather than a COUNT(*) over every matching row.
+"""
+
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+
+def encode_cursor(*values) -> str:
+    """Encode a row's sort key (ints, strings, dates, times) as a cursor"""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime, time)) else v for v in values],
+                     separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types) -> Tuple:
+    """Decode a cursor back into a sort key typed like `types`; raises
+    ValueError when it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    try:
+        return tuple(_parse(value, kind) for value, kind in zip(values, types))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+def _parse(value, kind):
+    if kind in (date, datetime, time):
+        return kind.fromisoformat(value)
+    if kind is int and not isinstance(value, int):
+        raise ValueError(value)
+    return kind(value)
+
+def next_cursor(rows, limit: int, key) -> Tuple[list, Optional[str]]:
+    """Given up to limit + 1 rows, return the page and the cursor for the
+    next one (None on the last page)"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(*key(page[-1]))
+
+def estimated_count(db, query) -> int:
+    """Rows the planner expects query (a Query or select) to return. Costs
+    one EXPLAIN instead of a scan; as accurate as the last ANALYZE."""
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(dialect=db.get_bind().dialect)
+    plan = db.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
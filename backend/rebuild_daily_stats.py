@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Regenerate the booking rollups (booking_daily_stats, showtime_sales_stats) from the bookings table
+Safe while bookings are being taken: they wait for the rebuild and are
+added on top of it. Run after fixing bookings by hand or bulk-loading them.
+"""
+
+import argparse
+import time
+from database import SessionLocal, create_tables
+import models  # Register tables with Base.metadata
+import crud
+
+def rebuild():
+    create_tables()
+    db = SessionLocal()
+    try:
+        for table, rebuild_table in (("booking_daily_stats", crud.rebuild_daily_stats),
+                                     ("showtime_sales_stats", crud.rebuild_showtime_sales)):
+            started = time.perf_counter()
+            rows = rebuild_table(db)
+            db.commit()
+            print(f"✅ Rebuilt {table}: {rows} rows in {time.perf_counter() - started:.1f} s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+    rebuild()
@@ -1,25 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
+from datetime import date, datetime, timedelta
+import os
 from database import get_db
+import analytics
+import booking_export
 import crud
 import schemas
+from pagination import decode_cursor, estimated_count, next_cursor
+from catalog_cache import bump_version as bump_catalog_version, catalog
+from schedule_cache import schedule
 from auth import get_admin_user, get_super_admin_user, get_password_hash
 from schemas import AdminUserCreate, AdminUserUpdate, UserResponse, UserStats, BookingStats
 
+# Longest show-date range one analytics request may cover
+ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "366"))
+
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+def _page_after(cursor: Optional[str], skip: int) -> Optional[tuple]:
+    """(created_at, id) sort key a list page starts after, from its cursor"""
+    if not cursor:
+        return None
+    if skip:
+        raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+    try:
+        return decode_cursor(cursor, datetime, int)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _send_page(response: Response, rows: list, limit: int, query=None, db: Session = None) -> list:
+    """Trim the extra row read to detect a next page into X-Next-Cursor, and
+    put the planner's row estimate for query, if given, in X-Total-Estimate"""
+    page, next_page = next_cursor(rows, limit, lambda row: (row.created_at, row.id))
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
+    if query is not None:
+        response.headers["X-Total-Estimate"] = str(estimated_count(db, query))
+    return page
+
 # User Management (Super Admin only)
 @router.get("/users", response_model=List[UserResponse])
 def get_all_users(
+    response: Response,
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     role: Optional[str] = Query(None),
+    with_total: bool = Query(False, description="Estimate the matching rows into X-Total-Estimate"),
     current_user = Depends(get_super_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all users (Super Admin only)"""
-    return crud.get_users(db, skip=skip, limit=limit, role=role)
+    """Get all users, newest first (Super Admin only).
+    When more rows follow, the X-Next-Cursor header holds the cursor for the next page."""
+    after = _page_after(cursor, skip)
+    users = crud.get_users(db, skip=skip, limit=limit + 1, role=role, after=after)
+    return _send_page(response, users, limit, crud.users_query(db, role=role) if with_total else None, db)
 
 @router.post("/users", response_model=UserResponse)
 def create_admin_user(
@@ -114,7 +152,10 @@ def delete_movie_admin(
         raise HTTPException(status_code=404, detail="Movie not found")
     
     db.delete(movie)
+    bump_catalog_version(db)
     db.commit()
+    catalog.invalidate()
+    schedule.invalidate()
     return {"message": "Movie deleted successfully"}
 
 # Cinema Management (Admin+)
@@ -129,17 +170,52 @@ def get_all_cinemas_admin(
 # Booking Management (Admin+)
 @router.get("/bookings", response_model=List[schemas.Booking])
 def get_all_bookings_admin(
+    response: Response,
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=100),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     status: Optional[str] = Query(None),
+    cinema_id: Optional[int] = Query(None),
+    customer_email: Optional[str] = Query(None, max_length=255, description="Exact address, any case"),
+    created_from: Optional[date] = Query(None, description="Booked on or after (YYYY-MM-DD)"),
+    created_to: Optional[date] = Query(None, description="Booked on or before (YYYY-MM-DD)"),
+    with_total: bool = Query(False, description="Estimate the matching rows into X-Total-Estimate"),
     current_user = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Get all bookings for admin management"""
-    query = db.query(crud.Booking)
-    if status:
-        query = query.filter(crud.Booking.status == status)
-    return query.offset(skip).limit(limit).all()
+    """Get all bookings for admin management, newest first.
+    When more rows follow, the X-Next-Cursor header holds the cursor for the next page."""
+    after = _page_after(cursor, skip)
+    filters = dict(status=status, cinema_id=cinema_id, customer_email=customer_email,
+                   created_from=created_from, created_to=created_to)
+    bookings = crud.get_bookings(db, skip=skip, limit=limit + 1, after=after, **filters)
+    return _send_page(response, bookings, limit, crud.bookings_query(db, **filters) if with_total else None, db)
+
+@router.get("/bookings/export")
+def export_bookings_admin(
+    export_format: schemas.ExportFormat = Query(schemas.ExportFormat.CSV, alias="format"),
+    date_from: Optional[date] = Query(None, alias="from", description="Booked on or after (YYYY-MM-DD); default 30 days before `to`"),
+    date_to: Optional[date] = Query(None, alias="to", description="Booked on or before (YYYY-MM-DD); default today"),
+    current_user = Depends(get_admin_user)
+):
+    """Stream every booking made in the range, oldest first, as CSV or
+    NDJSON; 503 while EXPORT_MAX_CONCURRENCY exports are already running"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    if not booking_export.acquire_slot():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many exports in progress, please retry",
+            headers={"Retry-After": "10"}
+        )
+    filename = f"bookings-{date_from}-{date_to}.{export_format.value}"
+    return StreamingResponse(
+        booking_export.open_stream(crud.bookings_export_query(date_from, date_to), export_format),
+        media_type=booking_export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 # Dashboard Stats (Admin+)
 @router.get("/stats/users", response_model=UserStats)
@@ -156,4 +232,40 @@ def get_booking_stats_admin(
     db: Session = Depends(get_db)
 ):
     """Get booking statistics for dashboard"""
-    return crud.get_booking_stats(db)
\ No newline at end of file
+    return crud.get_booking_stats(db)
+
+@router.get("/stats/daily", response_model=List[schemas.DailyBookingStats])
+def get_daily_stats_admin(
+    date_from: Optional[date] = Query(None, description="First day (YYYY-MM-DD); default 30 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Last day (YYYY-MM-DD); default today"),
+    cinema_id: Optional[int] = Query(None),
+    movie_id: Optional[int] = Query(None),
+    current_user = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Bookings, seats sold, cancellations and revenue per day the bookings were made"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    return crud.get_daily_stats(db, date_from, date_to, cinema_id=cinema_id, movie_id=movie_id)
+
+@router.get("/analytics", response_model=schemas.BookingAnalytics)
+def get_analytics_admin(
+    date_from: Optional[date] = Query(None, description="First show date (YYYY-MM-DD); default 30 days before date_to"),
+    date_to: Optional[date] = Query(None, description="Last show date (YYYY-MM-DD); default today"),
+    cinema_id: Optional[int] = Query(None),
+    movie_id: Optional[int] = Query(None),
+    current_user = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Occupancy, revenue, average ticket price and fill curves (share of
+    capacity sold N hours before the show) per movie, cinema, screen type
+    and day, for the showtimes in the range"""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=30)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {ANALYTICS_MAX_DAYS} days per request")
+    return analytics.booking_analytics(db, date_from, date_to, cinema_id=cinema_id, movie_id=movie_id)
\ No newline at end of file
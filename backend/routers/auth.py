@@ -85,7 +85,7 @@ def update_current_user(
     updated_user = crud.update_user(db, current_user.id, user_update)
     return updated_user
 
-@router.get("/bookings", response_model=list[schemas.Booking])
+@router.get("/bookings", response_model=list[schemas.BookingWithShowtime])
 def get_my_bookings(
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
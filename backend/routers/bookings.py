@@ -1,43 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from typing import List, Optional
 from database import get_db
+from admission import controller as admission_controller
 import crud
 import schemas
 from auth import get_current_user_optional
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
-@router.post("/", response_model=schemas.Booking)
+def _queue_status(admission) -> schemas.BookingQueueStatus:
+    return schemas.BookingQueueStatus(
+        status="admitted" if admission.admitted else "waiting",
+        token=admission.ticket.token,
+        showtime_id=admission.ticket.showtime_id,
+        position=admission.position,
+        retry_after=admission.retry_after
+    )
+
+def _fill_customer(booking: schemas.BookingCreate, current_user):
+    """Attach the logged-in user and fill missing contact details from their profile"""
+    # Add user_id if user is logged in
+    if current_user:
+        booking.user_id = current_user.id
+        # If user is logged in, prefill customer info from user profile
+        if not booking.customer_name:
+            booking.customer_name = current_user.full_name
+        if not booking.customer_email:
+            booking.customer_email = current_user.email
+        if not booking.customer_phone and current_user.phone:
+            booking.customer_phone = current_user.phone
+    
+    # Validate required fields are present
+    if not booking.customer_name:
+        raise HTTPException(status_code=400, detail="Customer name is required")
+    if not booking.customer_email:
+        raise HTTPException(status_code=400, detail="Customer email is required")
+    if not booking.customer_phone:
+        raise HTTPException(status_code=400, detail="Customer phone is required")
+
+def _check_showtime(db: Session, showtime_id: int):
+    """Admission queues are kept per showtime, so only known ids get one"""
+    if not admission_controller.tracks(showtime_id) and not crud.showtime_exists(db, showtime_id):
+        raise HTTPException(status_code=400, detail=f"Showtime {showtime_id} not found")
+
+def _no_booking_slot():
+    return HTTPException(
+        status_code=503,
+        detail="Too many bookings in progress, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+@router.post("/", response_model=schemas.Booking, responses={202: {"model": schemas.BookingQueueStatus}})
 def create_booking(
     booking: schemas.BookingCreate, 
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    queue_token: Optional[str] = Header(None, alias="X-Queue-Token", max_length=64),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user_optional)
 ):
-    """Create new booking"""
+    """Create new booking. Retries carrying the same Idempotency-Key get the first booking back.
+    When the showtime is admitting bookings slower than they arrive, answers 202 with a
+    queue ticket; poll GET /bookings/queue/{token} and retry with X-Queue-Token once admitted."""
     try:
-        # Add user_id if user is logged in
-        if current_user:
-            booking.user_id = current_user.id
-            # If user is logged in, prefill customer info from user profile
-            if not booking.customer_name:
-                booking.customer_name = current_user.full_name
-            if not booking.customer_email:
-                booking.customer_email = current_user.email
-            if not booking.customer_phone and current_user.phone:
-                booking.customer_phone = current_user.phone
+        _fill_customer(booking, current_user)
+        _check_showtime(db, booking.showtime_id)
+        admission = admission_controller.admit(booking.showtime_id, queue_token)
+        if not admission.admitted:
+            return JSONResponse(
+                status_code=202,
+                content=_queue_status(admission).dict(),
+                headers={"Retry-After": str(admission.retry_after)}
+            )
         
-        # Validate required fields are present
-        if not booking.customer_name:
-            raise HTTPException(status_code=400, detail="Customer name is required")
-        if not booking.customer_email:
-            raise HTTPException(status_code=400, detail="Customer email is required")
-        if not booking.customer_phone:
-            raise HTTPException(status_code=400, detail="Customer phone is required")
-        
-        return crud.create_booking(db=db, booking=booking)
+        with admission_controller.booking_slot() as slot:
+            if not slot:
+                raise _no_booking_slot()
+            created, replayed = crud.create_idempotent_booking(db=db, booking=booking, idempotency_key=idempotency_key)
+        admission_controller.release(queue_token)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return created
+    except crud.IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/group", response_model=List[schemas.Booking])
+def create_group_booking(
+    group: schemas.GroupBookingCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user_optional)
+):
+    """Book seats across several showtimes at once: all bookings are created
+    in one transaction, or none are. Group orders do not wait in the booking
+    queue; if any of their showtimes is queueing they get 503 with Retry-After."""
+    for booking in group.bookings:
+        _fill_customer(booking, current_user)
+    
+    for showtime_id in sorted({booking.showtime_id for booking in group.bookings}):
+        _check_showtime(db, showtime_id)
+        admission = admission_controller.try_admit(showtime_id)
+        if not admission.admitted:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Showtime {showtime_id} is busy, please retry",
+                headers={"Retry-After": str(admission.retry_after)}
+            )
+    
+    with admission_controller.booking_slot() as slot:
+        if not slot:
+            raise _no_booking_slot()
+        try:
+            return crud.create_group_booking(db, group.bookings)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/queue/{token}", response_model=schemas.BookingQueueStatus)
+def get_booking_queue_status(token: str, response: Response):
+    """Waiting-room position for a queued booking attempt"""
+    admission = admission_controller.status(token)
+    if not admission:
+        raise HTTPException(status_code=404, detail="Queue ticket not found or expired")
+    if not admission.admitted:
+        response.headers["Retry-After"] = str(admission.retry_after)
+    return _queue_status(admission)
+
 @router.get("/{booking_id}", response_model=schemas.Booking)
 def get_booking(booking_id: int, db: Session = Depends(get_db)):
     """Get booking by ID"""
@@ -64,22 +154,23 @@ def cancel_booking(booking_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{booking_id}/details")
 def get_booking_details(booking_id: int, db: Session = Depends(get_db)):
-    """Get detailed booking information with movie and cinema info"""
-    booking = crud.get_booking(db, booking_id=booking_id)
+    """Get detailed booking information with movie, cinema and screen info"""
+    booking = crud.get_booking_details(db, booking_id=booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    
-    showtime = crud.get_showtime(db, booking.showtime_id)
-    movie = crud.get_movie(db, showtime.movie_id)
-    cinema = crud.get_cinema(db, showtime.cinema_id)
-    
+
+    # The showtime, or its movie, may have been deleted since the booking
+    showtime = booking.showtime
+    movie, cinema, screen = (showtime.movie, showtime.cinema, showtime.screen) if showtime else (None, None, None)
+
     return {
         "booking": booking,
-        "movie": {"id": movie.id, "title": movie.title, "poster": movie.poster},
-        "cinema": {"id": cinema.id, "name": cinema.name, "address": cinema.address},
+        "movie": {"id": movie.id, "title": movie.title, "poster": movie.poster} if movie else None,
+        "cinema": {"id": cinema.id, "name": cinema.name, "address": cinema.address} if cinema else None,
+        "screen": {"id": screen.id, "screen_number": screen.screen_number, "screen_type": screen.screen_type} if screen else None,
         "showtime": {
             "date": showtime.show_date,
             "time": showtime.show_time,
             "price": showtime.price
-        }
+        } if showtime else None
     }
\ No newline at end of file
@@ -1,39 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from database import get_db
 import crud
 import schemas
+from catalog_cache import catalog, render
+from http_cache import conditional_response
 from auth import get_admin_user
 
 router = APIRouter(prefix="/cinemas", tags=["cinemas"])
 
 @router.get("/", response_model=List[schemas.Cinema])
 def get_cinemas(
+    request: Request,
     province: Optional[str] = Query(None, description="Filter by province"),
     db: Session = Depends(get_db)
 ):
-    """Get list of cinemas with optional province filter"""
-    cinemas = crud.get_cinemas(db, province=province)
-    return cinemas
+    """Get list of cinemas with optional province filter; 304 when the client's copy is current"""
+    cached = catalog.get(db, ("cinemas", province), lambda: render(
+        [schemas.Cinema.from_orm(cinema) for cinema in crud.get_cinemas(db, province=province)]
+    ))
+    return conditional_response(request, cached, "cinemas")
 
 @router.get("/{cinema_id}", response_model=schemas.Cinema) 
-def get_cinema(cinema_id: int, db: Session = Depends(get_db)):
+def get_cinema(cinema_id: int, request: Request, db: Session = Depends(get_db)):
     """Get cinema by ID"""
-    cinema = crud.get_cinema(db, cinema_id=cinema_id)
-    if not cinema:
-        raise HTTPException(status_code=404, detail="Cinema not found")
-    return cinema
+    def load():
+        cinema = crud.get_cinema(db, cinema_id=cinema_id)
+        if not cinema:
+            raise HTTPException(status_code=404, detail="Cinema not found")
+        return render(schemas.Cinema.from_orm(cinema))
+    return conditional_response(request, catalog.get(db, ("cinema", cinema_id), load), "cinemas")
 
 @router.get("/{cinema_id}/screens", response_model=List[schemas.Screen])
-def get_cinema_screens(cinema_id: int, db: Session = Depends(get_db)):
+def get_cinema_screens(cinema_id: int, request: Request, db: Session = Depends(get_db)):
     """Get screens for a specific cinema"""
-    cinema = crud.get_cinema(db, cinema_id=cinema_id)
-    if not cinema:
-        raise HTTPException(status_code=404, detail="Cinema not found")
+    def load():
+        cinema = crud.get_cinema(db, cinema_id=cinema_id)
+        if not cinema:
+            raise HTTPException(status_code=404, detail="Cinema not found")
+        screens = crud.get_screens_by_cinema(db, cinema_id=cinema_id)
+        return render([schemas.Screen.from_orm(screen) for screen in screens])
+    return conditional_response(request, catalog.get(db, ("screens", cinema_id), load), "screens")
+
+@router.put("/{cinema_id}/screens/{screen_id}/layout", response_model=schemas.Screen)
+def update_screen_layout(
+    cinema_id: int,
+    screen_id: int,
+    layout: schemas.SeatLayoutBase,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_admin_user)
+):
+    """Set the seat layout of a screen (Admin only)"""
+    screen = crud.get_screen(db, screen_id=screen_id)
+    if not screen or screen.cinema_id != cinema_id:
+        raise HTTPException(status_code=404, detail="Screen not found")
     
-    screens = crud.get_screens_by_cinema(db, cinema_id=cinema_id)
-    return screens
+    try:
+        return crud.update_screen_layout(db, screen_id=screen_id, layout=layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/", response_model=schemas.Cinema)
 def create_cinema(cinema: schemas.CinemaCreate, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
@@ -0,0 +1,61 @@
+"""
+GET /home: everything the home page lists, in one cached response
+On a cache miss the sections are read concurrently, each on its own
+session, by a small shared pool; its size also caps how many connections
+home-page rebuilds can take from the engine pool at once.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from database import get_db, SessionLocal
+import crud
+import schemas
+from catalog_cache import catalog, render
+from http_cache import conditional_response
+
+HOME_FEATURED_MOVIES = int(os.getenv("HOME_FEATURED_MOVIES", "3"))
+HOME_LIST_LIMIT = int(os.getenv("HOME_LIST_LIMIT", "100"))
+HOME_QUERY_WORKERS = int(os.getenv("HOME_QUERY_WORKERS", "4"))  # One per section
+
+router = APIRouter(prefix="/home", tags=["home"])
+
+_pool = ThreadPoolExecutor(max_workers=HOME_QUERY_WORKERS, thread_name_prefix="home")
+
+def _read(load):
+    db = SessionLocal()
+    try:
+        return load(db)
+    finally:
+        db.close()
+
+def _movies(status: str, schema, limit: int):
+    return lambda db: [
+        schema.from_orm(movie)
+        for movie in crud.get_movies(db, status=status, limit=limit, fields=schema.model_fields)
+    ]
+
+def _news(limit: int):
+    schema = schemas.NewsHeadline
+    return lambda db: [
+        schema.from_orm(item)
+        for item in crud.get_news(db, limit=limit, fields=schema.model_fields)
+    ]
+
+def _load_home() -> schemas.HomePage:
+    sections = {
+        "featured": _movies("showing", schemas.Movie, HOME_FEATURED_MOVIES),
+        "showing": _movies("showing", schemas.MovieCard, HOME_LIST_LIMIT),
+        "coming": _movies("coming", schemas.MovieCard, HOME_LIST_LIMIT),
+        "news": _news(HOME_LIST_LIMIT),
+    }
+    futures = {name: _pool.submit(_read, load) for name, load in sections.items()}
+    return schemas.HomePage(**{name: future.result() for name, future in futures.items()})
+
+@router.get("/", response_model=schemas.HomePage)
+def get_home(request: Request, db: Session = Depends(get_db)):
+    """Featured, showing and coming movies and news for the home page; 304
+    when the client's copy is current"""
+    cached = catalog.get(db, ("home",), lambda: render(_load_home()))
+    return conditional_response(request, cached, "home")
@@ -1,31 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Union
 from database import get_db
 import crud
 import schemas
+from catalog_cache import catalog, render
+from http_cache import conditional_response
 from auth import get_admin_user
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 
-@router.get("/", response_model=List[schemas.Movie])
+MOVIE_VIEWS = {schemas.MovieView.FULL: schemas.Movie, schemas.MovieView.CARD: schemas.MovieCard}
+
+@router.get("/", response_model=Union[List[schemas.Movie], List[schemas.MovieCard]])
 def get_movies(
+    request: Request,
     status: Optional[str] = Query(None, description="Filter by status: showing, coming, stopped"),
+    view: schemas.MovieView = Query(schemas.MovieView.FULL, description="card: only the fields a poster grid shows"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Get list of movies with optional status filter"""
-    movies = crud.get_movies(db, status=status, skip=skip, limit=limit)
-    return movies
+    """Get list of movies with optional status filter; 304 when the client's copy is current.
+    Only the columns the chosen view returns are read from the database."""
+    schema = MOVIE_VIEWS[view]
+    cached = catalog.get(db, ("movies", status, skip, limit, view.value), lambda: render([
+        schema.from_orm(movie)
+        for movie in crud.get_movies(db, status=status, skip=skip, limit=limit, fields=schema.model_fields)
+    ]))
+    return conditional_response(request, cached, "movies")
+
+@router.get("/search", response_model=List[schemas.Movie])
+def search_movies(
+    q: str = Query(..., min_length=1, max_length=100, description="Words from the title, cast, director or genre; accents optional"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Search movies, best matches first; the last word may be partial, for type-ahead"""
+    return crud.search_movies(db, q=q, limit=limit)
 
 @router.get("/{movie_id}", response_model=schemas.Movie)
-def get_movie(movie_id: int, db: Session = Depends(get_db)):
+def get_movie(movie_id: int, request: Request, db: Session = Depends(get_db)):
     """Get movie by ID"""
-    movie = crud.get_movie(db, movie_id=movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail="Movie not found")
-    return movie
+    def load():
+        movie = crud.get_movie(db, movie_id=movie_id)
+        if not movie:
+            raise HTTPException(status_code=404, detail="Movie not found")
+        return render(schemas.Movie.from_orm(movie))
+    return conditional_response(request, catalog.get(db, ("movie", movie_id), load), "movies")
 
 @router.post("/", response_model=schemas.Movie)
 def create_movie(movie: schemas.MovieCreate, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
@@ -1,31 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Union
 from database import get_db
 import crud
 import schemas
+from catalog_cache import catalog, render
+from http_cache import conditional_response
 from auth import get_admin_user
 
 router = APIRouter(prefix="/news", tags=["news"])
 
-@router.get("/", response_model=List[schemas.News])
+NEWS_VIEWS = {schemas.NewsView.FULL: schemas.News, schemas.NewsView.HEADLINE: schemas.NewsHeadline}
+
+@router.get("/", response_model=Union[List[schemas.News], List[schemas.NewsHeadline]])
 def get_news(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category: news, promotion"),
+    view: schemas.NewsView = Query(schemas.NewsView.FULL, description="headline: everything but the article body"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    """Get list of news with optional category filter"""
-    news = crud.get_news(db, category=category, skip=skip, limit=limit)
-    return news
+    """Get list of news with optional category filter; 304 when the client's copy is current.
+    Only the columns the chosen view returns are read from the database."""
+    schema = NEWS_VIEWS[view]
+    cached = catalog.get(db, ("news", category, skip, limit, view.value), lambda: render([
+        schema.from_orm(item)
+        for item in crud.get_news(db, category=category, skip=skip, limit=limit, fields=schema.model_fields)
+    ]))
+    return conditional_response(request, cached, "news")
 
 @router.get("/{news_id}", response_model=schemas.News)
-def get_news_item(news_id: int, db: Session = Depends(get_db)):
+def get_news_item(news_id: int, request: Request, db: Session = Depends(get_db)):
     """Get news item by ID"""
-    news = crud.get_news_item(db, news_id=news_id)
-    if not news:
-        raise HTTPException(status_code=404, detail="News not found")
-    return news
+    def load():
+        news = crud.get_news_item(db, news_id=news_id)
+        if not news:
+            raise HTTPException(status_code=404, detail="News not found")
+        return render(schemas.News.from_orm(news))
+    return conditional_response(request, catalog.get(db, ("news_item", news_id), load), "news")
 
 @router.post("/", response_model=schemas.News)
 def create_news(news: schemas.NewsCreate, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
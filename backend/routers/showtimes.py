@@ -1,30 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from datetime import date
-from database import get_db
+from datetime import date, time
+import asyncio
+import os
+from database import get_db, SessionLocal
 import crud
+import events
+from http_cache import etag_matches, not_modified
+from pagination import decode_cursor, next_cursor
+from schedule_cache import schedule
+from scheduling import ShowtimeConflictError, describe_conflicts
 import schemas
 from auth import get_admin_user
 
+SEAT_STREAM_RETRY_MS = int(os.getenv("SEAT_STREAM_RETRY_MS", "3000"))
+
 router = APIRouter(prefix="/showtimes", tags=["showtimes"])
 
 @router.get("/", response_model=List[schemas.ShowtimeWithDetails])
 def get_showtimes(
+    response: Response,
     movie_id: Optional[int] = Query(None, description="Filter by movie ID"),
     cinema_id: Optional[int] = Query(None, description="Filter by cinema ID"),
     show_date: Optional[date] = Query(None, description="Filter by date (YYYY-MM-DD)"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get showtimes with movie and cinema details"""
+    """Get showtimes with movie and cinema details, ordered by date and time.
+    When more rows follow, the X-Next-Cursor header holds the cursor for the next page."""
+    after = None
+    if cursor:
+        if skip:
+            raise HTTPException(status_code=400, detail="Use either skip or cursor, not both")
+        try:
+            after = decode_cursor(cursor, date, time, int)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # One extra row tells whether there is a next page
     showtimes = crud.get_showtimes_with_details(
         db, 
         movie_id=movie_id, 
         cinema_id=cinema_id, 
-        show_date=show_date
+        show_date=show_date,
+        skip=skip,
+        limit=limit + 1,
+        after=after
     )
+    showtimes, next_page = next_cursor(showtimes, limit, lambda st: (st.show_date, st.show_time, st.id))
+    if next_page:
+        response.headers["X-Next-Cursor"] = next_page
     
     # Convert to response format
     result = []
@@ -40,20 +71,188 @@ def get_showtimes(
             screen_type=st.screen_type
         ))
     
-    return result[skip:skip+limit]
+    return result
+
+def _seat_map_etag(showtime_id: int, state) -> str:
+    return f'W/"{showtime_id}-{state.seat_version}-{state.held_count}-{state.last_hold_id}"'
 
 @router.get("/{showtime_id}", response_model=schemas.Showtime)
-def get_showtime(showtime_id: int, db: Session = Depends(get_db)):
+def get_showtime(
+    showtime_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """Get showtime by ID"""
+    state = crud.get_seat_map_state(db, showtime_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Showtime not found")
+    
+    etag = _seat_map_etag(showtime_id, state)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
     showtime = crud.get_showtime(db, showtime_id=showtime_id)
-    if not showtime:
+    result = schemas.Showtime.from_orm(showtime)
+    result.seat_map = schemas.SeatMap(**crud.get_showtime_seat_map(db, showtime))
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return result
+
+def _build_seat_map_state(db: Session, showtime_id: int, state, since: Optional[int]) -> schemas.SeatMapState:
+    result = schemas.SeatMapState(
+        showtime_id=showtime_id,
+        version=state.seat_version,
+        available_seats=state.available_seats,
+        full=True
+    )
+    # A delta is only possible while the client's version is within the
+    # retained change log; older versions and layout changes get a full map
+    if since is not None and state.seat_version_floor <= since <= state.seat_version:
+        result.full = False
+        result.booked, result.released = crud.get_seat_changes(db, showtime_id, since)
+        layout = crud.get_showtime_layout(db, showtime_id)
+        held = crud.get_held_mask(db, showtime_id, layout)
+        result.held_count = held.bit_count()
+        result.held = layout.pack(held)
+    else:
+        showtime = crud.get_showtime(db, showtime_id=showtime_id)
+        seat_map = crud.get_showtime_seat_map(db, showtime)
+        result.held_count = seat_map["held_count"]
+        result.held = seat_map["held"]
+        result.seat_map = schemas.SeatMap(**seat_map)
+    return result
+
+@router.get("/{showtime_id}/seats", response_model=schemas.SeatMapState)
+def get_showtime_seats(
+    showtime_id: int,
+    response: Response,
+    since: Optional[int] = Query(None, ge=0, description="Seat version the client already has"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Seat map for polling clients: 304 when unchanged, seat changes since
+    `since` when they can be replayed, otherwise the full map"""
+    state = crud.get_seat_map_state(db, showtime_id)
+    if not state:
         raise HTTPException(status_code=404, detail="Showtime not found")
-    return showtime
+    
+    etag = _seat_map_etag(showtime_id, state)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return _build_seat_map_state(db, showtime_id, state, since)
+
+def _seat_snapshot(showtime_id: int, since: Optional[int]) -> Optional[schemas.SeatMapState]:
+    db = SessionLocal()
+    try:
+        state = crud.get_seat_map_state(db, showtime_id)
+        if not state:
+            return None
+        return _build_seat_map_state(db, showtime_id, state, since)
+    finally:
+        db.close()
+
+async def _seat_event_stream(request: Request, showtime_id: int, queue: asyncio.Queue, snapshot: schemas.SeatMapState):
+    try:
+        yield f"retry: {SEAT_STREAM_RETRY_MS}\n\n"
+        yield events.format_event("snapshot", jsonable_encoder(snapshot), event_id=snapshot.version)
+        last_version = snapshot.version
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=events.SEAT_STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            if message is events.EVICTED:
+                break
+            version, payload = message
+            # Changes already folded into the snapshot were published before it was read
+            if version <= last_version:
+                continue
+            last_version = version
+            yield payload
+    finally:
+        events.broker.unsubscribe(showtime_id, queue)
+
+@router.get("/{showtime_id}/seats/stream")
+async def stream_showtime_seats(
+    showtime_id: int,
+    request: Request,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", ge=0)
+):
+    """Server-Sent Events: a snapshot event with the seat map (or the changes
+    since Last-Event-ID on reconnect), then a seats event per booking or
+    cancellation"""
+    # Subscribe before reading the snapshot so no change falls in between
+    queue = events.broker.subscribe(showtime_id)
+    try:
+        snapshot = await run_in_threadpool(_seat_snapshot, showtime_id, last_event_id)
+    except Exception:
+        events.broker.unsubscribe(showtime_id, queue)
+        raise
+    if snapshot is None:
+        events.broker.unsubscribe(showtime_id, queue)
+        raise HTTPException(status_code=404, detail="Showtime not found")
+    
+    return StreamingResponse(
+        _seat_event_stream(request, showtime_id, queue, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/{showtime_id}/holds", response_model=schemas.SeatHold)
+def create_seat_hold(showtime_id: int, hold: schemas.SeatHoldCreate, db: Session = Depends(get_db)):
+    """Hold seats for a few minutes; pass the token as hold_token when booking"""
+    try:
+        return crud.create_seat_hold(db, showtime_id=showtime_id, seats=hold.seats)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/{showtime_id}/holds/{token}")
+def release_seat_hold(showtime_id: int, token: str, db: Session = Depends(get_db)):
+    """Release held seats before the hold expires"""
+    if not crud.release_seat_hold(db, showtime_id=showtime_id, token=token):
+        raise HTTPException(status_code=404, detail="Seat hold not found")
+    return {"message": "Seat hold released"}
 
 @router.post("/", response_model=schemas.Showtime)
 def create_showtime(showtime: schemas.ShowtimeCreate, db: Session = Depends(get_db), current_user = Depends(get_admin_user)):
-    """Create new showtime (Admin only)"""
-    return crud.create_showtime(db=db, showtime=showtime)
+    """Create new showtime (Admin only); 409 with the conflicts if the screen is busy then.
+    available_seats is set from the screen's seat layout."""
+    try:
+        return crud.create_showtime(db=db, showtime=showtime)
+    except ShowtimeConflictError as e:
+        raise HTTPException(status_code=409, detail=e.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/schedule", response_model=schemas.ScheduleResult)
+def create_schedule(
+    template: schemas.ScheduleCreate,
+    dry_run: bool = Query(False, description="Only validate: report what would be created and any overlaps"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_admin_user)
+):
+    """Create every showtime of weekly per-screen templates over a date range (Admin only).
+    Overlapping showtimes fail the whole schedule with 409 and the conflict list."""
+    try:
+        created, skipped, conflicts = crud.create_showtime_schedule(db, template, dry_run=dry_run)
+    except ShowtimeConflictError as e:
+        raise HTTPException(status_code=409, detail=e.to_dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "created": created,
+        "skipped": skipped,
+        "start_date": template.start_date,
+        "end_date": template.end_date,
+        "conflicts": describe_conflicts(conflicts)
+    }
 
 @router.get("/dates/available")
 def get_available_dates(
@@ -62,7 +261,9 @@ def get_available_dates(
     db: Session = Depends(get_db)
 ):
     """Get available dates for movie/cinema combination"""
-    dates = crud.get_available_dates(db, movie_id=movie_id, cinema_id=cinema_id)
+    dates = schedule.available_dates(db, movie_id=movie_id, cinema_id=cinema_id)
+    if dates is None:
+        dates = crud.get_available_dates(db, movie_id=movie_id, cinema_id=cinema_id)
     return {"dates": dates}
 
 @router.get("/times/available")
@@ -73,7 +274,9 @@ def get_available_times(
     db: Session = Depends(get_db)
 ):
     """Get available times for specific movie, cinema, and date"""
-    times = crud.get_available_times(db, movie_id=movie_id, cinema_id=cinema_id, show_date=show_date)
+    times = schedule.available_times(db, movie_id=movie_id, cinema_id=cinema_id, show_date=show_date)
+    if times is None:
+        times = crud.get_available_times(db, movie_id=movie_id, cinema_id=cinema_id, show_date=show_date)
     
     result = []
     for time_data in times:
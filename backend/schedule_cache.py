@@ -0,0 +1,150 @@
+"""
+In-memory schedule for the booking wizard
+Upcoming showtimes indexed by (movie, cinema) and date, with their times
+and remaining seats, so the date and time pickers answer without a query.
+crud patches it after every committed booking, cancellation, layout
+change and new showtime; a periodic reload picks up changes made by
+other processes.
+Dates before the load date are left to the database.
+"""
+
+import os
+import threading
+import time
+from bisect import insort
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from models import Showtime
+
+SCHEDULE_CACHE_TTL_SECONDS = float(os.getenv("SCHEDULE_CACHE_TTL_SECONDS", "300"))
+
+class ScheduleCache:
+    def __init__(self, ttl: float = SCHEDULE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # (movie_id, cinema_id) -> show_date -> sorted [(show_time, showtime_id)]
+        self._times: Dict[Tuple[int, int], Dict[date, list]] = {}
+        # showtime_id -> (seat_version, remaining seats); the version orders
+        # patches against a reload that raced with them
+        self._seats: Dict[int, Tuple[int, int]] = {}
+        # Collected only while a reload is running
+        self._patches: Optional[Dict[int, Tuple[int, int]]] = None
+        self._added: Optional[list] = None
+        self._from_date: Optional[date] = None
+        self._loaded_at = 0.0
+        self._generation = 0  # Bumped by invalidate; a reload that straddles one is not published
+
+    def _is_fresh(self) -> bool:
+        return self._from_date == date.today() and time.monotonic() - self._loaded_at < self.ttl
+
+    def _ensure_loaded(self, db):
+        if self._is_fresh():
+            return
+        # One thread reloads; the others keep serving the current data, if any
+        if not self._load_lock.acquire(blocking=self._from_date is None):
+            return
+        try:
+            while not self._is_fresh():
+                self._reload(db)
+        finally:
+            with self._lock:
+                self._patches, self._added = None, None
+            self._load_lock.release()
+
+    def _reload(self, db):
+        with self._lock:
+            self._patches, self._added = {}, []
+            generation = self._generation
+        from_date = date.today()
+        rows = db.query(
+            Showtime.id, Showtime.movie_id, Showtime.cinema_id, Showtime.show_date,
+            Showtime.show_time, Showtime.seat_version, Showtime.available_seats
+        ).filter(Showtime.show_date >= from_date).all()
+        times = defaultdict(lambda: defaultdict(list))
+        seats = {}
+        for showtime_id, movie_id, cinema_id, show_date, show_time, version, available_seats in rows:
+            times[(movie_id, cinema_id)][show_date].append((show_time, showtime_id))
+            seats[showtime_id] = (version, available_seats)
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while the query ran, which may predate that
+                # write; the caller loads again
+                return
+            # Replay whatever committed while the query ran
+            for showtime_id, patch in self._patches.items():
+                if patch[0] > seats.get(showtime_id, (-1, 0))[0]:
+                    seats[showtime_id] = patch
+            for showtime in self._added:
+                if showtime.show_date >= from_date and showtime.id not in {slot[1] for slot in times[(showtime.movie_id, showtime.cinema_id)][showtime.show_date]}:
+                    times[(showtime.movie_id, showtime.cinema_id)][showtime.show_date].append((showtime.show_time, showtime.id))
+            self._times = {key: {day: sorted(slots) for day, slots in days.items()} for key, days in times.items()}
+            self._seats = seats
+            self._from_date = from_date
+            self._loaded_at = time.monotonic()
+
+    def available_dates(self, db, movie_id: Optional[int] = None, cinema_id: Optional[int] = None) -> Optional[List[date]]:
+        """Same result as crud.get_available_dates, or None when the schedule
+        was invalidated meanwhile (the caller then asks the database)"""
+        self._ensure_loaded(db)
+        today = date.today()
+        with self._lock:
+            if self._from_date is None:
+                return None
+            dates = {
+                day
+                for (movie, cinema), days in self._times.items()
+                if (not movie_id or movie == movie_id) and (not cinema_id or cinema == cinema_id)
+                for day, slots in days.items()
+                if day >= today and slots
+            }
+        return sorted(dates)
+
+    def available_times(self, db, movie_id: int, cinema_id: int, show_date: date) -> Optional[List[tuple]]:
+        """Same result as crud.get_available_times, or None for dates not
+        held in memory or when the schedule was invalidated meanwhile (the
+        caller then asks the database)"""
+        self._ensure_loaded(db)
+        with self._lock:
+            # Read under the lock: invalidate may have cleared it since the load
+            from_date = self._from_date
+            if from_date is None or show_date < from_date:
+                return None
+            slots = self._times.get((movie_id, cinema_id), {}).get(show_date, [])
+            return [
+                (show_time, showtime_id, self._seats[showtime_id][1])
+                for show_time, showtime_id in slots
+                if self._seats[showtime_id][1] > 0
+            ]
+
+    def add_showtime(self, showtime):
+        with self._lock:
+            if self._added is not None:
+                self._added.append(showtime)
+                self._patches[showtime.id] = (showtime.seat_version, showtime.available_seats)
+            if self._from_date is None or showtime.show_date < self._from_date:
+                return
+            slots = self._times.setdefault((showtime.movie_id, showtime.cinema_id), {}).setdefault(showtime.show_date, [])
+            insort(slots, (showtime.show_time, showtime.id))
+            self._seats[showtime.id] = (showtime.seat_version, showtime.available_seats)
+
+    def set_available_seats(self, showtime_id: int, seat_version: int, available_seats: int):
+        """Record the seats left after the booking, cancellation or layout
+        change that produced seat_version; older updates arriving late are ignored"""
+        with self._lock:
+            if self._patches is not None:
+                self._patches[showtime_id] = max(
+                    self._patches.get(showtime_id, (-1, 0)), (seat_version, available_seats)
+                )
+            current = self._seats.get(showtime_id)
+            if current and seat_version > current[0]:
+                self._seats[showtime_id] = (seat_version, available_seats)
+
+    def invalidate(self):
+        """Reload on next use, e.g. after showtimes are moved or removed"""
+        with self._lock:
+            self._from_date = None
+            self._generation += 1
+
+schedule = ScheduleCache()
@@ -0,0 +1,79 @@
+"""
+Showtime overlap detection
+A showtime occupies its screen from its start until the movie ends plus a
+turnaround for cleaning. Conflicts are found per screen with one sweep over
+the slots ordered by start, keeping the ones still running in a heap keyed
+by end time, so validating a whole schedule costs O(n log n) plus one entry
+per conflict.
+"""
+
+import heapq
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+SHOWTIME_TURNAROUND_MINUTES = int(os.getenv("SHOWTIME_TURNAROUND_MINUTES", "15"))
+DEFAULT_MOVIE_DURATION = 120  # Minutes, for movies without a duration
+
+class Slot(NamedTuple):
+    screen_id: int
+    start: datetime
+    end: datetime  # Exclusive; includes the turnaround
+    movie_id: int
+    showtime_id: Optional[int] = None  # None for showtimes not created yet
+
+def make_slot(screen_id: int, movie_id: int, show_date: date, show_time: time,
+              duration: Optional[int], showtime_id: Optional[int] = None) -> Slot:
+    start = datetime.combine(show_date, show_time)
+    minutes = (duration or DEFAULT_MOVIE_DURATION) + SHOWTIME_TURNAROUND_MINUTES
+    return Slot(screen_id, start, start + timedelta(minutes=minutes), movie_id, showtime_id)
+
+def find_conflicts(existing: Iterable[Slot], proposed: Iterable[Slot]) -> List[Tuple[Slot, Slot]]:
+    """(proposed slot, slot it overlaps) pairs; overlaps among existing
+    showtimes alone are not reported"""
+    by_screen = defaultdict(list)
+    for slot in existing:
+        by_screen[slot.screen_id].append((slot, False))
+    for slot in proposed:
+        by_screen[slot.screen_id].append((slot, True))
+
+    conflicts = []
+    for slots in by_screen.values():
+        slots.sort(key=lambda item: item[0].start)
+        running = []  # (end, order, slot, is_new)
+        for order, (slot, is_new) in enumerate(slots):
+            while running and running[0][0] <= slot.start:
+                heapq.heappop(running)
+            for _, _, other, other_is_new in running:
+                if is_new:
+                    conflicts.append((slot, other))
+                elif other_is_new:
+                    conflicts.append((other, slot))
+            heapq.heappush(running, (slot.end, order, slot, is_new))
+    return conflicts
+
+class ShowtimeConflictError(ValueError):
+    """Raised when new showtimes overlap others on the same screen"""
+
+    def __init__(self, conflicts: List[Tuple[Slot, Slot]]):
+        self.conflicts = conflicts
+        super().__init__(f"{len(conflicts)} showtime(s) overlap others on the same screen")
+
+    def to_dict(self) -> dict:
+        return {"message": str(self), "conflicts": describe_conflicts(self.conflicts)}
+
+def describe_conflicts(conflicts: List[Tuple[Slot, Slot]]) -> List[dict]:
+    """Conflict pairs shaped like schemas.ShowtimeConflict"""
+    return [
+        {"screen_id": slot.screen_id, "slot": _describe(slot), "conflicts_with": _describe(other)}
+        for slot, other in conflicts
+    ]
+
+def _describe(slot: Slot) -> dict:
+    return {
+        "showtime_id": slot.showtime_id,
+        "movie_id": slot.movie_id,
+        "starts_at": slot.start.isoformat(),
+        "ends_at": slot.end.isoformat()
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date, time, datetime
 from decimal import Decimal
 from enum import Enum
@@ -34,6 +34,25 @@ class Movie(MovieBase):
     class Config:
         from_attributes = True
 
+class MovieCard(BaseModel):
+    """What a poster grid shows; no description, cast or timestamps"""
+    id: int
+    title: str
+    poster: Optional[str] = None
+    rating: Optional[str] = None
+    genre: Optional[str] = None
+    duration: Optional[int] = None
+    director: Optional[str] = None
+    status: Optional[str] = None
+    trailer: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+class MovieView(str, Enum):
+    FULL = "full"
+    CARD = "card"
+
 # Cinema Schemas
 class CinemaBase(BaseModel):
     name: str
@@ -50,12 +69,40 @@ class Cinema(CinemaBase):
     class Config:
         from_attributes = True
 
+# Seat layout Schemas
+class SeatLayoutBase(BaseModel):
+    rows: List[str]  # Row labels front to back: ["A", "B", ...]
+    columns: int  # Grid width; seat numbers run 1..columns
+    aisles: List[int] = []  # Columns followed by an aisle
+    gaps: List[str] = []  # Grid positions with no seat, e.g. ["A1"]
+    seat_classes: Dict[str, List[str]] = {}  # Class name -> rows, e.g. {"vip": ["E", "F"]}
+
+class SeatMap(BaseModel):
+    layout: SeatLayoutBase
+    capacity: int
+    booked_count: int
+    booked: str  # Base64 bitmap over rows x columns, row-major, first seat = most significant bit
+    held_count: int = 0
+    held: str = ""  # Same encoding as booked, for seats under an active hold
+
+class SeatMapState(BaseModel):
+    showtime_id: int
+    version: int
+    available_seats: int
+    full: bool  # True: seat_map is the whole map; False: booked/released are changes since the requested version
+    seat_map: Optional[SeatMap] = None
+    booked: List[str] = []
+    released: List[str] = []
+    held_count: int = 0
+    held: str = ""  # Holds are not versioned, so the current held bitmap is always sent in full
+
 # Screen Schemas
 class ScreenBase(BaseModel):
     cinema_id: int
     screen_number: int
     screen_type: Optional[str] = "2D"
     total_seats: Optional[int] = 100
+    layout: Optional[SeatLayoutBase] = None
 
 class ScreenCreate(ScreenBase):
     pass
@@ -76,7 +123,6 @@ class ShowtimeBase(BaseModel):
     show_time: time
     price: Decimal
     available_seats: Optional[int] = 100
-    booked_seats: Optional[List[str]] = []
 
 class ShowtimeCreate(ShowtimeBase):
     pass
@@ -84,6 +130,61 @@ class ShowtimeCreate(ShowtimeBase):
 class Showtime(ShowtimeBase):
     id: int
     created_at: datetime
+    seat_version: int = 0
+    seat_map: Optional[SeatMap] = None
+    
+    class Config:
+        from_attributes = True
+
+# Showtime schedule Schemas
+class SchedulePriceTier(BaseModel):
+    price: Decimal
+    weekdays: List[int] = Field(default=[0, 1, 2, 3, 4, 5, 6])  # Monday = 0
+    from_time: time = time(0, 0)  # Applies to shows starting at or after this time
+
+class ScheduleSlot(BaseModel):
+    movie_id: int
+    start_times: List[time]
+    weekdays: List[int] = Field(default=[0, 1, 2, 3, 4, 5, 6])  # Monday = 0
+
+class ScreenScheduleTemplate(BaseModel):
+    screen_id: int
+    price: Decimal  # Base price when no tier applies
+    price_tiers: List[SchedulePriceTier] = []  # The last matching tier wins
+    slots: List[ScheduleSlot]
+
+class ScheduleCreate(BaseModel):
+    start_date: date
+    end_date: date  # Inclusive
+    screens: List[ScreenScheduleTemplate]
+
+class ShowtimeSlot(BaseModel):
+    showtime_id: Optional[int] = None  # None for a showtime not created yet
+    movie_id: int
+    starts_at: datetime
+    ends_at: datetime  # Movie duration plus turnaround
+
+class ShowtimeConflict(BaseModel):
+    screen_id: int
+    slot: ShowtimeSlot
+    conflicts_with: ShowtimeSlot
+
+class ScheduleResult(BaseModel):
+    created: int  # With dry_run, how many would be created
+    skipped: int  # Slots that already had a showtime on that screen, date and time
+    start_date: date
+    end_date: date
+    conflicts: List[ShowtimeConflict] = []  # Only reported with dry_run; otherwise they fail the request
+
+# Seat hold Schemas
+class SeatHoldCreate(BaseModel):
+    seats: List[str] = Field(..., min_length=1, max_length=8)  # The seat picker's cap per order
+
+class SeatHold(BaseModel):
+    token: str
+    showtime_id: int
+    seats: List[str]
+    expires_at: datetime
     
     class Config:
         from_attributes = True
@@ -121,6 +222,17 @@ class BookingCreate(BaseModel):
     total_amount: Decimal
     payment_method: Optional[str] = "cash"
     user_id: Optional[int] = None  # Optional for logged-in users
+    hold_token: Optional[str] = None  # Confirms seats held via POST /showtimes/{id}/holds
+
+class GroupBookingCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(..., min_length=1, max_length=20)  # One per showtime (or seat block)
+
+class BookingQueueStatus(BaseModel):
+    status: str  # waiting, admitted
+    token: str  # Send back as X-Queue-Token when retrying POST /bookings
+    showtime_id: int
+    position: int = 0
+    retry_after: int = 0
 
 class Booking(BookingBase):
     id: int
@@ -132,6 +244,45 @@ class Booking(BookingBase):
     class Config:
         from_attributes = True
 
+class BookingMovie(BaseModel):
+    id: int
+    title: str
+    poster: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BookingCinema(BaseModel):
+    id: int
+    name: str
+    address: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BookingScreen(BaseModel):
+    id: int
+    screen_number: int
+    screen_type: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class BookingShowtime(BaseModel):
+    id: int
+    show_date: date
+    show_time: time
+    price: Decimal
+    movie: BookingMovie
+    cinema: BookingCinema
+    screen: BookingScreen
+
+    class Config:
+        from_attributes = True
+
+class BookingWithShowtime(Booking):
+    showtime: Optional[BookingShowtime] = None
+
 # News Schemas
 class NewsBase(BaseModel):
     title: str
@@ -152,6 +303,22 @@ class News(NewsBase):
     class Config:
         from_attributes = True
 
+class NewsHeadline(BaseModel):
+    """A news list entry without the article body"""
+    id: int
+    title: str
+    summary: Optional[str] = None
+    image: Optional[str] = None
+    category: Optional[str] = None
+    publish_date: Optional[date] = None
+    
+    class Config:
+        from_attributes = True
+
+class NewsView(str, Enum):
+    FULL = "full"
+    HEADLINE = "headline"
+
 # Response Schemas
 class MovieListResponse(BaseModel):
     movies: List[Movie]
@@ -161,6 +328,12 @@ class ShowtimeListResponse(BaseModel):
     showtimes: List[ShowtimeWithDetails]
     total: int
 
+class HomePage(BaseModel):
+    featured: List[Movie]  # Hero banner: the first showing movies, in full
+    showing: List[MovieCard]
+    coming: List[MovieCard]
+    news: List[NewsHeadline]  # Latest of every category
+
 # Auth Schemas
 class UserLogin(BaseModel):
     email: EmailStr
@@ -232,4 +405,43 @@ class BookingStats(BaseModel):
     confirmed_bookings: int
     cancelled_bookings: int
     bookings_this_month: int
-    revenue_this_month: float
\ No newline at end of file
+    revenue_this_month: float
+
+class DailyBookingStats(BaseModel):
+    day: date
+    bookings: int  # Made that day, including later cancelled ones
+    seats_sold: int
+    cancellations: int
+    revenue: Decimal
+    
+    class Config:
+        from_attributes = True
+
+class FillPoint(BaseModel):
+    hours_before: int
+    occupancy: Optional[float]  # Share of capacity sold at least hours_before hours ahead
+
+class AnalyticsGroup(BaseModel):
+    key: str  # Movie/cinema id, screen type or show date (YYYY-MM-DD)
+    label: str
+    showtimes: int
+    capacity: int
+    bookings: int
+    seats_sold: int
+    occupancy: Optional[float]  # seats_sold / capacity
+    revenue: float
+    avg_ticket_price: Optional[float]  # revenue / seats_sold
+    fill_curve: List[FillPoint]
+
+class BookingAnalytics(BaseModel):
+    date_from: date  # Show dates, not booking dates
+    date_to: date
+    totals: Optional[AnalyticsGroup]  # None when no showtime falls in the range
+    by_movie: List[AnalyticsGroup]
+    by_cinema: List[AnalyticsGroup]
+    by_screen_type: List[AnalyticsGroup]
+    by_day: List[AnalyticsGroup]
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""
+Accent-insensitive movie search
+Text is folded in Python (lowercase, Vietnamese diacritics stripped, đ -> d)
+both when a movie's search_vector is written and when a query is parsed, so
+"Thanh Cuon" matches "Thành Cuốn" with Postgres' built-in 'simple' text
+search config and a plain GIN index; no unaccent extension is needed.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+
+SEARCH_CONFIG = "simple"
+MAX_QUERY_TERMS = 8
+MIN_PREFIX_LENGTH = 2
+SEARCH_RANK_CANDIDATES = 500  # Matches ranked per query
+TITLE_WEIGHT = "A"
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase text without diacritics, e.g. Thành Cuốn Đêm -> thanh cuon dem"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFD", text.lower().replace("đ", "d").replace("Đ", "d"))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def search_fields(title: Optional[str], director: Optional[str], cast: Optional[Iterable[str]], genre: Optional[str]):
+    """Folded (title, people, genre) text that goes into a movie's search_vector"""
+    return fold(title), fold(" ".join([director or ""] + list(cast or []))), fold(genre)
+
+def weighted_vector(title, people, genre):
+    """SQL tsvector of already folded fields (strings or bind parameters);
+    title terms rank highest"""
+    def weighted(text, weight: str):
+        return func.setweight(func.to_tsvector(SEARCH_CONFIG, text), weight)
+    return (
+        weighted(title, TITLE_WEIGHT)
+        .op("||")(weighted(people, "B"))
+        .op("||")(weighted(genre, "C"))
+    )
+
+def search_vector(title: Optional[str], director: Optional[str], cast: Optional[Iterable[str]], genre: Optional[str]):
+    """SQL expression for movies.search_vector"""
+    return weighted_vector(*search_fields(title, director, cast, genre))
+
+def prefix_query(q: str, weights: str = "") -> Optional[str]:
+    """to_tsquery text matching every word of q. The last word is matched as
+    a prefix, for type-ahead, once it is MIN_PREFIX_LENGTH long (shorter
+    prefixes would match most of the catalog); weights (e.g. TITLE_WEIGHT)
+    only match words of those weights. None when q has no words."""
+    terms = _WORD_RE.findall(fold(q))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    labels = [weights] * len(terms)
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        labels[-1] = "*" + weights
+    return " & ".join(f"{term}:{label}" if label else term for term, label in zip(terms, labels))
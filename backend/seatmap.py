@@ -0,0 +1,187 @@
+"""
+Seat layouts and per-showtime seat bitmaps
+A layout places every seat of a screen on a rows x columns grid, so a seat
+code maps to a bit position with arithmetic alone. Showtimes store booked
+seats as a bit string of that grid (Postgres BIT VARYING).
+"""
+
+import base64
+import json
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_COLUMNS = 12
+DEFAULT_AISLES = [3, 9]
+DEFAULT_TOTAL_SEATS = 100
+DEFAULT_SEAT_CLASS = "standard"
+
+_SEAT_CODE_RE = re.compile(r"^([A-Z]+)(\d+)$")
+
+def row_label(index: int) -> str:
+    """A, B, ..., Z, AA, AB, ..."""
+    label = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        label = chr(ord("A") + rem) + label
+    return label
+
+class SeatLayout:
+    """Immutable seat grid for one screen"""
+
+    def __init__(
+        self,
+        rows: List[str],
+        columns: int,
+        aisles: Optional[List[int]] = None,
+        gaps: Optional[List[str]] = None,
+        seat_classes: Optional[Dict[str, List[str]]] = None
+    ):
+        if not rows:
+            raise ValueError("Layout needs at least one row")
+        if columns < 1:
+            raise ValueError("Layout needs at least one column")
+        if len(set(rows)) != len(rows):
+            raise ValueError("Duplicate row labels in layout")
+        for row in rows:
+            if not re.fullmatch(r"[A-Z]+", row):
+                raise ValueError(f"Invalid row label {row}")
+        
+        self.rows = list(rows)
+        self.columns = columns
+        self.aisles = sorted(set(aisles or []))
+        self.size = len(self.rows) * columns
+        self._row_index = {row: i for i, row in enumerate(self.rows)}
+        
+        for aisle in self.aisles:
+            if not 1 <= aisle < columns:
+                raise ValueError(f"Aisle after column {aisle} is outside the layout")
+        
+        self.gaps = []
+        self._gap_bits = set()
+        for code in gaps or []:
+            bit = self._position(code)
+            if bit is None:
+                raise ValueError(f"Gap {code} is outside the layout")
+            self.gaps.append(code)
+            self._gap_bits.add(bit)
+        self.capacity = self.size - len(self._gap_bits)
+        
+        self.seat_classes = {}
+        self._row_class = {}
+        for name, class_rows in (seat_classes or {}).items():
+            for row in class_rows:
+                if row not in self._row_index:
+                    raise ValueError(f"Seat class {name} refers to unknown row {row}")
+                self._row_class[row] = name
+            self.seat_classes[name] = list(class_rows)
+
+    @classmethod
+    def from_dict(cls, layout: dict) -> "SeatLayout":
+        return cls(
+            rows=layout.get("rows", []),
+            columns=layout.get("columns", 0),
+            aisles=layout.get("aisles"),
+            gaps=layout.get("gaps"),
+            seat_classes=layout.get("seat_classes")
+        )
+
+    @classmethod
+    def default(cls, total_seats: Optional[int]) -> "SeatLayout":
+        """Grid for screens without a stored layout: 12 seats per row, A-first"""
+        total = total_seats or DEFAULT_TOTAL_SEATS
+        row_count = math.ceil(total / DEFAULT_COLUMNS)
+        rows = [row_label(i) for i in range(row_count)]
+        # Seats missing from a short last row become gaps
+        last = rows[-1]
+        filled = total - (row_count - 1) * DEFAULT_COLUMNS
+        gaps = [f"{last}{n}" for n in range(filled + 1, DEFAULT_COLUMNS + 1)]
+        return cls(rows=rows, columns=DEFAULT_COLUMNS, aisles=DEFAULT_AISLES, gaps=gaps)
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "columns": self.columns,
+            "aisles": self.aisles,
+            "gaps": self.gaps,
+            "seat_classes": self.seat_classes
+        }
+
+    def _position(self, code: str) -> Optional[int]:
+        match = _SEAT_CODE_RE.match(code or "")
+        if not match:
+            return None
+        row = self._row_index.get(match.group(1))
+        number = int(match.group(2))
+        if row is None or not 1 <= number <= self.columns:
+            return None
+        return row * self.columns + number - 1
+
+    def bit_of(self, code: str) -> Optional[int]:
+        """Bit position of a seat, or None when the seat does not exist"""
+        bit = self._position(code)
+        if bit is None or bit in self._gap_bits:
+            return None
+        return bit
+
+    def is_valid(self, code: str) -> bool:
+        return self.bit_of(code) is not None
+
+    def seat_class(self, code: str) -> Optional[str]:
+        if not self.is_valid(code):
+            return None
+        return self._row_class.get(_SEAT_CODE_RE.match(code).group(1), DEFAULT_SEAT_CLASS)
+
+    def code_of(self, bit: int) -> str:
+        row, col = divmod(bit, self.columns)
+        return f"{self.rows[row]}{col + 1}"
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """Bitmask of seat codes; raises ValueError for seats not in the layout"""
+        value = 0
+        for code in codes:
+            bit = self.bit_of(code)
+            if bit is None:
+                raise ValueError(f"Seat {code} does not exist")
+            value |= 1 << (self.size - 1 - bit)
+        return value
+
+    # Conversions between the int mask, the Postgres bit string and the API form
+    def to_bits(self, value: int) -> str:
+        return format(value, f"0{self.size}b")
+
+    def from_bits(self, bits: Optional[str]) -> int:
+        if not bits:
+            return 0
+        if len(bits) != self.size:
+            raise ValueError("Seat bitmap does not match the screen layout")
+        return int(bits, 2)
+
+    def pack(self, value: int) -> str:
+        """Base64 of the bitmap, most significant bit = first seat"""
+        nbytes = (self.size + 7) // 8
+        return base64.b64encode((value << (nbytes * 8 - self.size)).to_bytes(nbytes, "big")).decode()
+
+    def is_free(self, value: int, code: str) -> bool:
+        bit = self.bit_of(code)
+        return bit is not None and not value >> (self.size - 1 - bit) & 1
+
+    def codes(self, value: int) -> List[str]:
+        """Seat codes set in a bitmap"""
+        return [self.code_of(bit) for bit in range(self.size) if value >> (self.size - 1 - bit) & 1]
+
+@lru_cache(maxsize=256)
+def _parse_layout(layout_json: str) -> SeatLayout:
+    return SeatLayout.from_dict(json.loads(layout_json))
+
+def get_layout(layout: Optional[dict], total_seats: Optional[int]) -> SeatLayout:
+    """Layout for a screen row, parsed once per distinct definition"""
+    if layout:
+        return _parse_layout(json.dumps(layout, sort_keys=True))
+    return _default_layout(total_seats)
+
+@lru_cache(maxsize=64)
+def _default_layout(total_seats: Optional[int]) -> SeatLayout:
+    return SeatLayout.default(total_seats)
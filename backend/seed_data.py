@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 from database import SessionLocal, create_tables
-from models import Movie, Cinema, Screen, Showtime, News, Booking
+from models import Movie, Cinema, Screen, Showtime, ShowtimeSeat, SeatHold, News, Booking, BookingDailyStat, ShowtimeSalesStat
 from datetime import date, time, datetime, timedelta
 import random
 
@@ -14,7 +14,11 @@ def seed_database():
     
     try:
         # Clear existing data
+        db.query(ShowtimeSeat).delete()
+        db.query(SeatHold).delete()
         db.query(Booking).delete()
+        db.query(BookingDailyStat).delete()
+        db.query(ShowtimeSalesStat).delete()
         db.query(Showtime).delete()
         db.query(Screen).delete()
         db.query(Movie).delete()
@@ -134,13 +138,30 @@ def seed_database():
         for cinema in cinemas:
             for screen_num in range(1, 6):  # 5 screens per cinema
                 screen_type = random.choice(["2D", "3D", "IMAX"])
-                total_seats = 150 if screen_type == "IMAX" else 120
+                if screen_type == "IMAX":
+                    layout = {
+                        "rows": list("ABCDEFGHIJ"),
+                        "columns": 15,
+                        "aisles": [4, 11],
+                        "gaps": [],
+                        "seat_classes": {"vip": ["F", "G", "H"]}
+                    }
+                else:
+                    layout = {
+                        "rows": list("ABCDEFGHIJ"),
+                        "columns": 12,
+                        "aisles": [3, 9],
+                        "gaps": [],
+                        "seat_classes": {"vip": ["E", "F", "G"], "couple": ["J"]}
+                    }
+                total_seats = len(layout["rows"]) * layout["columns"]
                 
                 screen = Screen(
                     cinema_id=cinema.id,
                     screen_number=screen_num,
                     screen_type=screen_type,
-                    total_seats=total_seats
+                    total_seats=total_seats,
+                    layout=layout
                 )
                 db.add(screen)
         
@@ -204,8 +225,7 @@ def seed_database():
                             show_date=show_date,
                             show_time=time.fromisoformat(show_time_str),
                             price=base_price,
-                            available_seats=screen.total_seats,
-                            booked_seats=[]
+                            available_seats=screen.total_seats
                         )
                         db.add(showtime)
         
@@ -6,10 +6,12 @@ import os
 import logging
 
 # Import database and models
-from database import create_tables
+from database import create_tables, engine
+from migrations import run_migrations
+from tasks import start_background_tasks, stop_background_tasks
 
 # Import routers
-from routers import movies, cinemas, showtimes, bookings, news, auth, admin
+from routers import movies, cinemas, showtimes, bookings, news, home, auth, admin
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -37,6 +39,7 @@ api_router.include_router(cinemas.router)
 api_router.include_router(showtimes.router)
 api_router.include_router(bookings.router)
 api_router.include_router(news.router)
+api_router.include_router(home.router)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -48,6 +51,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Estimate"],
 )
 
 # Configure logging
@@ -59,14 +63,17 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
+    """Create database tables and apply pending migrations on startup"""
     try:
         create_tables()
+        run_migrations(engine)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
+    start_background_tasks()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    await stop_background_tasks()
     logger.info("Galaxy Cinema API shutting down")
\ No newline at end of file
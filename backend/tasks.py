@@ -0,0 +1,79 @@
+"""
+In-process background jobs for Galaxy Cinema
+Started and stopped with the application; each job runs its blocking
+database work on a worker thread so the event loop stays responsive.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import timedelta
+from functools import partial
+from database import SessionLocal
+import crud
+
+logger = logging.getLogger(__name__)
+
+HOLD_SWEEP_INTERVAL_SECONDS = float(os.getenv("HOLD_SWEEP_INTERVAL_SECONDS", "30"))
+CLEANUP_BATCH_SIZE = int(os.getenv("CLEANUP_BATCH_SIZE", "500"))
+
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+
+# Seat deltas older than this (or for showtimes already played) are dropped;
+# clients further behind reload the full seat map
+SEAT_CHANGE_RETENTION_HOURS = float(os.getenv("SEAT_CHANGE_RETENTION_HOURS", "24"))
+SEAT_CHANGE_PRUNE_INTERVAL_SECONDS = float(os.getenv("SEAT_CHANGE_PRUNE_INTERVAL_SECONDS", "3600"))
+
+_tasks = []
+
+def _drain(batch_job, batch_size: int) -> int:
+    """Run a batched cleanup until a batch comes back short"""
+    db = SessionLocal()
+    try:
+        total = 0
+        while True:
+            done = batch_job(db, batch_size=batch_size)
+            total += done
+            if done < batch_size:
+                return total
+    finally:
+        db.close()
+
+def sweep_expired_holds() -> int:
+    """Reclaim every expired seat hold, one batch per transaction"""
+    swept = _drain(crud.sweep_expired_holds, CLEANUP_BATCH_SIZE)
+    if swept:
+        logger.info(f"Released {swept} expired seat holds")
+    return swept
+
+def purge_expired_idempotency_keys() -> int:
+    purged = _drain(crud.purge_expired_idempotency_keys, CLEANUP_BATCH_SIZE)
+    if purged:
+        logger.info(f"Purged {purged} expired idempotency keys")
+    return purged
+
+def prune_seat_changes() -> int:
+    max_age = timedelta(hours=SEAT_CHANGE_RETENTION_HOURS)
+    pruned = _drain(partial(crud.prune_seat_changes, max_age=max_age), CLEANUP_BATCH_SIZE)
+    if pruned:
+        logger.info(f"Pruned {pruned} seat changes")
+    return pruned
+
+async def run_periodically(job, interval: float):
+    while True:
+        try:
+            await asyncio.to_thread(job)
+        except Exception as e:
+            logger.error(f"Background job {job.__name__} failed: {e}")
+        await asyncio.sleep(interval)
+
+def start_background_tasks():
+    _tasks.append(asyncio.create_task(run_periodically(sweep_expired_holds, HOLD_SWEEP_INTERVAL_SECONDS)))
+    _tasks.append(asyncio.create_task(run_periodically(purge_expired_idempotency_keys, IDEMPOTENCY_PURGE_INTERVAL_SECONDS)))
+    _tasks.append(asyncio.create_task(run_periodically(prune_seat_changes, SEAT_CHANGE_PRUNE_INTERVAL_SECONDS)))
+
+async def stop_background_tasks():
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
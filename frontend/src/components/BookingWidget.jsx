@@ -5,7 +5,8 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '.
 import { moviesAPI, cinemasAPI, showtimesAPI, formatTime } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 
-const BookingWidget = () => {
+// movies: showing movies from /api/home (null while loading); fetched here when omitted
+const BookingWidget = ({ movies: provided }) => {
   const [selectedMovie, setSelectedMovie] = useState('');
   const [selectedCinema, setSelectedCinema] = useState('');
   const [selectedDate, setSelectedDate] = useState('');
@@ -26,14 +27,18 @@ const BookingWidget = () => {
 
   // Load initial data
   useEffect(() => {
-    loadMovies();
     loadCinemas();
   }, []);
 
+  useEffect(() => {
+    if (provided === undefined) loadMovies();
+    else if (provided !== null) { setMovies(provided); setLoadingMovies(false); }
+  }, [provided]);
+
   const loadMovies = async () => {
     try {
       setLoadingMovies(true);
-      const response = await moviesAPI.getShowing();
+      const response = await moviesAPI.getShowing('card');
       setMovies(response.data);
     } catch (error) {
       console.error('Error loading movies:', error);
@@ -4,13 +4,17 @@ import { Button } from './ui/button';
 import { moviesAPI } from '../services/api';
 import { useNavigate } from 'react-router-dom';
 
-const HeroSection = () => {
+// movies: featured movies from /api/home (null while loading); fetched here when omitted
+const HeroSection = ({ movies: provided }) => {
   const [currentSlide, setCurrentSlide] = useState(0);
   const [movies, setMovies] = useState([]);
   const [loading, setLoading] = useState(true);
   const navigate = useNavigate();
 
-  useEffect(() => { loadFeaturedMovies(); }, []);
+  useEffect(() => {
+    if (provided === undefined) loadFeaturedMovies();
+    else if (provided !== null) { setMovies(provided.slice(0, 3)); setLoading(false); }
+  }, [provided]);
 
   const loadFeaturedMovies = async () => {
     try {
@@ -5,7 +5,8 @@ import { moviesAPI, handleAPIError } from '../services/api';
 import ImageWithFallback from './ImageWithFallback';
 import { Link, useNavigate } from 'react-router-dom';
 
-const MovieCarousel = ({ title = 'Phim', status = 'showing' }) => {
+// movies: this status's movies from /api/home (null while loading); fetched here when omitted
+const MovieCarousel = ({ title = 'Phim', status = 'showing', movies: provided }) => {
   const [movies, setMovies] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -17,9 +18,9 @@ const MovieCarousel = ({ title = 'Phim', status = 'showing' }) => {
       setLoading(true);
       setError(null);
       let res;
-      if (status === 'showing') res = await moviesAPI.getShowing();
-      else if (status === 'coming') res = await moviesAPI.getComing();
-      else res = await moviesAPI.getAll();
+      if (status === 'showing') res = await moviesAPI.getShowing('card');
+      else if (status === 'coming') res = await moviesAPI.getComing('card');
+      else res = await moviesAPI.getAll(null, 'card');
       setMovies(res.data || []);
     } catch (e) {
       setError(handleAPIError(e, 'Không thể tải phim'));
@@ -28,7 +29,10 @@ const MovieCarousel = ({ title = 'Phim', status = 'showing' }) => {
     }
   };
 
-  useEffect(() => { fetchData(); }, [status]);
+  useEffect(() => {
+    if (provided === undefined) fetchData();
+    else if (provided !== null) { setMovies(provided); setLoading(false); }
+  }, [status, provided]);
 
   const scrollBy = (delta) => {
     const el = scrollerRef.current;
@@ -119,17 +119,17 @@ const MovieSection = () => {
       let response;
       switch (activeTab) {
         case 'showing':
-          response = await moviesAPI.getShowing();
+          response = await moviesAPI.getShowing('card');
           break;
         case 'coming':
-          response = await moviesAPI.getComing();
+          response = await moviesAPI.getComing('card');
           break;
         case 'imax':
-          response = await moviesAPI.getAll();
+          response = await moviesAPI.getAll(null, 'card');
           break;
         case 'all':
         default:
-          response = await moviesAPI.getAll();
+          response = await moviesAPI.getAll(null, 'card');
           break;
       }
       
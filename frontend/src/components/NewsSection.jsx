@@ -23,17 +23,21 @@ const NewsCard = ({ news }) => {
   );
 };
 
-const NewsSection = () => {
+// news: headlines from /api/home (null while loading); fetched here when omitted
+const NewsSection = ({ news: provided }) => {
   const [news, setNews] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
-  useEffect(() => { loadNews(); }, []);
+  useEffect(() => {
+    if (provided === undefined) loadNews();
+    else if (provided !== null) { setNews(provided); setLoading(false); }
+  }, [provided]);
 
   const loadNews = async () => {
     try {
       setLoading(true); setError(null);
-      const response = await newsAPI.getAll();
+      const response = await newsAPI.getAll(null, 'headline');
       setNews(response.data);
     } catch (err) {
       setError(handleAPIError(err, 'Không thể tải tin tức'));
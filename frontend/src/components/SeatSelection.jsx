@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Button } from './ui/button';
 import { Input } from './ui/input';
 import { Label } from './ui/label';
@@ -17,7 +17,12 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
   });
   const [loading, setLoading] = useState(true);
   const [booking, setBooking] = useState(false);
+  const [queuePosition, setQueuePosition] = useState(null);
   const [error, setError] = useState(null);
+  // Seat changes pushed since the seat map was loaded: seatId -> booked?
+  const [liveSeats, setLiveSeats] = useState({});
+  // One key per checkout attempt; cleared whenever the order changes
+  const idempotencyKey = useRef(null);
 
   useEffect(() => {
     if (showtimeId) {
@@ -25,12 +30,40 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
     }
   }, [showtimeId]);
 
+  useEffect(() => {
+    if (!showtime?.id || typeof EventSource === 'undefined') return;
+    const source = new EventSource(showtimesAPI.seatEventsUrl(showtime.id));
+    source.addEventListener('snapshot', (e) => {
+      // The map changed between loading it and connecting; start over from the latest
+      if (JSON.parse(e.data).version > showtime.seat_version) loadShowtime();
+    });
+    source.addEventListener('seats', (e) => {
+      const change = JSON.parse(e.data);
+      if (change.version <= showtime.seat_version) return;
+      setLiveSeats(prev => {
+        const next = { ...prev };
+        change.booked.forEach(seatId => { next[seatId] = true; });
+        change.released.forEach(seatId => { next[seatId] = false; });
+        return next;
+      });
+      setSelectedSeats(prev => {
+        const taken = prev.filter(seatId => change.booked.includes(seatId));
+        if (taken.length === 0) return prev;
+        toast.error(`Ghế ${taken.join(', ')} vừa được người khác đặt`);
+        idempotencyKey.current = null;
+        return prev.filter(seatId => !taken.includes(seatId));
+      });
+    });
+    return () => source.close();
+  }, [showtime?.id, showtime?.seat_version]);
+
   const loadShowtime = async () => {
     try {
       setLoading(true);
       setError(null);
       const response = await showtimesAPI.getById(showtimeId);
       setShowtime(response.data);
+      setLiveSeats({});
     } catch (err) {
       setError(handleAPIError(err, 'Không thể tải thông tin suất chiếu'));
     } finally {
@@ -38,26 +71,40 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
     }
   };
 
-  // Generate seat layout (simplified)
+  // Booked seats arrive as a base64 bitmap over the layout grid (row-major, first seat = high bit)
+  const decodeSeatBitmap = (encoded) => {
+    const bytes = Uint8Array.from(atob(encoded || ''), c => c.charCodeAt(0));
+    return (index) => ((bytes[index >> 3] || 0) >> (7 - (index & 7))) & 1;
+  };
+
+  // Generate seat layout from the screen's grid
   const generateSeatLayout = () => {
-    const rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H'];
-    const seatsPerRow = 12;
+    const layout = showtime?.seat_map?.layout;
+    if (!layout) return [];
+    const isBookedBit = decodeSeatBitmap(showtime.seat_map.booked);
+    const isHeldBit = decodeSeatBitmap(showtime.seat_map.held);
+    const gaps = new Set(layout.gaps);
+    const aisles = new Set(layout.aisles);
     const seats = [];
 
-    rows.forEach(row => {
-      for (let i = 1; i <= seatsPerRow; i++) {
+    layout.rows.forEach((row, rowIndex) => {
+      for (let i = 1; i <= layout.columns; i++) {
         const seatId = `${row}${i}`;
-        const isBooked = showtime?.booked_seats?.includes(seatId);
+        const bit = rowIndex * layout.columns + i - 1;
+        const isBooked = seatId in liveSeats ? liveSeats[seatId] : isBookedBit(bit) === 1;
+        const isHeld = !isBooked && isHeldBit(bit) === 1;
         const isSelected = selectedSeats.includes(seatId);
-        seats.push({ id: seatId, row, number: i, isBooked, isSelected, isAisle: i === 3 || i === 9 });
+        seats.push({ id: seatId, row, number: i, isBooked, isHeld, isSelected, isGap: gaps.has(seatId), isAisle: aisles.has(i) });
       }
     });
 
     return seats;
   };
 
-  const handleSeatClick = (seatId) => {
-    if (showtime?.booked_seats?.includes(seatId)) return;
+  const handleSeatClick = (seat) => {
+    if (seat.isBooked || seat.isHeld || seat.isGap) return;
+    const seatId = seat.id;
+    idempotencyKey.current = null;
     setSelectedSeats(prev => prev.includes(seatId)
       ? prev.filter(id => id !== seatId)
       : (prev.length < 8 ? [...prev, seatId] : prev)
@@ -65,6 +112,7 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
   };
 
   const handleInputChange = (field, value) => {
+    idempotencyKey.current = null;
     setCustomerInfo(prev => ({ ...prev, [field]: value }));
   };
 
@@ -101,7 +149,19 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
         payment_method: customerInfo.paymentMethod
       };
 
-      const response = await bookingsAPI.create(bookingData);
+      if (!idempotencyKey.current) idempotencyKey.current = crypto.randomUUID();
+      let response = await bookingsAPI.create(bookingData, idempotencyKey.current);
+      // Flash sale: wait in line until the showtime admits us, then submit again
+      while (response.status === 202) {
+        let ticket = response.data;
+        while (ticket.status !== 'admitted') {
+          setQueuePosition(ticket.position);
+          await new Promise(resolve => setTimeout(resolve, ticket.retry_after * 1000));
+          ticket = (await bookingsAPI.queueStatus(ticket.token)).data;
+        }
+        response = await bookingsAPI.create(bookingData, idempotencyKey.current, ticket.token);
+      }
+      setQueuePosition(null);
       toast.success(`Đặt vé thành công! Mã: ${response.data.booking_code}`);
 
       if (onBookingComplete) onBookingComplete(response.data);
@@ -110,6 +170,7 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
       toast.error(handleAPIError(err, 'Không thể đặt vé'));
     } finally {
       setBooking(false);
+      setQueuePosition(null);
     }
   };
 
@@ -164,26 +225,32 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
           <div className="flex justify-center space-x-6 mb-6 text-sm">
             <div className="flex items-center"><div className="w-4 h-4 bg-gray-300 rounded mr-2"></div><span>Trống</span></div>
             <div className="flex items-center"><div className="w-4 h-4 bg-orange-500 rounded mr-2"></div><span>Đã chọn</span></div>
+            <div className="flex items-center"><div className="w-4 h-4 bg-yellow-400 rounded mr-2"></div><span>Đang giữ</span></div>
             <div className="flex items-center"><div className="w-4 h-4 bg-red-500 rounded mr-2"></div><span>Đã đặt</span></div>
           </div>
 
           {/* Seat Grid */}
           <div className="space-y-2">
-            {['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H'].map(row => (
+            {(showtime.seat_map?.layout?.rows || []).map(row => (
               <div key={row} className="flex justify-center items-center space-x-1">
                 <span className="w-6 text-center text-sm font-medium">{row}</span>
                 {seats.filter(seat => seat.row === row).map(seat => (
                   <React.Fragment key={seat.id}>
-                    <button
-                      className={`w-8 h-8 rounded text-xs font-medium transition-colors ${
-                        seat.isBooked ? 'bg-red-500 text-white cursor-not-allowed' :
-                        seat.isSelected ? 'bg-orange-500 text-white' : 'bg-gray-300 hover:bg-gray-400'
-                      }`}
-                      onClick={() => handleSeatClick(seat.id)}
-                      disabled={seat.isBooked}
-                    >
-                      {seat.number}
-                    </button>
+                    {seat.isGap ? (
+                      <div className="w-8 h-8"></div>
+                    ) : (
+                      <button
+                        className={`w-8 h-8 rounded text-xs font-medium transition-colors ${
+                          seat.isBooked ? 'bg-red-500 text-white cursor-not-allowed' :
+                          seat.isHeld ? 'bg-yellow-400 text-white cursor-not-allowed' :
+                          seat.isSelected ? 'bg-orange-500 text-white' : 'bg-gray-300 hover:bg-gray-400'
+                        }`}
+                        onClick={() => handleSeatClick(seat)}
+                        disabled={seat.isBooked || seat.isHeld}
+                      >
+                        {seat.number}
+                      </button>
+                    )}
                     {seat.isAisle && <div className="w-4"></div>}
                   </React.Fragment>
                 ))}
@@ -251,7 +318,7 @@ const SeatSelection = ({ showtimeId, showtimeDetails = null, onBookingComplete,
 
           {/* Book Button */}
           <Button onClick={handleBooking} disabled={selectedSeats.length === 0 || booking} className="w-full bg-orange-500 hover:bg-orange-600 text-white font-bold py-3">
-            {booking ? (<><Loader2 className="h-4 w-4 animate-spin mr-2" />Đang xử lý...</>) : 'Xác nhận đặt vé'}
+            {booking ? (<><Loader2 className="h-4 w-4 animate-spin mr-2" />{queuePosition ? `Đang xếp hàng (vị trí ${queuePosition})...` : 'Đang xử lý...'}</>) : 'Xác nhận đặt vé'}
           </Button>
 
           {error && (
@@ -11,7 +11,7 @@ const CinemaCornerPage = () => {
     const load = async () => {
       try {
         setLoading(true);
-        const res = await newsAPI.getNews();
+        const res = await newsAPI.getNews('headline');
         setArticles(res.data);
       } catch (e) {
         console.error(handleAPIError(e, 'Không thể tải bài viết'));
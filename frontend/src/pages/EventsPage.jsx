@@ -12,7 +12,7 @@ const EventsPage = () => {
     const load = async () => {
       try {
         setLoading(true);
-        const res = await newsAPI.getPromotions();
+        const res = await newsAPI.getPromotions('headline');
         setEvents(res.data);
       } catch (e) {
         console.error(handleAPIError(e, 'Không thể tải sự kiện'));
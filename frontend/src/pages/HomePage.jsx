@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import HeroSection from '../components/HeroSection';
 import BookingWidget from '../components/BookingWidget';
 import StatsStrip from '../components/StatsStrip';
@@ -6,12 +6,25 @@ import MovieCarousel from '../components/MovieCarousel';
 import WhyGalaxy from '../components/WhyGalaxy';
 import PromoSection from '../components/PromoSection';
 import NewsSection from '../components/NewsSection';
+import { homeAPI } from '../services/api';
 
 const HomePage = () => {
+  // One request for every list on the page; if it fails, each section loads its own
+  const [home, setHome] = useState(null);
+
+  useEffect(() => {
+    homeAPI.get()
+      .then((response) => setHome(response.data))
+      .catch(() => setHome({}));
+  }, []);
+
+  // null while loading, undefined when the section has to fetch it itself
+  const section = (name) => (home ? home[name] : null);
+
   return (
     <div>
       {/* 1) Hero */}
-      <HeroSection />
+      <HeroSection movies={section('featured')} />
 
       {/* 2) Stats */}
       <StatsStrip />
@@ -20,20 +33,20 @@ const HomePage = () => {
       <WhyGalaxy />
 
       {/* 4) Movies - Đang chiếu */}
-      <MovieCarousel title="Đang chiếu" status="showing" />
+      <MovieCarousel title="Đang chiếu" status="showing" movies={section('showing')} />
 
       {/* 5) Movies - Sắp chiếu */}
-      <MovieCarousel title="Sắp chiếu" status="coming" />
+      <MovieCarousel title="Sắp chiếu" status="coming" movies={section('coming')} />
 
       {/* 6) Promo */}
       <PromoSection />
 
       {/* 7) News */}
-      <NewsSection />
+      <NewsSection news={section('news')} />
 
       {/* 8) Booking at bottom for deeper scroll from CTA */}
       <div id="booking">
-        <BookingWidget />
+        <BookingWidget movies={section('showing')} />
       </div>
     </div>
   );
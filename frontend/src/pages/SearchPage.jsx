@@ -113,9 +113,14 @@ const SearchPage = () => {
   const searchMovies = async () => {
     try {
       setLoading(true);
+      const q = (filters.query || '').trim();
+      const hasStatus = filters.status && filters.status !== 'all';
       let response;
       
-      if (filters.status && filters.status !== 'all') {
+      if (q) {
+        // Server-side search (accent-insensitive, ranked); status is filtered below
+        response = await moviesAPI.search(q);
+      } else if (hasStatus) {
         response = await moviesAPI.getAll(filters.status);
       } else {
         response = await moviesAPI.getAll();
@@ -123,19 +128,8 @@ const SearchPage = () => {
       
       let filteredMovies = response.data || [];
       
-      // Client-side filtering for search query and genre (null-safe)
-      const q = (filters.query || '').toLowerCase();
-      if (q) {
-        filteredMovies = filteredMovies.filter((movie) => {
-          const title = (movie.title || '').toLowerCase();
-          const genre = (movie.genre || '').toLowerCase();
-          const director = (movie.director || '').toLowerCase();
-          return (
-            title.includes(q) ||
-            genre.includes(q) ||
-            director.includes(q)
-          );
-        });
+      if (q && hasStatus) {
+        filteredMovies = filteredMovies.filter((movie) => movie.status === filters.status);
       }
       
       if (filters.genre && filters.genre !== 'all') {
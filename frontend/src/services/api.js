@@ -36,21 +36,27 @@ apiClient.interceptors.response.use(
 
 // Movies API
 export const moviesAPI = {
-  getAll: (status = null) => {
-    const params = status ? { status } : {};
+  // view: 'card' returns only what a poster grid shows (no description or cast)
+  getAll: (status = null, view = null) => {
+    const params = { ...(status && { status }), ...(view && { view }) };
     return apiClient.get('/movies/', { params });
   },
   
   getById: (id) => {
     return apiClient.get(`/movies/${id}`);
   },
+
+  // Accent-insensitive search over title, cast, director and genre, best matches first
+  search: (q, limit = 50) => {
+    return apiClient.get('/movies/search', { params: { q, limit } });
+  },
   
-  getShowing: () => {
-    return apiClient.get('/movies/', { params: { status: 'showing' } });
+  getShowing: (view = null) => {
+    return apiClient.get('/movies/', { params: { status: 'showing', ...(view && { view }) } });
   },
   
-  getComing: () => {
-    return apiClient.get('/movies/', { params: { status: 'coming' } });
+  getComing: (view = null) => {
+    return apiClient.get('/movies/', { params: { status: 'coming', ...(view && { view }) } });
   }
 };
 
@@ -80,6 +86,11 @@ export const showtimesAPI = {
     return apiClient.get(`/showtimes/${id}`);
   },
   
+  // Server-Sent Events URL for live seat changes (use with EventSource)
+  seatEventsUrl: (id) => {
+    return `${API}/showtimes/${id}/seats/stream`;
+  },
+  
   getAvailableDates: (movieId = null, cinemaId = null) => {
     const params = {};
     if (movieId) params.movie_id = movieId;
@@ -99,8 +110,16 @@ export const showtimesAPI = {
 
 // Bookings API
 export const bookingsAPI = {
-  create: (bookingData) => {
-    return apiClient.post('/bookings/', bookingData);
+  // Reuse the same idempotencyKey when retrying a checkout so the server returns the first booking
+  // A 202 response carries a waiting-room ticket: poll queueStatus, then call again with its token
+  create: (bookingData, idempotencyKey = null, queueToken = null) => {
+    const headers = idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {};
+    if (queueToken) headers['X-Queue-Token'] = queueToken;
+    return apiClient.post('/bookings/', bookingData, { headers });
+  },
+  
+  queueStatus: (token) => {
+    return apiClient.get(`/bookings/queue/${token}`);
   },
   
   getById: (id) => {
@@ -120,10 +139,19 @@ export const bookingsAPI = {
   }
 };
 
+// Home page API
+export const homeAPI = {
+  // Featured, showing and coming movies and news in one cached response
+  get: () => {
+    return apiClient.get('/home/');
+  }
+};
+
 // News API
 export const newsAPI = {
-  getAll: (category = null) => {
-    const params = category ? { category } : {};
+  // view: 'headline' leaves out the article body
+  getAll: (category = null, view = null) => {
+    const params = { ...(category && { category }), ...(view && { view }) };
     return apiClient.get('/news/', { params });
   },
   
@@ -131,12 +159,12 @@ export const newsAPI = {
     return apiClient.get(`/news/${id}`);
   },
   
-  getPromotions: () => {
-    return apiClient.get('/news/', { params: { category: 'promotion' } });
+  getPromotions: (view = null) => {
+    return apiClient.get('/news/', { params: { category: 'promotion', ...(view && { view }) } });
   },
   
-  getNews: () => {
-    return apiClient.get('/news/', { params: { category: 'news' } });
+  getNews: (view = null) => {
+    return apiClient.get('/news/', { params: { category: 'news', ...(view && { view }) } });
   }
 };
 
@@ -0,0 +1,128 @@
+import pytest
+
+import admission
+from admission import ADMISSION_ABANDON_SECONDS, ADMISSION_PASS_SECONDS, ADMISSION_SWEEP_SECONDS, AdmissionController
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def controller(clock):
+    return AdmissionController(rate=2, burst=3, max_concurrency=2)
+
+def test_burst_is_admitted_straight_away(controller):
+    assert all(controller.admit(1).admitted for _ in range(3))
+
+def test_beyond_the_burst_callers_get_tickets_in_order(controller):
+    for _ in range(3):
+        controller.admit(1)
+    first, second = controller.admit(1), controller.admit(1)
+    assert not first.admitted and not second.admitted
+    assert (first.position, second.position) == (1, 2)
+    assert first.ticket.token != second.ticket.token
+
+def test_credit_refills_at_the_rate(controller, clock):
+    for _ in range(3):
+        controller.admit(1)
+    assert not controller.try_admit(1).admitted
+    clock.now += 0.5
+    assert controller.try_admit(1).admitted
+    assert not controller.try_admit(1).admitted
+
+def test_credit_never_exceeds_the_burst(controller, clock):
+    clock.now += 3600
+    assert sum(controller.try_admit(1).admitted for _ in range(10)) == 3
+
+def test_waiting_tickets_are_admitted_first_in_first_out(controller, clock):
+    for _ in range(3):
+        controller.admit(1)
+    first, second = controller.admit(1).ticket, controller.admit(1).ticket
+    clock.now += 0.5
+    assert controller.status(first.token).admitted
+    assert not controller.status(second.token).admitted
+    # Newcomers queue behind the line instead of taking freed credit
+    clock.now += 0.5
+    assert not controller.admit(1).admitted
+    assert controller.admit(1, second.token).admitted
+
+def test_showtimes_have_separate_buckets(controller):
+    for _ in range(3):
+        controller.admit(1)
+    assert controller.admit(2).admitted
+
+def test_ticket_for_another_showtime_joins_the_line(controller):
+    for _ in range(3):
+        controller.admit(1)
+    ticket = controller.admit(1).ticket
+    for _ in range(3):
+        controller.admit(2)
+    other = controller.admit(2, ticket.token)
+    assert other.ticket.token != ticket.token
+
+def test_try_admit_does_not_issue_tickets(controller):
+    for _ in range(3):
+        controller.admit(1)
+    refused = controller.try_admit(1)
+    assert not refused.admitted and refused.ticket is None
+    assert refused.retry_after >= 1
+
+def test_abandoned_tickets_are_skipped(controller, clock):
+    for _ in range(3):
+        controller.admit(1)
+    abandoned, polled = controller.admit(1).ticket, controller.admit(1).ticket
+    clock.now += ADMISSION_ABANDON_SECONDS + 1
+    # The first refill would go to the abandoned ticket, which nobody polls
+    assert controller.admit(1, polled.token).admitted
+    assert controller.status(abandoned.token) is None
+
+def test_admitted_tickets_expire(controller, clock):
+    for _ in range(3):
+        controller.admit(1)
+    ticket = controller.admit(1).ticket
+    clock.now += 1
+    assert controller.status(ticket.token).admitted
+    clock.now += ADMISSION_PASS_SECONDS + 1
+    assert controller.status(ticket.token) is None
+
+def test_released_tickets_are_forgotten(controller, clock):
+    for _ in range(3):
+        controller.admit(1)
+    ticket = controller.admit(1).ticket
+    controller.release(ticket.token)
+    assert controller.status(ticket.token) is None
+
+def test_idle_queues_are_dropped(controller, clock):
+    for showtime_id in range(10):
+        controller.admit(showtime_id)
+    assert controller.tracks(3)
+    clock.now += ADMISSION_SWEEP_SECONDS
+    controller.admit(99)
+    assert not controller.tracks(3)
+    assert controller.tracks(99)
+
+def test_queues_with_waiting_tickets_are_kept(controller, clock):
+    for _ in range(6):
+        controller.admit(1)
+    ticket = controller.admit(1).ticket
+    for _ in range(int(ADMISSION_SWEEP_SECONDS // 10)):
+        clock.now += 10
+        controller.status(ticket.token)
+    controller.admit(99)
+    assert controller.tracks(1)
+
+def test_booking_slots_cap_concurrency(controller):
+    with controller.booking_slot() as first, controller.booking_slot() as second:
+        with controller.booking_slot() as third:
+            assert (first, second, third) == (True, True, False)
+    with controller.booking_slot() as again:
+        assert again
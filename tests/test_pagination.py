@@ -0,0 +1,32 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor, next_cursor
+
+def test_cursor_round_trip():
+    key = (datetime(2030, 3, 1, 10, 30, 5, 123456), date(2030, 3, 1), time(19, 15), 42, "confirmed")
+    cursor = encode_cursor(*key)
+    assert decode_cursor(cursor, datetime, date, time, int, str) == key
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor("??>>", 1)
+    assert "=" not in cursor
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+@pytest.mark.parametrize("cursor", ["", "not base64!", encode_cursor(1), encode_cursor("x", 1), encode_cursor(1.5, 1)])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, int, int)
+
+def test_cursor_of_the_wrong_types_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("yesterday", 1), date, int)
+
+def test_next_cursor_on_the_last_page():
+    assert next_cursor([1, 2], 2, lambda row: (row,)) == ([1, 2], None)
+
+def test_next_cursor_points_after_the_last_row_of_the_page():
+    page, cursor = next_cursor([1, 2, 3], 2, lambda row: (row,))
+    assert page == [1, 2]
+    assert decode_cursor(cursor, int) == (2,)
@@ -0,0 +1,66 @@
+from datetime import date, datetime, time
+
+from scheduling import SHOWTIME_TURNAROUND_MINUTES, describe_conflicts, find_conflicts, make_slot
+
+DAY = date(2030, 3, 1)
+
+def slot(start: time, duration: int = 120, screen_id: int = 1, day: date = DAY, showtime_id=None):
+    return make_slot(screen_id, 7, day, start, duration, showtime_id)
+
+def test_slot_ends_after_movie_and_turnaround():
+    s = slot(time(10, 0), duration=100)
+    assert (s.end - s.start).total_seconds() == (100 + SHOWTIME_TURNAROUND_MINUTES) * 60
+
+def test_missing_duration_uses_default():
+    assert slot(time(10, 0), duration=None).end == slot(time(10, 0), duration=120).end
+
+def test_back_to_back_after_turnaround_does_not_conflict():
+    existing = slot(time(10, 0), duration=105, showtime_id=1)
+    proposed = make_slot(1, 7, DAY, existing.end.time(), 90)
+    assert find_conflicts([existing], [proposed]) == []
+
+def test_overlap_is_reported_as_proposed_then_existing():
+    existing = slot(time(10, 0), showtime_id=1)
+    proposed = slot(time(11, 0))
+    assert find_conflicts([existing], [proposed]) == [(proposed, existing)]
+
+def test_proposed_before_existing_is_reported_the_same_way():
+    existing = slot(time(11, 0), showtime_id=1)
+    proposed = slot(time(10, 0))
+    assert find_conflicts([existing], [proposed]) == [(proposed, existing)]
+
+def test_other_screens_do_not_conflict():
+    assert find_conflicts([slot(time(10, 0), screen_id=1)], [slot(time(10, 0), screen_id=2)]) == []
+
+def test_overlaps_among_existing_are_not_reported():
+    assert find_conflicts([slot(time(10, 0), showtime_id=1), slot(time(10, 30), showtime_id=2)], []) == []
+
+def test_proposed_slots_conflict_with_each_other():
+    first, second = slot(time(10, 0)), slot(time(10, 30))
+    assert find_conflicts([], [first, second]) == [(second, first)]
+
+def test_late_show_crossing_midnight_conflicts_with_next_morning():
+    late = slot(time(23, 0), duration=150, showtime_id=1)
+    early = make_slot(1, 7, date(2030, 3, 2), time(1, 0), 90)
+    assert find_conflicts([late], [early]) == [(early, late)]
+
+def test_finished_shows_leave_the_sweep():
+    shows = [slot(time(hour, 0), duration=30, showtime_id=hour) for hour in (9, 11, 13)]
+    # Fits between the 11:00 show and the 13:00 one
+    proposed = slot(shows[1].end.time(), duration=30)
+    assert proposed.end <= shows[2].start
+    assert find_conflicts(shows, [proposed]) == []
+
+def test_one_long_show_conflicts_with_every_show_it_spans():
+    shows = [slot(time(hour, 0), duration=45, showtime_id=hour) for hour in (10, 11, 12)]
+    proposed = slot(time(9, 30), duration=240)
+    assert [other for _, other in find_conflicts(shows, [proposed])] == shows
+
+def test_describe_conflicts():
+    existing = slot(time(10, 0), showtime_id=5)
+    proposed = slot(time(11, 0))
+    [described] = describe_conflicts(find_conflicts([existing], [proposed]))
+    assert described["screen_id"] == 1
+    assert described["slot"]["showtime_id"] is None
+    assert described["slot"]["starts_at"] == datetime(2030, 3, 1, 11, 0).isoformat()
+    assert described["conflicts_with"]["showtime_id"] == 5
@@ -0,0 +1,39 @@
+from sqlalchemy.dialects import postgresql
+
+from search import MAX_QUERY_TERMS, TITLE_WEIGHT, fold, prefix_query, search_fields, search_vector
+
+def test_fold_strips_vietnamese_diacritics():
+    assert fold("Thành Cuốn Đêm") == "thanh cuon dem"
+    assert fold("Đường đua") == "duong dua"
+
+def test_fold_of_nothing_is_empty():
+    assert fold(None) == ""
+    assert fold("") == ""
+
+def test_unaccented_query_matches_accented_title():
+    assert prefix_query("Thanh Cuon") == prefix_query("Thành Cuốn") == "thanh & cuon:*"
+
+def test_last_word_is_a_prefix_once_long_enough():
+    assert prefix_query("kimetsu y") == "kimetsu & y"
+    assert prefix_query("kimetsu ya") == "kimetsu & ya:*"
+
+def test_weights_restrict_every_term():
+    assert prefix_query("thanh cuon", TITLE_WEIGHT) == "thanh:A & cuon:*A"
+    assert prefix_query("thanh c", TITLE_WEIGHT) == "thanh:A & c:A"
+
+def test_punctuation_is_dropped_and_terms_are_capped():
+    assert prefix_query("  !!  ") is None
+    assert prefix_query("spider-man: no way") == "spider & man & no & way:*"
+    assert prefix_query(" ".join(f"w{n}" for n in range(20))).count("&") == MAX_QUERY_TERMS - 1
+
+def test_search_fields_fold_each_weight_group():
+    assert search_fields("Thành Cuốn", "Đạo diễn", ["Hà Anh", "Lê Bảo"], "Hành động") == (
+        "thanh cuon", "dao dien ha anh le bao", "hanh dong"
+    )
+    assert search_fields("Up", None, None, None) == ("up", "", "")
+
+def test_search_vector_weights_title_people_and_genre():
+    compiled = search_vector("Thành Cuốn", "Đạo diễn", ["Hà Anh"], "Hành động").compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert sql.count("setweight(to_tsvector(") == 3
+    assert list(compiled.params.values()) == ["simple", "thanh cuon", "A", "simple", "dao dien ha anh", "B", "simple", "hanh dong", "C"]
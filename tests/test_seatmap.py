@@ -0,0 +1,97 @@
+import base64
+
+import pytest
+
+from seatmap import SeatLayout, get_layout, row_label
+
+def layout(**overrides):
+    options = {"rows": ["A", "B"], "columns": 4, "aisles": [2], "gaps": ["B4"], "seat_classes": {"vip": ["B"]}}
+    options.update(overrides)
+    return SeatLayout(**options)
+
+def test_row_labels_continue_past_z():
+    assert [row_label(i) for i in (0, 25, 26, 27, 51, 52)] == ["A", "Z", "AA", "AB", "AZ", "BA"]
+
+def test_size_and_capacity_leave_out_gaps():
+    grid = layout()
+    assert grid.size == 8
+    assert grid.capacity == 7
+
+def test_seat_codes_map_to_grid_positions():
+    grid = layout()
+    assert grid.bit_of("A1") == 0
+    assert grid.bit_of("B3") == 6
+    assert grid.code_of(6) == "B3"
+
+@pytest.mark.parametrize("code", ["B4", "A5", "A0", "C1", "a1", "", None, "1A"])
+def test_gaps_and_unknown_seats_are_invalid(code):
+    assert not layout().is_valid(code)
+
+def test_mask_sets_the_first_seat_as_the_top_bit():
+    grid = layout()
+    assert grid.to_bits(grid.mask(["A1", "B3"])) == "10000010"
+
+def test_mask_rejects_seats_not_in_the_layout():
+    with pytest.raises(ValueError):
+        layout().mask(["B4"])
+
+def test_bits_round_trip():
+    grid = layout()
+    value = grid.mask(["A2", "B1"])
+    assert grid.from_bits(grid.to_bits(value)) == value
+    assert grid.codes(value) == ["A2", "B1"]
+
+def test_missing_bitmap_means_no_seats():
+    assert layout().from_bits(None) == 0
+    assert layout().from_bits("") == 0
+
+def test_bitmap_of_another_layout_is_rejected():
+    with pytest.raises(ValueError):
+        layout().from_bits("1010")
+
+def test_pack_pads_to_whole_bytes():
+    grid = layout(rows=["A", "B", "C"], gaps=[])
+    packed = base64.b64decode(grid.pack(grid.mask(["A1", "C4"])))
+    # 12 seats in two bytes, first seat first, the last 4 bits padding
+    assert packed == bytes([0b10000000, 0b00010000])
+
+def test_is_free():
+    grid = layout()
+    booked = grid.mask(["A1"])
+    assert not grid.is_free(booked, "A1")
+    assert grid.is_free(booked, "A2")
+    assert not grid.is_free(booked, "B4")
+
+def test_seat_classes():
+    grid = layout()
+    assert grid.seat_class("B1") == "vip"
+    assert grid.seat_class("A1") == "standard"
+    assert grid.seat_class("B4") is None
+
+@pytest.mark.parametrize("options", [
+    {"rows": []},
+    {"columns": 0},
+    {"rows": ["A", "A"]},
+    {"rows": ["a"]},
+    {"aisles": [4]},
+    {"gaps": ["C1"]},
+    {"seat_classes": {"vip": ["C"]}},
+])
+def test_invalid_layouts(options):
+    with pytest.raises(ValueError):
+        layout(**options)
+
+def test_dict_round_trip():
+    grid = layout()
+    assert SeatLayout.from_dict(grid.to_dict()).to_dict() == grid.to_dict()
+
+def test_default_layout_fills_rows_of_twelve():
+    grid = SeatLayout.default(30)
+    assert grid.rows == ["A", "B", "C"]
+    assert grid.capacity == 30
+    assert not grid.is_valid("C7")
+    assert grid.is_valid("C6")
+
+def test_get_layout_falls_back_to_the_default_grid():
+    assert get_layout(None, 30).capacity == 30
+    assert get_layout(layout().to_dict(), 30).capacity == 7